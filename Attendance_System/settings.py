@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 from pathlib import Path
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the session, auth and first-login queries are counted too
+    'core.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,9 +61,44 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'accounts.middleware.FirstLoginMiddleware',
-    
 ]
 
+# Per-URL-name query budgets checked by QueryInstrumentationMiddleware,
+# counting every query of the request: session and auth take up to 5 of
+# them (on the first request after login, which also writes the session).
+# Over budget logs a warning, or raises under `manage.py test`, so any
+# view test that goes over fails.
+QUERY_BUDGETS = {
+    'academics:attendance': 15,
+    'academics:attendance_sync': 20,  # two transactional bulk writes
+    'reports:attendance_report': 15,
+    'reports:attendance_summary': 15,
+    'reports:detailed_attendance': 15,
+    'reports:teacher_details_report': 15,
+    'reports:teacher_details_report_export': 15,
+    'reports:attendance_overview': 15,
+    'reports:absenteeism_report': 15,
+    'accounts:manage_student': 15,
+    'core:search': 15,
+}
+QUERY_BUDGET_STRICT = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
+# The middleware's Server-Timing response header and per-request INFO log
+# line (query count and timings) follow DEBUG unless set here, e.g.
+#   QUERY_TIMING_HEADER = True
+#   QUERY_METRICS_LOG = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.instrumentation': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
+
 ROOT_URLCONF = 'Attendance_System.urls'
 
 TEMPLATES = [
@@ -92,6 +130,35 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; for several worker processes switch to the
+# file-based backend so they share one dashboard cache, e.g.
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#   'LOCATION': BASE_DIR / 'cache',
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Dashboard landing-page cache (see dashboard/cache.py). Entries are
+# invalidated by model signals; the timeout is a fallback bound on staleness.
+DASHBOARD_CACHE_ALIAS = 'default'
+DASHBOARD_CACHE_TIMEOUT = 300
+
+# Offline attendance sync receipts answer retried uploads; older ones are
+# pruned (see academics.services.prune_sync_receipts)
+ATTENDANCE_SYNC_RECEIPT_DAYS = 30
+
+
+# Initial passwords of bulk-provisioned accounts (the student import) are
+# hashed with the default hasher, spread over every core; see
+# accounts.passwords. INITIAL_PASSWORD_HASHER may name another
+# PASSWORD_HASHERS algorithm for them.
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -131,6 +198,12 @@ STATICFILES_DIRS = [
     BASE_DIR / 'core' / 'static',
 ]
 
+# Where background account exports are written (one file per job)
+EXPORT_ROOT = BASE_DIR / 'exports'
+
+# Columnar attendance snapshot for analytics (see reports/analytics.py)
+ANALYTICS_ROOT = BASE_DIR / 'analytics'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -28,6 +28,7 @@ urlpatterns = [
     path('academic/',include('academics.urls')),
     path('reports/',include('reports.urls')),
     path('accounts/',include('accounts.urls')),
+    path('search/',include('core.urls')),
     path('accounts/', include([
         path('login/', views.custom_login, name='login'),
         path('change-password/', views.change_password, name='change_password'),
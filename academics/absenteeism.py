@@ -0,0 +1,208 @@
+"""
+Chronic absenteeism detection.
+
+``detect_absenteeism()`` reads every live attendance record once, sorted
+by (student, offering, date) along the table's unique index, as flat
+NumPy arrays. All per-(student, offering) metrics are then computed
+with cumulative sums and ``reduceat`` over the segment boundaries; no
+Python loop runs per student or per record:
+
+* overall, most recent (last ``window`` meetings) and peak rolling
+  absence rates
+* longest and current run of consecutive absences
+* the least-squares slope of "late" over successive meetings
+
+Pairs that cross a threshold are written to AbsenteeismFlag, replacing
+the previous run.
+"""
+from dataclasses import dataclass
+import time
+
+from django.db import connection, transaction
+from django.db.models import Case, CharField, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+import numpy as np
+
+from .models import AbsenteeismFlag, Attendance
+
+
+CHUNK_SIZE = 100_000
+
+REASONS = ['chronic absence', 'recent absences', 'absence streak', 'rising lateness']
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    window: int = 10               # meetings in the rolling window
+    min_records: int = 5           # ignore pairs with fewer meetings
+    absence_rate: float = 0.10     # chronic absence: missing 10% or more
+    recent_absence_rate: float = 0.30
+    streak: int = 3                # consecutive absences, ongoing
+    late_trend: float = 0.02       # late rate rising 2 points per meeting
+
+
+def load_status_arrays():
+    """
+    All live attendance as ``(student_ids, offering_ids, dates, absent,
+    late)`` arrays, sorted by student, offering and date.
+
+    Rows are fetched ``CHUNK_SIZE`` at a time straight from the cursor
+    and each chunk becomes one array per column. Dates come back as ISO
+    text (parsed by NumPy) and the status as an integer code, so the ORM's
+    per-row date conversion never runs.
+    """
+    rows = Attendance.objects.order_by('student_id', 'subject_offering_id', 'date').annotate(
+        day=Cast('date', CharField()),
+        code=Case(When(status='absent', then=Value(1)), When(status='late', then=Value(2)), default=Value(0)),
+    ).values_list('student_id', 'subject_offering_id', 'day', 'code')
+    sql, params = rows.query.sql_with_params()
+
+    student_ids, offering_ids, dates, codes = [], [], [], []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while chunk := cursor.fetchmany(CHUNK_SIZE):
+            student_ids.append(np.array([row[0] for row in chunk], dtype=object))
+            offering_ids.append(np.fromiter((row[1] for row in chunk), np.int64, len(chunk)))
+            dates.append(np.array([row[2] for row in chunk], dtype='datetime64[D]'))
+            codes.append(np.fromiter((row[3] for row in chunk), np.int8, len(chunk)))
+    if not codes:
+        return (
+            np.zeros(0, dtype=object), np.zeros(0, dtype=np.int64), np.zeros(0, dtype='datetime64[D]'),
+            np.zeros(0, dtype=bool), np.zeros(0, dtype=bool),
+        )
+    codes = np.concatenate(codes)
+    return (
+        np.concatenate(student_ids),
+        np.concatenate(offering_ids),
+        np.concatenate(dates),
+        codes == 1,
+        codes == 2,
+    )
+
+
+def segment_starts(student_ids, offering_ids):
+    """Index of the first record of every (student, offering) run."""
+    if len(student_ids) == 0:
+        return np.zeros(0, dtype=np.int64)
+    changed = (student_ids[1:] != student_ids[:-1]) | (offering_ids[1:] != offering_ids[:-1])
+    return np.concatenate(([0], np.flatnonzero(changed) + 1))
+
+
+def absence_metrics(starts, absent, late, window):
+    """
+    Per-segment metrics for records split at ``starts`` (each segment in
+    date order). Returns a dict of arrays, one entry per segment.
+    """
+    total = len(absent)
+    ends = np.append(starts[1:], total)
+    counts = ends - starts
+    positions = np.arange(total)
+    segment = np.repeat(np.arange(len(starts)), counts)
+    offset = positions - starts[segment]  # meeting number within the segment
+
+    absent_i = absent.astype(np.int64)
+    late_f = late.astype(np.float64)
+    absences = np.add.reduceat(absent_i, starts) if total else np.zeros(0, dtype=np.int64)
+
+    # Absences in the window ending at every record, from one cumulative sum
+    cumulative = np.concatenate(([0], np.cumsum(absent_i)))
+    window_start = np.maximum(positions - window + 1, starts[segment])
+    in_window = cumulative[positions + 1] - cumulative[window_start]
+    window_size = positions - window_start + 1
+    rolling_rate = in_window / window_size
+    # Peak only over full windows (or the whole segment when it is shorter)
+    full = (window_size == window) | (window_size == counts[segment])
+    peak = np.maximum.reduceat(np.where(full, rolling_rate, 0.0), starts) if total else np.zeros(0)
+    recent = rolling_rate[ends - 1] if total else np.zeros(0)
+
+    # Consecutive absences ending at every record: distance to the last
+    # present/late record, or to just before the segment start
+    resets = np.where(~absent, positions, -1)
+    resets = np.maximum(resets, starts[segment] - 1)
+    streak = positions - np.maximum.accumulate(resets)
+    longest = np.maximum.reduceat(streak, starts) if total else np.zeros(0, dtype=np.int64)
+    current = streak[ends - 1] if total else np.zeros(0, dtype=np.int64)
+
+    # Least-squares slope of late (0/1) against meeting number
+    if total:
+        sum_x = np.add.reduceat(offset.astype(np.float64), starts)
+        sum_y = np.add.reduceat(late_f, starts)
+        sum_xy = np.add.reduceat(offset * late_f, starts)
+        sum_xx = np.add.reduceat((offset * offset).astype(np.float64), starts)
+        denominator = counts * sum_xx - sum_x * sum_x
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denominator > 0, (counts * sum_xy - sum_x * sum_y) / denominator, 0.0)
+    else:
+        slope = np.zeros(0)
+
+    return {
+        'records': counts,
+        'absence_rate': absences / np.maximum(counts, 1),
+        'recent_absence_rate': recent,
+        'peak_absence_rate': peak,
+        'longest_streak': longest,
+        'current_streak': current,
+        'late_trend': slope,
+    }
+
+
+def flag_reasons(metrics, thresholds):
+    """A reasons string per segment; empty for segments that are not flagged."""
+    eligible = metrics['records'] >= thresholds.min_records
+    checks = zip(
+        [
+            metrics['absence_rate'] >= thresholds.absence_rate,
+            metrics['recent_absence_rate'] >= thresholds.recent_absence_rate,
+            metrics['current_streak'] >= thresholds.streak,
+            metrics['late_trend'] >= thresholds.late_trend,
+        ],
+        REASONS,
+    )
+    reasons = np.full(len(eligible), '', dtype=object)
+    for hit, label in checks:
+        hit = hit & eligible
+        reasons[hit] = np.where(reasons[hit] == '', label, reasons[hit] + ', ' + label)
+    return reasons
+
+
+def detect_absenteeism(thresholds=Thresholds(), timings=None):
+    """
+    Recompute AbsenteeismFlag for all live attendance. Returns
+    ``(pairs_checked, pairs_flagged)``. Seconds spent loading, computing
+    and writing are stored in ``timings`` when a dict is passed.
+    """
+    started = time.perf_counter()
+    student_ids, offering_ids, dates, absent, late = load_status_arrays()
+    loaded = time.perf_counter()
+    starts = segment_starts(student_ids, offering_ids)
+    metrics = absence_metrics(starts, absent, late, thresholds.window)
+    reasons = flag_reasons(metrics, thresholds)
+    ends = np.append(starts[1:], len(student_ids))
+    computed = time.perf_counter()
+
+    computed_at = timezone.now()
+    flagged = np.flatnonzero(reasons != '')
+    flags = [
+        AbsenteeismFlag(
+            student_id=student_ids[starts[i]],
+            subject_offering_id=int(offering_ids[starts[i]]),
+            records=int(metrics['records'][i]),
+            absence_rate=float(metrics['absence_rate'][i]),
+            recent_absence_rate=float(metrics['recent_absence_rate'][i]),
+            peak_absence_rate=float(metrics['peak_absence_rate'][i]),
+            longest_streak=int(metrics['longest_streak'][i]),
+            current_streak=int(metrics['current_streak'][i]),
+            late_trend=float(metrics['late_trend'][i]),
+            reasons=reasons[i],
+            last_date=dates[ends[i] - 1].item(),
+            computed_at=computed_at,
+        )
+        for i in flagged
+    ]
+    with transaction.atomic():
+        AbsenteeismFlag.objects.all().delete()
+        AbsenteeismFlag.objects.bulk_create(flags, batch_size=1000)
+    if timings is not None:
+        timings.update(load=loaded - started, metrics=computed - loaded, write=time.perf_counter() - computed)
+    return len(starts), len(flags)
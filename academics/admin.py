@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Subject, Course, Semester, SubjectOffering,Attendance
+from .models import Subject, Course, Semester, SubjectOffering,Attendance, AttendanceArchive, AttendanceTally, AttendanceSyncReceipt, AbsenteeismFlag
+from .services import delete_attendance
 
 @admin.register(Subject)
 class SubjectAdmin(admin.ModelAdmin):
@@ -23,4 +24,32 @@ class SubjectOfferingAdmin(admin.ModelAdmin):
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = ('student','subject_offering','status','time','date')
-    
+
+    # Keep the tallies right (Attendance has no post_delete receiver)
+    def delete_model(self, request, obj):
+        delete_attendance(Attendance.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        delete_attendance(queryset)
+
+@admin.register(AttendanceArchive)
+class AttendanceArchiveAdmin(admin.ModelAdmin):
+    list_display = ('student','subject_offering','status','time','date','school_year')
+    list_filter = ('school_year',)
+    list_select_related = ('student', 'subject_offering__subject')
+
+@admin.register(AttendanceTally)
+class AttendanceTallyAdmin(admin.ModelAdmin):
+    list_display = ('student', 'subject_offering', 'present', 'late', 'absent', 'first_date', 'last_date')
+    list_select_related = ('student', 'subject_offering__subject')
+
+@admin.register(AttendanceSyncReceipt)
+class AttendanceSyncReceiptAdmin(admin.ModelAdmin):
+    list_display = ('teacher', 'key', 'created_at')
+    search_fields = ('key',)
+    list_select_related = ('teacher',)
+
+@admin.register(AbsenteeismFlag)
+class AbsenteeismFlagAdmin(admin.ModelAdmin):
+    list_display = ('student', 'subject_offering', 'absence_rate', 'current_streak', 'reasons', 'computed_at')
+    list_select_related = ('student', 'subject_offering__subject')
@@ -0,0 +1,144 @@
+"""
+Archive of closed school years' attendance.
+
+``archive_school_year()`` moves a school year's Attendance rows into
+AttendanceArchive in small batches. Each batch is its own short
+transaction, so teachers marking the current term are never locked out
+for the length of the whole move. AttendanceTally already includes
+archived rows (see services.refresh_attendance_tallies), so totals do
+not change when a year is archived.
+
+Reports that take a date range call ``needs_archive()`` and only read
+the archive table when the range reaches back into archived dates.
+Archived school years are read-only: attendance writes check
+``is_archived()`` and raise SchoolYearArchived.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils.dateparse import parse_date
+
+from .models import Attendance, AttendanceArchive
+from .signals import attendance_bulk_saved
+
+
+ARCHIVED_UNTIL_CACHE_KEY = 'academics:archive:archived_until'
+
+# The archive command runs in its own process and can only clear its own
+# local-memory cache, so other processes pick up a new archive within this
+ARCHIVED_UNTIL_TIMEOUT = 60
+
+# Stays below SQLite's bound-parameter limit for the DELETE ... IN (...)
+DEFAULT_BATCH_SIZE = 500
+
+_NOTHING_ARCHIVED = 'none'
+
+
+class SchoolYearArchived(ValueError):
+    """Attendance was written for a school year that has been archived."""
+
+
+def archived_school_years(school_years):
+    """
+    Which of ``school_years`` have rows in the archive. Read from the
+    database every time (one query on the school_year index) so a write
+    guard never trusts a stale cache.
+    """
+    return set(
+        AttendanceArchive.objects.filter(school_year__in=set(school_years))
+        .order_by().values_list('school_year', flat=True).distinct()
+    )
+
+
+def is_archived(school_year):
+    return AttendanceArchive.objects.filter(school_year=school_year).exists()
+
+
+def archived_until():
+    """
+    The latest archived attendance date, or None if the archive is empty.
+    Cached for ARCHIVED_UNTIL_TIMEOUT seconds.
+    """
+    latest = cache.get(ARCHIVED_UNTIL_CACHE_KEY)
+    if latest is None:
+        latest = AttendanceArchive.objects.aggregate(latest=Max('date'))['latest'] or _NOTHING_ARCHIVED
+        cache.set(ARCHIVED_UNTIL_CACHE_KEY, latest, timeout=ARCHIVED_UNTIL_TIMEOUT)
+    return None if latest == _NOTHING_ARCHIVED else latest
+
+
+def needs_archive(start_date=None):
+    """
+    Whether a report starting at ``start_date`` (a date, an ISO string, or
+    None for "from the beginning") reaches into archived attendance.
+    """
+    latest = archived_until()
+    if latest is None:
+        return False
+    if not start_date:
+        return True
+    if isinstance(start_date, str):
+        start_date = parse_date(start_date)
+        if start_date is None:
+            return True
+    return start_date <= latest
+
+
+def _delete_attendance(ids):
+    # One plain DELETE, whatever receivers Attendance gains; the tallies
+    # already account for the archived rows
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {Attendance._meta.db_table} WHERE id IN ({placeholders})',
+            ids,
+        )
+
+
+def archive_school_year(school_year, batch_size=DEFAULT_BATCH_SIZE, pause=0.0, progress=None):
+    """
+    Move every Attendance row of offerings in ``school_year`` into
+    AttendanceArchive, ``batch_size`` rows per transaction, sleeping
+    ``pause`` seconds between batches to let other writers in.
+
+    Safe to re-run after an interruption: rows already copied are skipped.
+    ``progress`` is an optional callable receiving the running total.
+    Returns the number of rows moved.
+    """
+    rows = Attendance.objects.filter(subject_offering__school_year=school_year).order_by('pk')
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                rows.values_list('id', 'student_id', 'subject_offering_id', 'date', 'time', 'status')[:batch_size]
+            )
+            if not batch:
+                break
+            AttendanceArchive.objects.bulk_create(
+                [
+                    AttendanceArchive(
+                        id=pk,
+                        student_id=student_id,
+                        subject_offering_id=offering_id,
+                        school_year=school_year,
+                        date=day,
+                        time=clock,
+                        status=status,
+                    )
+                    for pk, student_id, offering_id, day, clock, status in batch
+                ],
+                ignore_conflicts=True,
+            )
+            _delete_attendance([row[0] for row in batch])
+            attendance_bulk_saved.send(
+                sender=Attendance, offering_ids=sorted({row[2] for row in batch}),
+            )
+
+        moved += len(batch)
+        cache.delete(ARCHIVED_UNTIL_CACHE_KEY)
+        if progress:
+            progress(moved)
+        if pause:
+            time.sleep(pause)
+    return moved
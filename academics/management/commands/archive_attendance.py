@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from academics.archive import DEFAULT_BATCH_SIZE, archive_school_year
+from academics.models import Semester
+
+
+class Command(BaseCommand):
+    help = "Move a closed school year's attendance into the archive table, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'school_year',
+            help='School year of the offerings to archive, e.g. 2024-2025',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Rows moved per transaction (default {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.05,
+            help='Seconds to wait between batches so other writers get the database (default 0.05)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Archive even if the school year is not older than the latest semester',
+        )
+
+    def handle(self, *args, **options):
+        school_year = options['school_year']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        current = Semester.objects.aggregate(latest=Max('school_year'))['latest']
+        if not options['force'] and (current is None or school_year >= current):
+            raise CommandError(
+                f'{school_year} is not a closed school year (latest semester: {current or "none"}). '
+                'Use --force to archive it anyway.'
+            )
+
+        def progress(moved):
+            self.stdout.write(f'  {moved} rows archived...')
+
+        moved = archive_school_year(
+            school_year,
+            batch_size=batch_size,
+            pause=options['pause'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} attendance rows of {school_year}.'))
@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from datetime import date, timedelta
+import time
+
+import numpy as np
+
+from academics.absenteeism import detect_absenteeism
+from academics.models import Attendance, Course, Subject, SubjectOffering
+from accounts.models import CustomUser, StudentProfile
+
+
+# Rows handed to executemany() at a time while seeding
+SEED_BATCH = 50_000
+
+
+class _Rollback(Exception):
+    """Raised to discard the seeded attendance and flags after the run."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark detect_absenteeism() end to end, from reading attendance to "
+        "writing flags (seeded data is rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=10_000)
+        parser.add_argument('--subjects', type=int, default=8)
+        parser.add_argument('--days', type=int, default=180)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                seeded = self._seed(options['students'], options['subjects'], options['days'])
+                self.stdout.write(f"Seeded {seeded} attendance rows in {time.perf_counter() - started:.1f}s")
+
+                timings = {}
+                started = time.perf_counter()
+                checked, flagged = detect_absenteeism(timings=timings)
+                total = time.perf_counter() - started
+
+                self.stdout.write(f"{Attendance.objects.count()} records, {checked} student/offering pairs")
+                self.stdout.write(f"  load               {timings['load']:>8.3f}s")
+                self.stdout.write(f"  metrics            {timings['metrics']:>8.3f}s")
+                self.stdout.write(f"  write flags        {timings['write']:>8.3f}s")
+                self.stdout.write(f"  total              {total:>8.3f}s ({flagged} pairs flagged)")
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, students, subjects, days):
+        course = Course.objects.create(name='BENCH-ABS', description='Benchmark course')
+        subject_rows = Subject.objects.bulk_create([
+            Subject(course=course, subject_code=f'ABS-{i}', name=f'Bench {i}', semester_number='1st')
+            for i in range(subjects)
+        ])
+        offerings = SubjectOffering.objects.bulk_create([
+            SubjectOffering(subject=subject, year='1st', section='a', school_year='bench')
+            for subject in subject_rows
+        ])
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'abs-{i}', email=f'abs-{i}@bench.local', role='student')
+            for i in range(students)
+        ], batch_size=5000)
+        profiles = StudentProfile.objects.bulk_create([
+            StudentProfile(user=user, student_ID=f'ABS{i:07d}', first_name='Bench', last_name=str(i),
+                           course=course, year='1st', section='a', is_regular='reg')
+            for i, user in enumerate(users)
+        ], batch_size=5000)
+
+        # Bypass model instances: 10k students x 8 subjects x 180 days is 14.4M rows
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(name) for name in ('student_id', 'subject_offering_id', 'date', 'time', 'status'))
+        sql = f'INSERT INTO {quote(Attendance._meta.db_table)} ({columns}) VALUES (%s, %s, %s, %s, %s)'
+        rng = np.random.default_rng(0)
+        statuses = np.array(['present', 'absent', 'late'], dtype=object)
+        dates = [(date(2025, 1, 1) + timedelta(days=day)).isoformat() for day in range(days)]
+        seeded = 0
+        batch = []
+        with connection.cursor() as cursor:
+            for profile in profiles:
+                for offering in offerings:
+                    marks = statuses[rng.choice(3, size=days, p=[0.85, 0.10, 0.05])]
+                    batch.extend(
+                        (profile.pk, offering.pk, day, '08:00', status) for day, status in zip(dates, marks)
+                    )
+                if len(batch) >= SEED_BATCH:
+                    cursor.executemany(sql, batch)
+                    seeded += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(sql, batch)
+                seeded += len(batch)
+        return seeded
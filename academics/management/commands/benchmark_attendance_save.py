@@ -0,0 +1,101 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from datetime import date
+import random
+import time
+
+from academics.models import Attendance, Course, Subject, SubjectOffering
+from academics.services import save_attendance_roster
+from accounts.models import CustomUser, StudentProfile
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark data at the end of each run."""
+
+
+class _QueryCounter:
+    """Counts executed statements without keeping them in memory."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the per-student vs bulk attendance save paths (all data is rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[40, 200, 1000],
+            help='Roster sizes to benchmark (default: 40 200 1000)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'students':>8}  {'path':<10} {'pass':<7} {'queries':>8} {'seconds':>9}"
+        )
+        for size in options['sizes']:
+            for path in ('loop', 'bulk'):
+                try:
+                    with transaction.atomic():
+                        offering, students = self._seed(size)
+                        for label in ('insert', 'update'):
+                            statuses = {
+                                s.student_ID: random.choice(['present', 'absent', 'late'])
+                                for s in students
+                            }
+                            queries, seconds = self._run(path, offering, students, statuses)
+                            self.stdout.write(
+                                f"{size:>8}  {path:<10} {label:<7} {queries:>8} {seconds:>9.4f}"
+                            )
+                        raise _Rollback
+                except _Rollback:
+                    pass
+
+    def _seed(self, size):
+        course = Course.objects.create(name='BENCH', description='Benchmark course')
+        subject = Subject.objects.create(
+            course=course, subject_code='BENCH-101', name='Benchmark',
+            semester_number='1st', year_level='1st',
+        )
+        offering = SubjectOffering.objects.create(
+            subject=subject, year='1st', section='a', school_year='bench',
+        )
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'bench-{i}', email=f'bench-{i}@bench.local', role='student')
+            for i in range(size)
+        ])
+        students = StudentProfile.objects.bulk_create([
+            StudentProfile(
+                user=user, student_ID=f'B{i:07d}', first_name='Bench', last_name=str(i),
+                course=course, year='1st', section='a', is_regular='reg',
+            )
+            for i, user in enumerate(users)
+        ])
+        return offering, students
+
+    def _run(self, path, offering, students, statuses):
+        today = date.today()
+        now = '08:00'
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            if path == 'loop':
+                with transaction.atomic():
+                    for student in students:
+                        Attendance.objects.update_or_create(
+                            student=student,
+                            subject_offering=offering,
+                            date=today,
+                            defaults={'status': statuses[student.student_ID], 'time': now},
+                        )
+            else:
+                save_attendance_roster(offering, today, now, statuses)
+            elapsed = time.perf_counter() - started
+        return counter.count, elapsed
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from academics.models import SubjectOffering, Subject
+from academics.services import enroll_offerings
 from accounts.models import TeacherProfile, StudentProfile
 from accounts.constants import YEAR_LEVEL_CHOICES, SECTION_CHOICES
 import random
@@ -38,7 +39,7 @@ class Command(BaseCommand):
         self.stdout.write(f'\nFound {subjects.count()} subjects.')
 
         # Get all students to determine which year/section combinations exist
-        students = StudentProfile.objects.all()
+        students = StudentProfile.objects.select_related('course')
         year_section_combinations = set()
         for student in students:
             if student.course and student.year and student.section:
@@ -59,6 +60,7 @@ class Command(BaseCommand):
         teacher_index = 0
         created_count = 0
         skipped_count = 0
+        new_offerings = []
 
         for subject in subjects:
             if not subject.course:
@@ -123,26 +125,17 @@ class Command(BaseCommand):
                         f'to {teacher.first_name} {teacher.last_name}'
                     )
 
-                    # Enroll relevant students
-                    students_to_enroll = StudentProfile.objects.filter(
-                        course=course,
-                        year=year,
-                        section=section,
-                    )
-                    enrolled_count = 0
-                    for student in students_to_enroll:
-                        student.subjects.add(subject)
-                        enrolled_count += 1
-                    if enrolled_count > 0:
-                        self.stdout.write(
-                            f'  Enrolled {enrolled_count} student(s) in {subject.subject_code}'
-                        )
+                    new_offerings.append(offering)
+
+        # Enroll relevant students for all new offerings in one pass
+        enrolled_count = enroll_offerings(new_offerings)
 
         self.stdout.write(
             self.style.SUCCESS(
                 f'\nSuccessfully created and assigned!\n'
                 f'Created/Assigned: {created_count} offerings\n'
-                f'Skipped (already assigned): {skipped_count} offerings'
+                f'Skipped (already assigned): {skipped_count} offerings\n'
+                f'Enrolled: {enrolled_count} student subject(s)'
             )
         )
 
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from academics.absenteeism import Thresholds, detect_absenteeism
+
+
+class Command(BaseCommand):
+    help = "Recompute the flagged-students table from attendance (run nightly)"
+
+    def add_arguments(self, parser):
+        defaults = Thresholds()
+        parser.add_argument('--window', type=int, default=defaults.window,
+                            help=f'Meetings in the rolling window (default {defaults.window})')
+        parser.add_argument('--min-records', type=int, default=defaults.min_records,
+                            help=f'Skip pairs with fewer meetings (default {defaults.min_records})')
+        parser.add_argument('--absence-rate', type=float, default=defaults.absence_rate,
+                            help=f'Overall absence rate that flags a student (default {defaults.absence_rate})')
+        parser.add_argument('--recent-absence-rate', type=float, default=defaults.recent_absence_rate,
+                            help=f'Absence rate over the last window (default {defaults.recent_absence_rate})')
+        parser.add_argument('--streak', type=int, default=defaults.streak,
+                            help=f'Ongoing consecutive absences (default {defaults.streak})')
+        parser.add_argument('--late-trend', type=float, default=defaults.late_trend,
+                            help=f'Rise in late rate per meeting (default {defaults.late_trend})')
+
+    def handle(self, *args, **options):
+        thresholds = Thresholds(
+            window=options['window'],
+            min_records=options['min_records'],
+            absence_rate=options['absence_rate'],
+            recent_absence_rate=options['recent_absence_rate'],
+            streak=options['streak'],
+            late_trend=options['late_trend'],
+        )
+        started = time.perf_counter()
+        checked, flagged = detect_absenteeism(thresholds)
+        self.stdout.write(self.style.SUCCESS(
+            f'Flagged {flagged} of {checked} student/offering pairs in {time.perf_counter() - started:.2f}s.'
+        ))
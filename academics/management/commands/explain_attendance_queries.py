@@ -0,0 +1,152 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from datetime import date, time, timedelta
+import re
+
+from academics.models import Attendance, Course, Subject, SubjectOffering
+from accounts.models import CustomUser, StudentProfile, TeacherProfile
+from reports.views import summary_offerings
+
+
+# A plan line that walks the attendance table itself rather than an index
+FULL_SCAN = re.compile(r'SCAN academics_attendance\b(?!.*USING (COVERING )?INDEX)')
+
+
+class _Rollback(Exception):
+    """Raised to discard seeded rows once the plans have been checked."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plan of each dashboard/report attendance query and fail "
+        "if any of them falls back to a full scan of academics_attendance"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed this many synthetic attendance rows first, e.g. 1000000 '
+                 '(rolled back afterwards)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Plan checks are written against SQLite EXPLAIN QUERY PLAN output.')
+
+        failures = []
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self._seed(options['seed'])
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE')
+                failures = self._check_plans()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Full table scan in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('All attendance queries use an index.'))
+
+    def _queries(self):
+        offering = SubjectOffering.objects.filter(teacher__isnull=False).first()
+        student = StudentProfile.objects.first()
+        if offering is None or student is None:
+            raise CommandError('Need at least one student and one assigned offering (try --seed).')
+
+        teacher = offering.teacher
+        today = date.today()
+        start = today - timedelta(days=30)
+        teacher_offerings = SubjectOffering.objects.filter(teacher=teacher)
+
+        return {
+            'admin_dashboard recent': Attendance.objects.select_related(
+                'student', 'subject_offering__subject'
+            ).order_by('-date', '-time')[:8],
+            'admin_dashboard status chart': Attendance.objects.filter(
+                student__year=student.year,
+                subject_offering__subject_id=offering.subject_id,
+            ).values('status').annotate(count=Count('id')),
+            'teacher_home today': Attendance.objects.filter(
+                subject_offering__teacher=teacher, date=today,
+            ),
+            'teacher_home recent': Attendance.objects.filter(
+                subject_offering__teacher=teacher,
+            ).order_by('-date', '-time')[:5],
+            'mark_attendance existing': Attendance.objects.filter(
+                subject_offering=offering, date=today,
+            ).values_list('student_id', 'status'),
+            'attendance_summary counts': summary_offerings(teacher, start, today),
+            'detailed_attendance': Attendance.objects.filter(
+                subject_offering__in=teacher_offerings, date__range=[start, today],
+            ),
+            'student_attendance_overview': student.attendances.filter(
+                date__range=[start, today],
+            ).order_by('-date', '-time'),
+        }
+
+    def _check_plans(self):
+        failures = []
+        for label, queryset in self._queries().items():
+            plan = queryset.explain()
+            scanned = any(FULL_SCAN.search(line) for line in plan.splitlines())
+            style = self.style.ERROR if scanned else self.style.SUCCESS
+            self.stdout.write(style(f"{'FULL SCAN' if scanned else 'index'}: {label}"))
+            self.stdout.write(f'  {plan.replace(chr(10), chr(10) + "  ")}')
+            if scanned:
+                failures.append(label)
+        return failures
+
+    def _seed(self, rows, students=500, offerings=20):
+        days = -(-rows // (students * offerings))
+        self.stdout.write(
+            f'Seeding {students} students x {offerings} offerings x {days} days...'
+        )
+
+        course = Course.objects.create(name='PLAN', description='Query plan check')
+        teacher_user = CustomUser.objects.create(username='plan-teacher', role='teacher')
+        teacher = TeacherProfile.objects.create(user=teacher_user, first_name='Plan', last_name='Teacher')
+        subjects = Subject.objects.bulk_create([
+            Subject(course=course, subject_code=f'PLAN-{i}', name=f'Plan {i}',
+                    semester_number='1st', year_level='1st')
+            for i in range(offerings)
+        ])
+        offering_rows = SubjectOffering.objects.bulk_create([
+            SubjectOffering(subject=subject, teacher=teacher if i % 2 else None,
+                            year='1st', section='a', school_year='plan')
+            for i, subject in enumerate(subjects)
+        ])
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'plan-{i}', email=f'plan-{i}@plan.local', role='student')
+            for i in range(students)
+        ])
+        student_rows = StudentProfile.objects.bulk_create([
+            StudentProfile(user=user, student_ID=f'P{i:07d}', first_name='Plan', last_name=str(i),
+                           course=course, year='1st', section='a', is_regular='reg')
+            for i, user in enumerate(users)
+        ])
+
+        statuses = ('present', 'present', 'present', 'late', 'absent')
+        first_day = date.today() - timedelta(days=days - 1)
+        batch = []
+        created = 0
+        for day in range(days):
+            current = first_day + timedelta(days=day)
+            for offering in offering_rows:
+                for index, student in enumerate(student_rows):
+                    batch.append(Attendance(
+                        student=student, subject_offering=offering, date=current,
+                        time=time(8 + index % 9), status=statuses[(index + day) % 5],
+                    ))
+                    created += 1
+                    if created >= rows:
+                        break
+                if len(batch) >= 20000 or created >= rows:
+                    Attendance.objects.bulk_create(batch, batch_size=2000)
+                    batch = []
+                if created >= rows:
+                    return
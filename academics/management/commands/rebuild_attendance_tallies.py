@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from academics.models import AttendanceTally, SubjectOffering
+from academics.services import refresh_attendance_tallies
+
+
+class Command(BaseCommand):
+    help = "Rebuild the AttendanceTally rollup table from Attendance"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--offering',
+            type=int,
+            help='Only rebuild tallies for this subject offering id',
+        )
+
+    def handle(self, *args, **options):
+        offering_id = options['offering']
+
+        # One transaction, so dashboards keep reading the old tallies
+        # (never an empty table) until the rebuild commits
+        with transaction.atomic():
+            if offering_id:
+                offering_ids = [offering_id]
+            else:
+                offering_ids = list(SubjectOffering.objects.values_list('id', flat=True))
+                # Drop everything first so tallies of removed offerings cannot linger
+                AttendanceTally.objects.all().delete()
+
+            total = 0
+            for index, oid in enumerate(offering_ids, start=1):
+                total += refresh_attendance_tallies(subject_offering_id=oid)
+                if index % 50 == 0:
+                    self.stdout.write(f'  {index}/{len(offering_ids)} offerings processed...')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt {total} tallies across {len(offering_ids)} offering(s).'
+            )
+        )
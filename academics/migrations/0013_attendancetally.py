@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0012_alter_subject_unique_together_and_more'),
+        ('accounts', '0004_alter_customuser_role_alter_parentprofile_first_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_tallies', to='accounts.studentprofile')),
+                ('subject_offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_tallies', to='academics.subjectoffering')),
+            ],
+            options={
+                'unique_together': {('student', 'subject_offering')},
+            },
+        ),
+    ]
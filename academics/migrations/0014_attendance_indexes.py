@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0013_attendancetally'),
+        ('accounts', '0004_alter_customuser_role_alter_parentprofile_first_name_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['subject_offering', 'date'], name='att_offering_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['student', 'date', 'time'], name='att_student_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'time'], name='att_date_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['subject_offering', 'date', 'status'], name='att_offering_date_status_idx'),
+        ),
+    ]
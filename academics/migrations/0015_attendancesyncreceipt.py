@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0014_attendance_indexes'),
+        ('accounts', '0005_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceSyncReceipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('result', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('teacher', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_sync_receipts', to='accounts.teacherprofile')),
+            ],
+            options={
+                'unique_together': {('teacher', 'key')},
+            },
+        ),
+    ]
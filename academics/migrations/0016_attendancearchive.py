@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0015_attendancesyncreceipt'),
+        ('accounts', '0005_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('school_year', models.CharField(max_length=10)),
+                ('date', models.DateField()),
+                ('time', models.TimeField()),
+                ('status', models.CharField(choices=[('present', 'Present'), ('absent', 'Absent'), ('late', 'Late')], max_length=10)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='accounts.studentprofile')),
+                ('subject_offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='academics.subjectoffering')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['subject_offering', 'date'], name='att_archive_offering_date_idx'), models.Index(fields=['student', 'date', 'time'], name='att_archive_student_date_idx')],
+            },
+        ),
+    ]
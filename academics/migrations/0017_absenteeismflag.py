@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0016_attendancearchive'),
+        ('accounts', '0005_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AbsenteeismFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('records', models.PositiveIntegerField()),
+                ('absence_rate', models.FloatField()),
+                ('recent_absence_rate', models.FloatField()),
+                ('peak_absence_rate', models.FloatField()),
+                ('longest_streak', models.PositiveIntegerField()),
+                ('current_streak', models.PositiveIntegerField()),
+                ('late_trend', models.FloatField()),
+                ('reasons', models.CharField(max_length=255)),
+                ('last_date', models.DateField()),
+                ('computed_at', models.DateTimeField()),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='absenteeism_flags', to='accounts.studentprofile')),
+                ('subject_offering', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='absenteeism_flags', to='academics.subjectoffering')),
+            ],
+            options={
+                'unique_together': {('student', 'subject_offering')},
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def backfill_tallies(apps, schema_editor):
+    from academics.services import refresh_attendance_tallies
+
+    refresh_attendance_tallies(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0017_absenteeismflag'),
+    ]
+
+    operations = [
+        # Attendance recorded before 0013 has no tallies yet
+        migrations.RunPython(backfill_tallies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0018_backfill_attendance_tallies'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendancesyncreceipt',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0019_attendancesyncreceipt_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendancearchive',
+            name='school_year',
+            field=models.CharField(db_index=True, max_length=20),
+        ),
+    ]
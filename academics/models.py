@@ -109,10 +109,154 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ('student', 'subject_offering', 'date')
+        indexes = [
+            # Per-class day lookups (mark attendance, teacher dashboard)
+            models.Index(fields=['subject_offering', 'date'], name='att_offering_date_idx'),
+            # A student's history in date order (overview, timeline)
+            models.Index(fields=['student', 'date', 'time'], name='att_student_date_time_idx'),
+            # Most-recent-first listings ordered by -date, -time
+            models.Index(fields=['date', 'time'], name='att_date_time_idx'),
+            # Status breakdowns per class and date range without touching the table
+            models.Index(fields=['subject_offering', 'date', 'status'], name='att_offering_date_status_idx'),
+        ]
 
     def __str__(self):
         return (
             f"{self.student} - "
             f"{self.subject_offering.subject.subject_code} - "
             f"{self.date} - {self.status}"
-        )
\ No newline at end of file
+        )
+
+
+class AttendanceArchive(models.Model):
+    """
+    Attendance of a closed school year, moved out of the live table by the
+    ``archive_attendance`` command (see academics/archive.py).
+
+    Rows keep their original Attendance id, so (date, time, id) stays
+    unique across both tables, and carry only the two indexes the
+    historical reports read by, plus school_year for the check that keeps
+    archived years read-only.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    student = models.ForeignKey(
+        "accounts.StudentProfile",
+        on_delete=models.CASCADE,
+        related_name='archived_attendances',
+    )
+    subject_offering = models.ForeignKey(
+        "academics.SubjectOffering",
+        on_delete=models.CASCADE,
+        related_name='archived_attendances',
+    )
+    school_year = models.CharField(max_length=20, db_index=True)
+    date = models.DateField()
+    time = models.TimeField()
+    status = models.CharField(max_length=10, choices=Attendance.STATUS_CHOICES)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['subject_offering', 'date'], name='att_archive_offering_date_idx'),
+            models.Index(fields=['student', 'date', 'time'], name='att_archive_student_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.subject_offering_id} - {self.date} - {self.status} (archived)"
+
+
+class AttendanceTally(models.Model):
+    """
+    Rolled-up attendance counts for one student in one subject offering.
+
+    Maintained from Attendance writes (see academics.signals and
+    academics.services.apply_attendance_changes) so dashboards can read
+    totals without scanning the attendance history.
+    """
+
+    student = models.ForeignKey(
+        "accounts.StudentProfile",
+        on_delete=models.CASCADE,
+        related_name='attendance_tallies',
+    )
+    subject_offering = models.ForeignKey(
+        "academics.SubjectOffering",
+        on_delete=models.CASCADE,
+        related_name='attendance_tallies',
+    )
+    present = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    first_date = models.DateField(null=True, blank=True)
+    last_date = models.DateField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('student', 'subject_offering')
+
+    def __str__(self):
+        return (
+            f"{self.student_id} - {self.subject_offering_id}: "
+            f"{self.present}P/{self.late}L/{self.absent}A"
+        )
+
+    @property
+    def total(self):
+        return self.present + self.late + self.absent
+
+
+class AttendanceSyncReceipt(models.Model):
+    """
+    Result of one applied item of an offline attendance sync batch, keyed
+    by the client-generated idempotency key so a retried upload is
+    answered from here instead of being written twice.
+    """
+
+    teacher = models.ForeignKey(
+        "accounts.TeacherProfile",
+        on_delete=models.CASCADE,
+        related_name='attendance_sync_receipts',
+    )
+    key = models.CharField(max_length=64)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)  # for pruning
+
+    class Meta:
+        unique_together = ('teacher', 'key')
+
+    def __str__(self):
+        return f"{self.teacher_id} - {self.key}"
+
+
+class AbsenteeismFlag(models.Model):
+    """
+    A student at risk in one subject offering, written by the
+    ``detect_absenteeism`` batch job (see academics/absenteeism.py).
+    Each run replaces the whole table.
+    """
+
+    student = models.ForeignKey(
+        "accounts.StudentProfile",
+        on_delete=models.CASCADE,
+        related_name='absenteeism_flags',
+    )
+    subject_offering = models.ForeignKey(
+        "academics.SubjectOffering",
+        on_delete=models.CASCADE,
+        related_name='absenteeism_flags',
+    )
+    records = models.PositiveIntegerField()
+    absence_rate = models.FloatField()
+    recent_absence_rate = models.FloatField()
+    peak_absence_rate = models.FloatField()
+    longest_streak = models.PositiveIntegerField()
+    current_streak = models.PositiveIntegerField()
+    late_trend = models.FloatField()  # change in late rate per class meeting
+    reasons = models.CharField(max_length=255)
+    last_date = models.DateField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('student', 'subject_offering')
+
+    def __str__(self):
+        return f"{self.student_id} - {self.subject_offering_id}: {self.reasons}"
@@ -0,0 +1,733 @@
+from datetime import timedelta
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_time
+import pandas as pd
+import time
+
+from accounts.constants import SECTION_CHOICES
+from accounts.models import StudentProfile
+
+from .archive import SchoolYearArchived, archived_school_years, is_archived
+from .models import (
+    Attendance,
+    AttendanceArchive,
+    AttendanceSyncReceipt,
+    AttendanceTally,
+    SubjectOffering,
+)
+from .signals import attendance_bulk_saved
+
+
+VALID_STATUSES = {value for value, _label in Attendance.STATUS_CHOICES}
+
+EMPTY_TALLY = {'present': 0, 'late': 0, 'absent': 0, 'total': 0}
+
+# Fallback bound on roster staleness; writes invalidate it sooner
+ROSTER_CACHE_TIMEOUT = 60 * 60
+
+
+def collect_roster_statuses(post_data, students):
+    """
+    Build a {student_ID: status} map from the posted ``status_<student_ID>``
+    fields of the mark-attendance form, skipping blank or unknown values.
+    """
+    statuses = {}
+    for student in students:
+        status = post_data.get(f'status_{student.student_ID}')
+        if status in VALID_STATUSES:
+            statuses[student.student_ID] = status
+    return statuses
+
+
+def save_attendance_roster(offering, attendance_date, attendance_time, statuses):
+    """
+    Write a whole class roster for one offering and date in a single
+    transaction.
+
+    ``statuses`` maps student_ID -> status. Rows are upserted with one
+    INSERT ... ON CONFLICT on the (student, subject_offering, date) unique
+    constraint instead of one update_or_create per student.
+
+    Returns a ``(created, updated)`` tuple of row counts. Raises
+    SchoolYearArchived if the offering's school year has been archived.
+    """
+    if not statuses:
+        return 0, 0
+    if is_archived(offering.school_year):
+        raise SchoolYearArchived(f"Attendance for school year {offering.school_year} is archived and read-only.")
+
+    with transaction.atomic():
+        previous = dict(
+            Attendance.objects.select_for_update()
+            .filter(subject_offering=offering, date=attendance_date)
+            .values_list('student_id', 'status')
+        )
+
+        rows = [
+            Attendance(
+                student_id=student_id,
+                subject_offering=offering,
+                date=attendance_date,
+                time=attendance_time,
+                status=status,
+            )
+            for student_id, status in statuses.items()
+        ]
+        Attendance.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['student', 'subject_offering', 'date'],
+            update_fields=['status', 'time'],
+        )
+        # bulk_create does not send post_save, so update the rollups here
+        apply_attendance_changes(
+            (student_id, offering.pk, attendance_date, previous.get(student_id), status)
+            for student_id, status in statuses.items()
+        )
+        attendance_bulk_saved.send(sender=Attendance, offering_ids=[offering.pk])
+
+    updated = len(set(previous).intersection(statuses))
+    created = len(rows) - updated
+    return created, updated
+
+
+# -------------------------------
+# Attendance tallies
+# -------------------------------
+def _grouped_tallies(model, filters):
+    return (
+        model.objects.filter(**filters)
+        .order_by()
+        .values('student_id', 'subject_offering_id')
+        .annotate(
+            present=Count('pk', filter=Q(status='present')),
+            late=Count('pk', filter=Q(status='late')),
+            absent=Count('pk', filter=Q(status='absent')),
+            first_date=Min('date'),
+            last_date=Max('date'),
+        )
+    )
+
+
+def refresh_attendance_tallies(apps=global_apps, **filters):
+    """
+    Recompute AttendanceTally rows from Attendance and AttendanceArchive
+    for every (student, subject_offering) pair matching ``filters``.
+
+    ``filters`` are lookups on ``student`` / ``subject_offering`` (valid on
+    all three models), e.g. ``subject_offering_id=...``; with no filters
+    every tally is rebuilt. ``apps`` is the app registry, or the
+    historical one when called from a migration.
+    Pairs that no longer have any attendance lose their tally row.
+    """
+    AttendanceTally = apps.get_model('academics', 'AttendanceTally')
+    # No savepoint of its own inside the caller's transaction
+    with transaction.atomic(savepoint=False):
+        merged = {}
+        sources = (apps.get_model('academics', 'Attendance'), apps.get_model('academics', 'AttendanceArchive'))
+        for model in sources:
+            for row in _grouped_tallies(model, filters).iterator(chunk_size=2000):
+                key = (row['student_id'], row['subject_offering_id'])
+                current = merged.get(key)
+                if current is None:
+                    merged[key] = row
+                else:
+                    # Attendance written to an offering after its year was archived
+                    for status in ('present', 'late', 'absent'):
+                        current[status] += row[status]
+                    current['first_date'] = min(current['first_date'], row['first_date'])
+                    current['last_date'] = max(current['last_date'], row['last_date'])
+        tallies = [AttendanceTally(**row) for row in merged.values()]
+
+        stale = [
+            pk for pk, student_id, offering_id in
+            AttendanceTally.objects.filter(**filters).values_list(
+                'pk', 'student_id', 'subject_offering_id'
+            )
+            if (student_id, offering_id) not in merged
+        ]
+        for start in range(0, len(stale), 500):
+            AttendanceTally.objects.filter(pk__in=stale[start:start + 500]).delete()
+        AttendanceTally.objects.bulk_create(
+            tallies,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['student', 'subject_offering'],
+            update_fields=['present', 'late', 'absent', 'first_date', 'last_date'],
+        )
+    return len(tallies)
+
+
+def _refresh_pairs(pairs):
+    """``refresh_attendance_tallies()`` for a set of (student_id, subject_offering_id) pairs."""
+    by_offering = {}
+    for student_id, offering_id in pairs:
+        by_offering.setdefault(offering_id, []).append(student_id)
+    for offering_id, student_ids in by_offering.items():
+        refresh_attendance_tallies(subject_offering_id=offering_id, student_id__in=student_ids)
+
+
+def apply_attendance_changes(changes):
+    """
+    Update AttendanceTally rows in place for written Attendance rows,
+    without rereading any attendance history.
+
+    ``changes`` yields ``(student_id, subject_offering_id, date,
+    old_status, new_status)`` per written row, with ``old_status`` None
+    for a new row. Call it inside the transaction that wrote the rows;
+    the affected tallies are read with select_for_update. A pair that has
+    prior attendance but no tally (never backfilled) is recomputed instead.
+    Returns the number of tallies written.
+    """
+    deltas = {}
+    for student_id, offering_id, attendance_date, old_status, new_status in changes:
+        if old_status == new_status:
+            continue
+        delta = deltas.setdefault((student_id, offering_id), {
+            'present': 0, 'late': 0, 'absent': 0,
+            'first_date': None, 'last_date': None, 'had_rows': False,
+        })
+        if old_status:
+            delta[old_status] -= 1
+            delta['had_rows'] = True
+        else:
+            delta['first_date'] = min(delta['first_date'] or attendance_date, attendance_date)
+            delta['last_date'] = max(delta['last_date'] or attendance_date, attendance_date)
+        delta[new_status] += 1
+    if not deltas:
+        return 0
+
+    # No savepoint of its own inside the caller's transaction
+    with transaction.atomic(savepoint=False):
+        current = {
+            (tally.student_id, tally.subject_offering_id): tally
+            for tally in AttendanceTally.objects.select_for_update().filter(
+                student_id__in={student_id for student_id, _offering_id in deltas},
+                subject_offering_id__in={offering_id for _student_id, offering_id in deltas},
+            )
+        }
+        tallies, recompute = [], []
+        for (student_id, offering_id), delta in deltas.items():
+            tally = current.get((student_id, offering_id))
+            if tally is None:
+                if delta['had_rows']:
+                    recompute.append((student_id, offering_id))
+                    continue
+                tally = AttendanceTally(student_id=student_id, subject_offering_id=offering_id)
+            for status in ('present', 'late', 'absent'):
+                setattr(tally, status, getattr(tally, status) + delta[status])
+            if delta['first_date']:
+                tally.first_date = min(tally.first_date or delta['first_date'], delta['first_date'])
+                tally.last_date = max(tally.last_date or delta['last_date'], delta['last_date'])
+            tallies.append(tally)
+
+        AttendanceTally.objects.bulk_create(
+            tallies,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['student', 'subject_offering'],
+            update_fields=['present', 'late', 'absent', 'first_date', 'last_date'],
+        )
+        _refresh_pairs(recompute)
+    return len(tallies) + len(recompute)
+
+
+def delete_attendance(queryset):
+    """
+    Delete the Attendance rows of ``queryset`` and recompute the tallies
+    they counted in. Attendance has no post_delete receiver (it would
+    turn every cascade from a student or offering into one query per
+    row), so single-row deletes go through here. Returns the rows deleted.
+    """
+    with transaction.atomic():
+        pairs = set(queryset.values_list('student_id', 'subject_offering_id'))
+        offering_ids = sorted({offering_id for _student_id, offering_id in pairs})
+        deleted, _ = queryset.delete()
+        _refresh_pairs(pairs)
+        attendance_bulk_saved.send(sender=Attendance, offering_ids=offering_ids)
+    return deleted
+
+
+def tally_totals(tallies):
+    """
+    Sum a queryset of AttendanceTally rows into a
+    {'present', 'late', 'absent', 'total'} dict with a single query.
+    """
+    totals = tallies.aggregate(
+        present=Sum('present'),
+        late=Sum('late'),
+        absent=Sum('absent'),
+    )
+    totals = {key: value or 0 for key, value in totals.items()}
+    totals['total'] = totals['present'] + totals['late'] + totals['absent']
+    return totals
+
+
+def tallies_per_subject(tallies):
+    """
+    Sum a queryset of AttendanceTally rows per subject (across all of the
+    subject's offerings). Returns {subject_id: totals dict}.
+    """
+    rows = (
+        tallies.order_by()
+        .values('subject_offering__subject_id')
+        .annotate(present=Sum('present'), late=Sum('late'), absent=Sum('absent'))
+    )
+    return {
+        row['subject_offering__subject_id']: {
+            'present': row['present'],
+            'late': row['late'],
+            'absent': row['absent'],
+            'total': row['present'] + row['late'] + row['absent'],
+        }
+        for row in rows
+    }
+
+
+# -------------------------------
+# Class subjects
+# -------------------------------
+def subjects_by_class():
+    """
+    Subjects offered to each (course_id, year), one entry per offering
+    (ordered by subject), from a single query. Lets a student list attach
+    subjects to every row without querying per student.
+    """
+    index = {}
+    for offering in SubjectOffering.objects.select_related('subject').order_by('subject_id', 'pk'):
+        index.setdefault((offering.subject.course_id, offering.year), []).append(offering.subject)
+    return index
+
+
+# -------------------------------
+# Class sizes
+# -------------------------------
+SECTION_SIZES_CACHE_KEY = 'academics:section_sizes'
+# Writes in another process (import_students, other workers) only clear
+# their own local-memory cache; this bounds how long sizes can lag, as
+# the dashboard cache's TTL does
+SECTION_SIZES_CACHE_TIMEOUT = 300
+
+
+def section_sizes():
+    """
+    Number of students per (course_id, year, section), from one grouped
+    query over StudentProfile.
+
+    The result is cached until a StudentProfile is saved or deleted (see
+    signals.py), and for at most SECTION_SIZES_CACHE_TIMEOUT seconds;
+    callers that bulk write students must call
+    ``invalidate_section_sizes()`` themselves.
+    """
+    sizes = cache.get(SECTION_SIZES_CACHE_KEY)
+    if sizes is None:
+        rows = (
+            StudentProfile.objects.order_by()
+            .values('course_id', 'year', 'section')
+            .annotate(count=Count('pk'))
+        )
+        sizes = {(row['course_id'], row['year'], row['section']): row['count'] for row in rows}
+        cache.set(SECTION_SIZES_CACHE_KEY, sizes, timeout=SECTION_SIZES_CACHE_TIMEOUT)
+    return sizes
+
+
+def invalidate_section_sizes():
+    cache.delete(SECTION_SIZES_CACHE_KEY)
+
+
+def section_size_matrix():
+    """
+    ``section_sizes()`` pivoted into a DataFrame indexed by
+    (course_id, year) with one column per section code, zero-filled.
+    """
+    codes = [code for code, _label in SECTION_CHOICES]
+    sizes = pd.Series(section_sizes(), dtype='int64')
+    if sizes.empty:
+        index = pd.MultiIndex.from_tuples([], names=['course_id', 'year'])
+        return pd.DataFrame(0, index=index, columns=codes)
+    sizes.index.names = ['course_id', 'year', 'section']
+    return sizes.unstack('section', fill_value=0).reindex(columns=codes, fill_value=0)
+
+
+# -------------------------------
+# Roster snapshots
+# -------------------------------
+ROSTER_GENERATION_KEY = 'academics:roster:generation'
+
+
+class RosterStudent:
+    """One row of the mark-attendance roster, with its per-request status."""
+
+    __slots__ = ('index', 'student_ID', 'first_name', 'last_name', 'attendance_status')
+
+    def __init__(self, index, student_ID, first_name, last_name, attendance_status=''):
+        self.index = index
+        self.student_ID = student_ID
+        self.first_name = first_name
+        self.last_name = last_name
+        self.attendance_status = attendance_status
+
+
+def _roster_generation():
+    generation = cache.get(ROSTER_GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a lost counter never reuses an old generation
+        cache.add(ROSTER_GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(ROSTER_GENERATION_KEY)
+    return generation
+
+
+def invalidate_rosters():
+    """Make every cached roster snapshot stale."""
+    _roster_generation()
+    try:
+        cache.incr(ROSTER_GENERATION_KEY)
+    except ValueError:
+        cache.set(ROSTER_GENERATION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def roster_snapshot(course_id, year, section):
+    """
+    The students of one class as parallel tuples ``(ids, first_names,
+    last_names)``, cached until any StudentProfile is saved or deleted.
+    """
+    key = f'academics:roster:{_roster_generation()}:{course_id}:{year}:{section}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        rows = list(
+            StudentProfile.objects.filter(course_id=course_id, year=year, section=section)
+            .values_list('student_ID', 'first_name', 'last_name')
+        )
+        snapshot = tuple(tuple(column) for column in zip(*rows)) if rows else ((), (), ())
+        cache.set(key, snapshot, timeout=ROSTER_CACHE_TIMEOUT)
+    return snapshot
+
+
+def class_roster(offering, year, section, attendance_date=None):
+    """
+    RosterStudent rows for ``offering``'s course in ``year``/``section``,
+    with ``attendance_status`` filled from the offering's records on
+    ``attendance_date`` (one query; the roster itself comes from cache).
+    """
+    ids, first_names, last_names = roster_snapshot(offering.subject.course_id, year, section)
+    statuses = {}
+    if attendance_date and ids:
+        statuses = dict(
+            Attendance.objects.filter(subject_offering=offering, date=attendance_date)
+            .values_list('student_id', 'status')
+        )
+    return [
+        RosterStudent(index, student_id, first_name, last_name, statuses.get(student_id, ''))
+        for index, (student_id, first_name, last_name) in enumerate(zip(ids, first_names, last_names))
+    ]
+
+
+# -------------------------------
+# Enrollment
+# -------------------------------
+def _class_filter(keys, prefix=''):
+    """OR together one (course, year, section) match per key."""
+    condition = Q()
+    for course_id, year, section in keys:
+        condition |= Q(**{
+            f'{prefix}course_id': course_id,
+            f'{prefix}year': year,
+            f'{prefix}section': section,
+        })
+    return condition
+
+
+def _subjects_by_class(offerings):
+    """Group offerings into {(course_id, year, section): {subject_id, ...}}."""
+    classes = {}
+    for offering in offerings:
+        course_id = offering.subject.course_id
+        if course_id is None:
+            continue
+        classes.setdefault((course_id, offering.year, offering.section), set()).add(offering.subject_id)
+    return classes
+
+
+def enroll_offerings(offerings):
+    """
+    Enroll every student of each offering's class (course + year + section)
+    in the offering's subject.
+
+    The target (student, subject) set is computed with one query, diffed
+    against the existing StudentProfile.subjects rows, and only the
+    missing rows are inserted with a single bulk_create.
+    Returns the number of enrollments added.
+    """
+    classes = _subjects_by_class(offerings)
+    if not classes:
+        return 0
+
+    Enrollment = StudentProfile.subjects.through
+    subject_ids = set().union(*classes.values())
+
+    with transaction.atomic():
+        students = StudentProfile.objects.filter(_class_filter(classes)).values_list(
+            'pk', 'course_id', 'year', 'section'
+        )
+        target = {
+            (student_id, subject_id)
+            for student_id, course_id, year, section in students
+            for subject_id in classes[(course_id, year, section)]
+        }
+        existing = set(
+            Enrollment.objects.filter(subject_id__in=subject_ids)
+            .filter(_class_filter(classes, prefix='studentprofile__'))
+            .values_list('studentprofile_id', 'subject_id')
+        )
+        missing = target - existing
+        Enrollment.objects.bulk_create(
+            [Enrollment(studentprofile_id=student_id, subject_id=subject_id)
+             for student_id, subject_id in missing],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+    return len(missing)
+
+
+def unenroll_offerings(offerings):
+    """
+    Remove the subject of each offering from the students of its class,
+    with a single filtered delete on StudentProfile.subjects.
+
+    Enrollments still backed by another offering of the same subject for
+    the same year and section (e.g. another school year) are kept.
+    Returns the number of enrollments removed.
+    """
+    classes = _subjects_by_class(offerings)
+    if not classes:
+        return 0
+
+    removed_ids = [offering.pk for offering in offerings]
+    subject_ids = set().union(*classes.values())
+
+    with transaction.atomic():
+        still_offered = set(
+            SubjectOffering.objects.filter(subject_id__in=subject_ids)
+            .exclude(pk__in=removed_ids)
+            .values_list('subject_id', 'year', 'section')
+        )
+        condition = Q()
+        for (course_id, year, section), class_subject_ids in classes.items():
+            for subject_id in class_subject_ids:
+                if (subject_id, year, section) in still_offered:
+                    continue
+                condition |= Q(
+                    subject_id=subject_id,
+                    studentprofile__course_id=course_id,
+                    studentprofile__year=year,
+                    studentprofile__section=section,
+                )
+        if not condition:
+            return 0
+        deleted, _ = StudentProfile.subjects.through.objects.filter(condition).delete()
+    return deleted
+
+
+# -------------------------------
+# Offline sync
+# -------------------------------
+MAX_SYNC_ITEMS = 200
+
+# Default for settings.ATTENDANCE_SYNC_RECEIPT_DAYS
+SYNC_RECEIPT_DAYS = 30
+
+
+def _parse_or_none(parse, value):
+    # parse_date/parse_time return None for a bad format but raise for a
+    # well-formed impossible value such as 2025-02-30 or 25:00
+    try:
+        return parse(str(value or ''))
+    except ValueError:
+        return None
+
+
+def _validate_sync_item(item, offerings, archived):
+    """
+    Check one sync item and return ``(parsed, errors)``. ``parsed`` is a
+    dict with the offering, date, time and {student_ID: status} marks.
+    ``archived`` is the set of archived school years among ``offerings``.
+    """
+    errors = []
+    offering = offerings.get(str(item.get('offering')))
+    if offering is None:
+        errors.append("Unknown offering, or it is not assigned to you.")
+    elif offering.school_year in archived:
+        errors.append(f"School year {offering.school_year} is archived and read-only.")
+    attendance_date = _parse_or_none(parse_date, item.get('date'))
+    if attendance_date is None:
+        errors.append("Invalid date.")
+    attendance_time = _parse_or_none(parse_time, item.get('time'))
+    if attendance_time is None:
+        errors.append("Invalid time.")
+    marks = item.get('marks')
+    if not isinstance(marks, dict) or not marks:
+        errors.append("No marks.")
+        marks = {}
+    bad_statuses = sorted(
+        student_id for student_id, status in marks.items()
+        if not isinstance(status, str) or status not in VALID_STATUSES
+    )
+    if bad_statuses:
+        errors.append(f"Invalid status for: {', '.join(bad_statuses)}.")
+
+    if offering is not None and marks:
+        # Same class rules as the mark-attendance page: the offering's
+        # class unless the item names another year/section
+        year = item.get('year') or offering.year
+        section = item.get('section') or offering.section
+        roster_ids = set(roster_snapshot(offering.subject.course_id, year, section)[0])
+        unknown = sorted(set(marks) - roster_ids)
+        if unknown:
+            errors.append(f"Not in this class: {', '.join(unknown)}.")
+
+    if errors:
+        return None, errors
+    return {
+        'offering': offering,
+        'date': attendance_date,
+        'time': attendance_time,
+        'marks': marks,
+    }, []
+
+
+def sync_attendance_batch(teacher, items):
+    """
+    Apply a batch of offline attendance items for ``teacher``.
+
+    Each item is ``{'key', 'offering', 'date', 'time', 'marks': {student_ID:
+    status}}`` (optionally ``year``/``section``, as on the mark-attendance
+    page). Items whose key was already applied are answered from their
+    AttendanceSyncReceipt; invalid items, including offerings that are
+    not the teacher's, are rejected individually. All accepted items are
+    written with one bulk upsert, and the tallies refreshed once per
+    offering.
+
+    Returns one result dict per item, in order: ``{'key', 'status':
+    'applied' | 'duplicate' | 'rejected', 'created', 'updated'}``, with
+    an ``errors`` list instead of the counts on rejected items.
+    """
+    keys = [str(item.get('key') or '') for item in items]
+    offering_ids = {str(item.get('offering')) for item in items}
+    offerings = {
+        str(offering.pk): offering
+        for offering in SubjectOffering.objects.filter(
+            teacher=teacher, pk__in=[pk for pk in offering_ids if pk.isdigit()]
+        ).select_related('subject')
+    }
+    archived = archived_school_years(offering.school_year for offering in offerings.values())
+    receipts = dict(
+        AttendanceSyncReceipt.objects.filter(teacher=teacher, key__in=[k for k in keys if k])
+        .values_list('key', 'result')
+    )
+
+    results = [None] * len(items)
+    accepted = []  # (position, parsed item)
+    seen_keys = set()
+    for position, (key, item) in enumerate(zip(keys, items)):
+        if not key or len(key) > 64:
+            results[position] = {'key': key, 'status': 'rejected', 'errors': ["Missing or invalid key."]}
+        elif key in receipts or key in seen_keys:
+            results[position] = {'key': key, 'status': 'duplicate'}
+        else:
+            parsed, errors = _validate_sync_item(item, offerings, archived)
+            if errors:
+                results[position] = {'key': key, 'status': 'rejected', 'errors': errors}
+            else:
+                seen_keys.add(key)
+                accepted.append((position, parsed))
+
+    if accepted:
+        _apply_sync_items(teacher, keys, accepted, results)
+        prune_sync_receipts()
+
+    # Duplicates repeat the stored (or same-batch) outcome
+    applied = {keys[position]: results[position] for position, _parsed in accepted}
+    for position, result in enumerate(results):
+        if result['status'] == 'duplicate':
+            original = receipts.get(result['key']) or applied.get(result['key'], {})
+            result.update(created=original.get('created', 0), updated=original.get('updated', 0))
+    return results
+
+
+def _apply_sync_items(teacher, keys, accepted, results):
+    offering_ids = {parsed['offering'].pk for _position, parsed in accepted}
+    dates = {parsed['date'] for _position, parsed in accepted}
+
+    with transaction.atomic():
+        previous = {
+            (offering_id, attendance_date, student_id): status
+            for offering_id, attendance_date, student_id, status in
+            Attendance.objects.select_for_update().filter(
+                subject_offering_id__in=offering_ids,
+                date__in=dates,
+            ).values_list('subject_offering_id', 'date', 'student_id', 'status')
+        }
+        written = set(previous)
+
+        # Later items win when two items mark the same student and day
+        rows = {}
+        for position, parsed in accepted:
+            offering, attendance_date = parsed['offering'], parsed['date']
+            created = updated = 0
+            for student_id, status in parsed['marks'].items():
+                row_key = (offering.pk, attendance_date, student_id)
+                if row_key in written:
+                    updated += 1
+                else:
+                    created += 1
+                    written.add(row_key)
+                rows[row_key] = Attendance(
+                    student_id=student_id,
+                    subject_offering=offering,
+                    date=attendance_date,
+                    time=parsed['time'],
+                    status=status,
+                )
+            results[position] = {
+                'key': keys[position], 'status': 'applied', 'created': created, 'updated': updated,
+            }
+
+        Attendance.objects.bulk_create(
+            list(rows.values()),
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'subject_offering', 'date'],
+            update_fields=['status', 'time'],
+        )
+        apply_attendance_changes(
+            (row.student_id, row.subject_offering_id, row.date, previous.get(row_key), row.status)
+            for row_key, row in rows.items()
+        )
+        # A concurrent upload of the same key may have landed first; its
+        # rows are identical, so keeping either receipt is fine
+        AttendanceSyncReceipt.objects.bulk_create(
+            [
+                AttendanceSyncReceipt(teacher=teacher, key=keys[position], result=results[position])
+                for position, _parsed in accepted
+            ],
+            ignore_conflicts=True,
+        )
+        attendance_bulk_saved.send(sender=Attendance, offering_ids=sorted(offering_ids))
+
+
+def prune_sync_receipts():
+    """
+    Delete AttendanceSyncReceipts older than
+    ``settings.ATTENDANCE_SYNC_RECEIPT_DAYS``. Runs after every applied
+    sync batch; a queue held offline longer than that is applied again
+    on upload rather than answered as a duplicate.
+    """
+    days = getattr(settings, 'ATTENDANCE_SYNC_RECEIPT_DAYS', SYNC_RECEIPT_DAYS)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = AttendanceSyncReceipt.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from accounts.models import StudentProfile
+
+from .models import Attendance
+
+
+# Sent by bulk attendance writers (which skip post_save) once their rows
+# are committed to the transaction. Arguments: offering_ids.
+attendance_bulk_saved = Signal()
+
+
+# No post_delete receiver: any delete receiver on Attendance disables
+# Django's fast delete, so removing a student or offering would send one
+# signal per attendance row. Their tallies cascade with them; other
+# deletes go through services.delete_attendance().
+@receiver(post_save, sender=Attendance)
+def update_attendance_tally(sender, instance, created, **kwargs):
+    """Keep the student's tally for this offering in step with single-row writes."""
+    from .services import apply_attendance_changes, refresh_attendance_tallies
+
+    if created:
+        apply_attendance_changes([
+            (instance.student_id, instance.subject_offering_id, instance.date, None, instance.status),
+        ])
+    else:
+        # The previous status is unknown here; recount this one pair
+        refresh_attendance_tallies(
+            student_id=instance.student_id,
+            subject_offering_id=instance.subject_offering_id,
+        )
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def clear_class_caches(sender, **kwargs):
+    """A student joined, left, moved class or was renamed; recount and re-list."""
+    from .services import invalidate_rosters, invalidate_section_sizes
+
+    invalidate_section_sizes()
+    invalidate_rosters()
@@ -1,3 +1,281 @@
+import datetime
+from io import StringIO
+import re
+import time
+import unittest
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+import numpy as np
+
+from accounts.models import CustomUser, StudentProfile, TeacherProfile
+
+from .absenteeism import detect_absenteeism, load_status_arrays
+from .archive import SchoolYearArchived, archive_school_year
+from .management.commands.explain_attendance_queries import FULL_SCAN, Command as ExplainCommand
+from .models import (
+    AbsenteeismFlag, Attendance, AttendanceArchive, AttendanceSyncReceipt, AttendanceTally, Course, Subject,
+    SubjectOffering,
+)
+from .services import (
+    MAX_SYNC_ITEMS, SECTION_SIZES_CACHE_TIMEOUT, delete_attendance, refresh_attendance_tallies,
+    save_attendance_roster, section_sizes,
+)
+
+
+def make_class(students=5, course_name='BSIT'):
+    """A course with one offering of one subject and ``students`` students in 1st year, section a."""
+    course = Course.objects.create(name=course_name, description=course_name)
+    subject = Subject.objects.create(course=course, subject_code=f'{course_name}101', name='Programming', semester_number='1st')
+    teacher_user = CustomUser.objects.create(username=f'{course_name}-teacher', role='teacher', first_login=False)
+    teacher = TeacherProfile.objects.create(user=teacher_user, first_name='Ana', last_name='Cruz')
+    offering = SubjectOffering.objects.create(
+        subject=subject, teacher=teacher, year='1st', section='a', school_year='2025-2026',
+    )
+    profiles = []
+    for index in range(students):
+        user = CustomUser.objects.create(username=f'{course_name}-student-{index}', role='student')
+        profiles.append(StudentProfile.objects.create(
+            user=user, student_ID=f'{course_name}-{index}', first_name='Student', last_name=str(index),
+            course=course, year='1st', section='a', is_regular='reg',
+        ))
+    return offering, profiles
+
+
+def tally_rows():
+    return sorted(AttendanceTally.objects.values_list(
+        'student_id', 'subject_offering_id', 'present', 'late', 'absent', 'first_date', 'last_date',
+    ))
+
+
+class AttendanceTallyTests(TestCase):
+    def setUp(self):
+        self.offering, self.students = make_class()
+        self.ids = [student.pk for student in self.students]
+
+    def assertTalliesCurrent(self):
+        maintained = tally_rows()
+        refresh_attendance_tallies()
+        self.assertEqual(maintained, tally_rows())
+
+    def test_roster_saves_update_tallies_in_place(self):
+        day = datetime.date(2025, 8, 4)
+        save_attendance_roster(self.offering, day, datetime.time(8), {pk: 'present' for pk in self.ids})
+        save_attendance_roster(self.offering, day + datetime.timedelta(days=1), datetime.time(8), {pk: 'late' for pk in self.ids})
+        # Re-marking a day moves counts between statuses
+        created, updated = save_attendance_roster(
+            self.offering, day, datetime.time(9), {self.ids[0]: 'absent', self.ids[1]: 'present'},
+        )
+        self.assertEqual((created, updated), (0, 2))
+
+        tally = AttendanceTally.objects.get(student_id=self.ids[0])
+        self.assertEqual((tally.present, tally.late, tally.absent), (0, 1, 1))
+        self.assertEqual((tally.first_date, tally.last_date), (day, day + datetime.timedelta(days=1)))
+        self.assertTalliesCurrent()
+
+    def test_single_row_writes_and_deletes(self):
+        record = Attendance.objects.create(
+            student=self.students[0], subject_offering=self.offering, date=datetime.date(2025, 8, 4), status='late',
+        )
+        record.status = 'present'
+        record.save()
+        self.assertTalliesCurrent()
+
+        delete_attendance(Attendance.objects.filter(pk=record.pk))
+        self.assertFalse(AttendanceTally.objects.exists())
+
+    def test_deleting_an_offering_does_not_touch_rows_one_by_one(self):
+        start = datetime.date(2025, 8, 4)
+        for offset in range(20):
+            save_attendance_roster(
+                self.offering, start + datetime.timedelta(days=offset), datetime.time(8),
+                {pk: 'present' for pk in self.ids},
+            )
+        with CaptureQueriesContext(connection) as queries:
+            self.offering.delete()
+        # 100 attendance rows and 5 tallies go in a handful of bulk deletes
+        self.assertLess(len(queries), 10)
+        self.assertFalse(AttendanceTally.objects.exists())
+
+
+class SectionSizesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_writes_from_another_process_show_up_after_the_timeout(self):
+        offering, _students = make_class(students=2)
+        key = (offering.subject.course_id, '1st', 'a')
+        self.assertEqual(section_sizes()[key], 2)
+        # bulk_create sends no signal, like a write in another process
+        user = CustomUser.objects.create(username='late-student', role='student')
+        StudentProfile.objects.bulk_create([StudentProfile(
+            user=user, student_ID='late', first_name='Late', last_name='Student',
+            course_id=key[0], year='1st', section='a', is_regular='reg',
+        )])
+        self.assertEqual(section_sizes()[key], 2)
+        later = time.time() + SECTION_SIZES_CACHE_TIMEOUT + 1
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(section_sizes()[key], 3)
+
+
+class AttendanceSyncTests(TestCase):
+    def setUp(self):
+        self.offering, self.students = make_class()
+        self.client.force_login(self.offering.teacher.user)
+        self.url = reverse('academics:attendance_sync')
+
+    def sync(self, items):
+        return self.client.post(self.url, {'items': items}, content_type='application/json')
+
+    def item(self, key, day='2025-08-04', status='present'):
+        return {
+            'key': key, 'offering': self.offering.pk, 'date': day, 'time': '08:00',
+            'marks': {student.pk: status for student in self.students},
+        }
+
+    def test_batch_is_applied_once(self):
+        first = self.sync([self.item('a'), self.item('b', day='2025-08-05')]).json()['results']
+        self.assertEqual([result['status'] for result in first], ['applied', 'applied'])
+        again = self.sync([self.item('a')]).json()['results']
+        self.assertEqual(again[0]['status'], 'duplicate')
+        self.assertEqual(Attendance.objects.count(), 10)
+        self.assertEqual(AttendanceTally.objects.get(student=self.students[0]).present, 2)
+
+    def test_impossible_date_or_time_rejects_only_that_item(self):
+        bad_date = dict(self.item('bad-date'), date='2025-02-30')
+        bad_time = dict(self.item('bad-time'), time='25:00')
+        response = self.sync([bad_date, bad_time, self.item('good')])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['status'] for result in results], ['rejected', 'rejected', 'applied'])
+        self.assertEqual(results[0]['errors'], ['Invalid date.'])
+        self.assertEqual(results[1]['errors'], ['Invalid time.'])
+        self.assertEqual(Attendance.objects.count(), 5)
+
+    def test_batch_size_is_limited(self):
+        response = self.sync([self.item(str(index)) for index in range(MAX_SYNC_ITEMS + 1)])
+        self.assertEqual(response.status_code, 400)
+
+    def test_old_receipts_are_pruned(self):
+        self.sync([self.item('old')])
+        AttendanceSyncReceipt.objects.update(created_at=timezone.now() - datetime.timedelta(days=31))
+        self.sync([self.item('new', day='2025-08-05')])
+        self.assertEqual(list(AttendanceSyncReceipt.objects.values_list('key', flat=True)), ['new'])
+
+
+class ArchivedSchoolYearTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.offering, self.students = make_class(students=2)
+        self.marks = {student.pk: 'present' for student in self.students}
+        self.day = datetime.date(2025, 8, 4)
+        save_attendance_roster(self.offering, self.day, datetime.time(8), self.marks)
+        archive_school_year(self.offering.school_year)
+
+    def test_roster_save_is_rejected(self):
+        with self.assertRaises(SchoolYearArchived):
+            save_attendance_roster(self.offering, self.day, datetime.time(9), self.marks)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_archive_written_by_another_process_is_seen(self):
+        other = SubjectOffering.objects.create(
+            subject=self.offering.subject, teacher=self.offering.teacher, year='1st', section='b',
+            school_year='2026-2027',
+        )
+        save_attendance_roster(other, self.day, datetime.time(8), self.marks)
+        # Rows archived elsewhere, with nothing in this process's cache cleared
+        AttendanceArchive.objects.create(
+            id=10_000, student=self.students[0], subject_offering=other, school_year='2026-2027',
+            date=self.day, time=datetime.time(8), status='present',
+        )
+        with self.assertRaises(SchoolYearArchived):
+            save_attendance_roster(other, self.day, datetime.time(9), self.marks)
+
+    def test_mark_attendance_page_reports_the_rejection(self):
+        self.client.force_login(self.offering.teacher.user)
+        response = self.client.post(
+            reverse('academics:attendance')
+            + f'?offering={self.offering.pk}&date=2025-08-05&time=08:00',
+            {f'status_{pk}': 'present' for pk in self.marks},
+            follow=True,
+        )
+        self.assertContains(response, 'archived and read-only')
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_sync_item_is_rejected(self):
+        self.client.force_login(self.offering.teacher.user)
+        response = self.client.post(reverse('academics:attendance_sync'), {'items': [{
+            'key': 'a', 'offering': self.offering.pk, 'date': '2025-08-05', 'time': '08:00', 'marks': self.marks,
+        }]}, content_type='application/json')
+        result = response.json()['results'][0]
+        self.assertEqual(result['status'], 'rejected')
+        self.assertIn('School year 2025-2026 is archived and read-only.', result['errors'])
+        self.assertFalse(Attendance.objects.exists())
+
+
+class AbsenteeismTests(TestCase):
+    def setUp(self):
+        self.offering, self.students = make_class(students=2)
+
+    def test_empty_table(self):
+        self.assertEqual([len(column) for column in load_status_arrays()], [0] * 5)
+        self.assertEqual(detect_absenteeism(), (0, 0))
+
+    def test_loads_sorted_columns_and_flags_a_streak(self):
+        start = datetime.date(2025, 8, 4)
+        for offset in range(6):
+            save_attendance_roster(self.offering, start + datetime.timedelta(days=offset), datetime.time(8), {
+                self.students[0].pk: 'absent' if offset >= 3 else 'present',
+                self.students[1].pk: 'late' if offset == 0 else 'present',
+            })
+        student_ids, offering_ids, dates, absent, late = load_status_arrays()
+        self.assertEqual(list(student_ids), [self.students[0].pk] * 6 + [self.students[1].pk] * 6)
+        self.assertEqual(set(offering_ids), {self.offering.pk})
+        self.assertEqual(dates[0], np.datetime64('2025-08-04'))
+        self.assertEqual((int(absent.sum()), int(late.sum())), (3, 1))
+
+        self.assertEqual(detect_absenteeism(), (2, 1))
+        flag = AbsenteeismFlag.objects.get()
+        self.assertEqual((flag.student_id, flag.current_streak), (self.students[0].pk, 3))
+        self.assertEqual(flag.last_date, start + datetime.timedelta(days=5))
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'Plans are checked against SQLite EXPLAIN QUERY PLAN')
+class AttendanceQueryPlanTests(TestCase):
+    # Indexes from migration 0014 each query shape must be served by
+    EXPECTED_INDEXES = {
+        'admin_dashboard recent': {'att_date_time_idx'},
+        'teacher_home today': {'att_offering_date_idx', 'att_offering_date_status_idx'},
+        'mark_attendance existing': {'att_offering_date_idx', 'att_offering_date_status_idx'},
+        # Grouped LEFT JOIN from the teacher's offerings; the status counts
+        # come straight from the covering index
+        'attendance_summary counts': {'att_offering_date_status_idx'},
+        'detailed_attendance': {'att_offering_date_idx', 'att_offering_date_status_idx'},
+        'student_attendance_overview': {'att_student_date_time_idx'},
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        ExplainCommand(stdout=StringIO())._seed(20000)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
 
-# Create your tests here.
+    def test_attendance_queries_use_the_composite_indexes(self):
+        for label, queryset in ExplainCommand()._queries().items():
+            plan = queryset.explain()
+            with self.subTest(label):
+                self.assertFalse(
+                    any(FULL_SCAN.search(line) for line in plan.splitlines()),
+                    f'Full scan of academics_attendance:\n{plan}',
+                )
+                expected = self.EXPECTED_INDEXES.get(label)
+                if expected:
+                    used = set(re.findall(r'academics_attendance USING (?:COVERING )?INDEX (\w+)', plan))
+                    self.assertTrue(used & expected, f'Expected one of {sorted(expected)}:\n{plan}')
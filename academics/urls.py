@@ -19,6 +19,7 @@ urlpatterns = [
 
 
     path('mark-attendance/',views.mark_attendance,name='attendance'),
+    path('mark-attendance/sync/',views.attendance_sync,name='attendance_sync'),
     path('student-list',views.student_list,name='student_list'),
     path('subject-assign/', views.subject_assign, name='subject_assign'),
 ]
@@ -1,13 +1,27 @@
 # views.py
 
 
+from .archive import SchoolYearArchived
 from .forms import SubjectForm, AssignSubjectForm
 from .models import Subject, Course, SubjectOffering, Attendance
+from .services import (
+    MAX_SYNC_ITEMS,
+    class_roster,
+    collect_roster_statuses,
+    enroll_offerings,
+    save_attendance_roster,
+    sync_attendance_batch,
+    unenroll_offerings,
+)
 from accounts.models import TeacherProfile, StudentProfile
 from django.utils import timezone
 from datetime import datetime, date
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_POST
+import json
 import calendar
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
@@ -136,53 +150,55 @@ def add_assignment_page(request):
 
         created_subjects = []
         skipped_subjects = []
+        new_offerings = []
 
-        for subject in subjects:
-            for section_value, _label in SECTION_CHOICES:
-                checkbox_name = f"assign_{subject.id}_{section_value}"
-                if checkbox_name not in request.POST:
-                    continue
-
-                existing_offering = SubjectOffering.objects.filter(
-                    subject=subject,
+        with transaction.atomic():
+            # All offerings already taken for this year and school year, in one query
+            taken = {
+                (offering.subject_id, offering.section): offering
+                for offering in SubjectOffering.objects.select_related('teacher').filter(
                     year=year,
-                    section=section_value,
-                    school_year=school_year,
-                ).first()
-
-                if existing_offering:
-                    assigned_teacher = existing_offering.teacher
-                    if assigned_teacher:
-                        skipped_subjects.append(
-                            f"{subject.subject_code} - Section {section_value.upper()} "
-                            f"(already assigned to {assigned_teacher.first_name} {assigned_teacher.last_name})"
-                        )
-                    else:
-                        skipped_subjects.append(
-                            f"{subject.subject_code} - Section {section_value.upper()} (already assigned)"
-                        )
-                    continue
-
-                offering = SubjectOffering.objects.create(
-                    teacher=teacher,
-                    subject=subject,
-                    year=year,
-                    section=section_value,
                     school_year=school_year,
                 )
-
-                if offering:
-                    created_subjects.append(f"{subject.subject_code} - Section {section_value.upper()}")
-                    # Enroll relevant students (course + year + section)
-                    students = StudentProfile.objects.filter(
-                        course=subject.course,
+            }
+
+            for subject in subjects:
+                for section_value, _label in SECTION_CHOICES:
+                    checkbox_name = f"assign_{subject.id}_{section_value}"
+                    if checkbox_name not in request.POST:
+                        continue
+
+                    existing_offering = taken.get((subject.id, section_value))
+
+                    if existing_offering:
+                        assigned_teacher = existing_offering.teacher
+                        if assigned_teacher:
+                            skipped_subjects.append(
+                                f"{subject.subject_code} - Section {section_value.upper()} "
+                                f"(already assigned to {assigned_teacher.first_name} {assigned_teacher.last_name})"
+                            )
+                        else:
+                            skipped_subjects.append(
+                                f"{subject.subject_code} - Section {section_value.upper()} (already assigned)"
+                            )
+                        continue
+
+                    offering = SubjectOffering.objects.create(
+                        teacher=teacher,
+                        subject=subject,
                         year=year,
                         section=section_value,
+                        school_year=school_year,
                     )
-                    for student in students:
-                        student.subjects.add(subject)
-                else:
-                    skipped_subjects.append(f"{subject.subject_code} - Section {section_value.upper()}")
+
+                    if offering:
+                        created_subjects.append(f"{subject.subject_code} - Section {section_value.upper()}")
+                        new_offerings.append(offering)
+                    else:
+                        skipped_subjects.append(f"{subject.subject_code} - Section {section_value.upper()}")
+
+            # Enroll relevant students (course + year + section) for every new offering at once
+            enroll_offerings(new_offerings)
 
         if created_subjects:
             messages.success(
@@ -305,61 +321,53 @@ def edit_assignment_page(request, offering_id):
                 messages.error(request, "Cannot save changes because of conflicts: " + "; ".join(msg_parts))
                 return redirect('academics:edit_assignment_page', offering_id=offering_id)
 
-        # Sync offerings for this teacher, year and school year with the selected grid.
-        # First, update the base assignment to the chosen teacher/year/SY so it is included in syncing.
-        assignment.teacher = teacher
-        assignment.year = year
-        assignment.school_year = school_year
-        assignment.save()
-
-        # Current offerings for this teacher in the given year & school_year.
-        current_offerings = SubjectOffering.objects.filter(
-            teacher=teacher,
-            year=year,
-            school_year=school_year,
-        )
-
-        current_pairs = {(off.subject_id, off.section): off for off in current_offerings}
+        with transaction.atomic():
+            # Sync offerings for this teacher, year and school year with the selected grid.
+            # First, update the base assignment to the chosen teacher/year/SY so it is included in syncing.
+            assignment.teacher = teacher
+            assignment.year = year
+            assignment.school_year = school_year
+            assignment.save()
 
-        # 1) Remove offerings that are no longer selected.
-        for (sub_id, section), off in list(current_pairs.items()):
-            if (sub_id, section) not in selected_pairs:
-                # Clean up student → subject linkage for this offering before deleting.
-                students = StudentProfile.objects.filter(
-                    course=off.subject.course,
-                    year=off.year,
-                    section=off.section,
-                )
-                for student in students:
-                    student.subjects.remove(off.subject)
-                off.delete()
-                current_pairs.pop((sub_id, section), None)
-
-        # 2) Create new offerings for newly selected combinations.
-        created_any = False
-        for (sub_id, section_value) in selected_pairs:
-            if (sub_id, section_value) in current_pairs:
-                # Already exists for this teacher/year/SY -> keep it.
-                continue
-
-            subject = get_object_or_404(Subject, id=sub_id)
-            new_offering = SubjectOffering.objects.create(
+            # Current offerings for this teacher in the given year & school_year.
+            current_offerings = SubjectOffering.objects.select_related('subject').filter(
                 teacher=teacher,
-                subject=subject,
                 year=year,
-                section=section_value,
                 school_year=school_year,
             )
-            created_any = True
+
+            current_pairs = {(off.subject_id, off.section): off for off in current_offerings}
+
+            # 1) Remove offerings that are no longer selected.
+            removed_offerings = [
+                off for pair, off in current_pairs.items() if pair not in selected_pairs
+            ]
+            if removed_offerings:
+                # Clean up student → subject linkage for these offerings before deleting.
+                unenroll_offerings(removed_offerings)
+                SubjectOffering.objects.filter(pk__in=[off.pk for off in removed_offerings]).delete()
+                for off in removed_offerings:
+                    current_pairs.pop((off.subject_id, off.section), None)
+
+            # 2) Create new offerings for newly selected combinations.
+            subjects_by_id = {subject.id: subject for subject in subjects}
+            new_offerings = []
+            for (sub_id, section_value) in selected_pairs:
+                if (sub_id, section_value) in current_pairs:
+                    # Already exists for this teacher/year/SY -> keep it.
+                    continue
+
+                subject = subjects_by_id.get(sub_id) or get_object_or_404(Subject, id=sub_id)
+                new_offerings.append(SubjectOffering.objects.create(
+                    teacher=teacher,
+                    subject=subject,
+                    year=year,
+                    section=section_value,
+                    school_year=school_year,
+                ))
 
             # Enroll relevant students (course + year + section)
-            students = StudentProfile.objects.filter(
-                course=subject.course,
-                year=year,
-                section=section_value,
-            )
-            for student in students:
-                student.subjects.add(subject)
+            enroll_offerings(new_offerings)
 
         # If nothing is selected, we effectively cleared assignments for this teacher/year/SY.
         if not selected_pairs:
@@ -392,15 +400,9 @@ def delete_assignment(request, offering_id):
     offering = get_object_or_404(SubjectOffering, id=offering_id)
     if request.method == 'POST':
         # Clean up student → subject linkage for this specific offering
-        students = StudentProfile.objects.filter(
-            course=offering.subject.course,
-            year=offering.year,
-            section=offering.section,
-        )
-        for student in students:
-            student.subjects.remove(offering.subject)
-
-        offering.delete()
+        with transaction.atomic():
+            unenroll_offerings([offering])
+            offering.delete()
         messages.success(request, "Assignment deleted successfully.")
     return redirect('academics:assign_teacher')
 
@@ -419,15 +421,15 @@ def mark_attendance(request):
     if not selected_time:
         selected_time = datetime.now().strftime("%H:%M")
     # All offerings assigned to this teacher (hard filter)
-    offerings = SubjectOffering.objects.filter(teacher=teacher)
+    offerings = list(SubjectOffering.objects.filter(teacher=teacher).select_related('subject'))
     selected_offering = None
-    students = StudentProfile.objects.none()  # default empty queryset
+    students = []
 
     if offering_id:
         # Only allow access to offerings that belong to this teacher
-        selected_offering = get_object_or_404(
-            SubjectOffering, id=offering_id, teacher=teacher
-        )
+        selected_offering = next((o for o in offerings if str(o.id) == offering_id), None)
+        if selected_offering is None:
+            raise Http404("No SubjectOffering matches the given query.")
 
         # Default filters to the offering's year/section if not explicitly chosen
         if not year:
@@ -435,37 +437,18 @@ def mark_attendance(request):
         if not section:
             section = selected_offering.section
 
-        # Filter students by course + year + section
-        students = StudentProfile.objects.filter(
-            course=selected_offering.subject.course,
-            year=year,
-            section=section,
+        # Class roster (course + year + section) from the cached snapshot,
+        # with existing attendance for the date pre-selected
+        students = class_roster(
+            selected_offering,
+            year,
+            section,
+            attendance_date=selected_date if selected_date and selected_time else None,
         )
 
-        # Get existing attendance for pre-selection
-        if selected_date and selected_time:
-            existing_records = Attendance.objects.filter(
-                subject_offering=selected_offering,
-                date=selected_date
-            )
-            existing_attendance = {a.student.student_ID: a.status for a in existing_records}
-            for student in students:
-                student.attendance_status = existing_attendance.get(student.student_ID, '')
-        else:
-            for student in students:
-                student.attendance_status = ''
-
     # Sections and years for dropdowns – limited strictly to this teacher's offerings
-    sections = (
-        SubjectOffering.objects.filter(teacher=teacher)
-        .values_list('section', flat=True)
-        .distinct()
-    )
-    years = (
-        SubjectOffering.objects.filter(teacher=teacher)
-        .values_list('year', flat=True)
-        .distinct()
-    )
+    sections = list(dict.fromkeys(o.section for o in offerings))
+    years = list(dict.fromkeys(o.year for o in offerings))
 
     context = {
         'offerings': offerings,
@@ -481,19 +464,15 @@ def mark_attendance(request):
 
     # POST: Save attendance
     if request.method == 'POST' and selected_offering and selected_date and selected_time:
-        for student in students:
-            status = request.POST.get(f'status_{student.student_ID}')
-            if status:
-                Attendance.objects.update_or_create(
-                    student=student,
-                    subject_offering=selected_offering,
-                    date=selected_date,  # unique_together field
-                    defaults={
-                        'status': status,
-                        'time': selected_time
-                    }
-                )
-        messages.success(request, "Attendance has been successfully recorded!")
+        # Save the whole roster in one transaction (bulk upsert on the
+        # student/offering/date unique constraint)
+        statuses = collect_roster_statuses(request.POST, students)
+        try:
+            save_attendance_roster(selected_offering, selected_date, selected_time, statuses)
+        except SchoolYearArchived as error:
+            messages.error(request, str(error))
+        else:
+            messages.success(request, "Attendance has been successfully recorded!")
         return redirect(
             request.path
             + f"?offering={offering_id}&section={section or ''}&year={year or ''}&date={selected_date}&time={selected_time}"
@@ -502,6 +481,30 @@ def mark_attendance(request):
     return render(request, 'dashboard/attendance.html', context)
 
 
+@login_required
+@require_POST
+def attendance_sync(request):
+    """
+    JSON endpoint for the offline attendance queue (see
+    static/js/attendance_sync.js). Body: ``{"items": [...]}``, see
+    ``sync_attendance_batch`` for the item format and per-item results.
+    """
+    teacher = getattr(request.user, 'teacherprofile', None)
+    if teacher is None:
+        return JsonResponse({'error': "Only teachers can sync attendance."}, status=403)
+
+    try:
+        items = json.loads(request.body).get('items')
+    except (ValueError, AttributeError):
+        items = None
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        return JsonResponse({'error': "Expected a JSON object with an 'items' list."}, status=400)
+    if len(items) > MAX_SYNC_ITEMS:
+        return JsonResponse({'error': f"At most {MAX_SYNC_ITEMS} items per request."}, status=400)
+
+    return JsonResponse({'results': sync_attendance_batch(teacher, items)})
+
+
 @login_required
 def student_list(request):
     teacher = request.user.teacherprofile
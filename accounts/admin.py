@@ -4,9 +4,11 @@ from . models import(
     ParentProfile,
     StudentProfile,
     TeacherProfile,
+    ExportJob,
 )
 # Register your models here.
 admin.site.register(CustomUser)
 admin.site.register(ParentProfile)
 admin.site.register(StudentProfile)
 admin.site.register(TeacherProfile)
+admin.site.register(ExportJob)
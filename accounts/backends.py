@@ -1,5 +1,8 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.db.models.functions import Lower
 
 User = get_user_model()
 
@@ -7,22 +10,47 @@ class EmailOrUsernameBackend(ModelBackend):
     """
     Authenticate using either username or email.
     If first_login=True, allow login without password.
+
+    The user is resolved with one query (username, or email matched
+    case-insensitively through user_email_lower_idx). A failed login raises
+    PermissionDenied, so authenticate() stops here instead of letting the
+    ModelBackend listed after this one look the user up and hash the
+    password a second time.
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(email=username)
-            except User.DoesNotExist:
-                return None
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None:
+            return None
+
+        user = self.get_login_user(username)
+        if user is None:
+            # Run the hasher once anyway so unknown accounts take as long
+            # to reject as wrong passwords (same as ModelBackend)
+            User().set_password(password)
+            raise PermissionDenied
 
         # Allow first login without password
         if getattr(user, 'first_login', False):
             return user
 
         # Otherwise check password
-        if user.check_password(password):
+        if password is not None and user.check_password(password):
             return user
 
-        return None
+        raise PermissionDenied
+
+    @staticmethod
+    def get_login_user(username):
+        """The user whose username, or failing that email, is ``username``."""
+        if not username:
+            # A blank email would otherwise match every account without one
+            return None
+        matches = list(
+            User.objects.alias(email_lower=Lower('email'))
+            .filter(Q(username=username) | Q(email_lower=username.lower()))
+        )
+        for user in matches:
+            if user.username == username:
+                return user
+        return matches[0] if matches else None
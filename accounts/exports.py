@@ -0,0 +1,103 @@
+from openpyxl import Workbook
+
+from accounts.models import StudentProfile, TeacherProfile, ParentProfile
+
+
+STUDENT_HEADER = ["First Name", "Last Name", "Email", "Password"]
+PARENT_HEADER = ["Parent First Name", "Parent Last Name", "Child Name", "Email", "Password"]
+TEACHER_HEADER = ["First Name", "Last Name", "Subjects", "Email", "Password"]
+
+# Passwords are only ever stored hashed, so the sheet can't show them
+NO_PASSWORD = "N/A"
+
+CHUNK_SIZE = 2000
+
+
+def _student_groups():
+    """Student rows grouped by Year/Section, from one projected query."""
+    groups = {}
+    rows = StudentProfile.objects.values_list(
+        'year', 'section', 'first_name', 'last_name', 'user__email',
+    ).order_by('pk')
+    for year, section, first_name, last_name, email in rows.iterator(chunk_size=CHUNK_SIZE):
+        groups.setdefault(f"Y{year}_S{section}", []).append(
+            (first_name, last_name, email, NO_PASSWORD)
+        )
+    return groups
+
+
+def _parent_groups():
+    """
+    One row per (parent, child) grouped by the child's Year/Section, read
+    straight from the parents <-> students link table in one query.
+    """
+    groups = {}
+    links = StudentProfile.parents.through.objects.values_list(
+        'studentprofile__year',
+        'studentprofile__section',
+        'parentprofile__first_name',
+        'parentprofile__last_name',
+        'studentprofile__first_name',
+        'studentprofile__last_name',
+        'parentprofile__user__email',
+    ).order_by('parentprofile_id', 'pk')
+    for year, section, first, last, child_first, child_last, email in links.iterator(chunk_size=CHUNK_SIZE):
+        groups.setdefault(f"Y{year}_S{section}", []).append(
+            (first, last, f"{child_first} {child_last}", email, NO_PASSWORD)
+        )
+    return groups
+
+
+def _teacher_rows():
+    """Teacher rows with their subject codes (three queries in total)."""
+    teachers = TeacherProfile.objects.select_related('user').prefetch_related(
+        'subjects__subject'
+    ).order_by('pk')
+    return [
+        (
+            t.first_name,
+            t.last_name,
+            ", ".join(offering.subject.subject_code for offering in t.subjects.all()),
+            t.user.email,
+            NO_PASSWORD,
+        )
+        for t in teachers
+    ]
+
+
+def export_accounts(output_file, progress=None):
+    """
+    Write all accounts to an Excel workbook at ``output_file``, with
+    students and parents grouped by Year/Section.
+
+    Each sheet is built from a single query pass and written with an
+    openpyxl write-only workbook, so the query count does not grow with
+    the number of accounts.
+
+    ``progress`` is an optional callable receiving a percentage (0-100)
+    as each account group is finished.
+    """
+    def report(percent):
+        if progress:
+            progress(percent)
+
+    student_groups = _student_groups()
+    report(30)
+    parent_groups = _parent_groups()
+    report(60)
+    teacher_rows = _teacher_rows()
+    report(80)
+
+    workbook = Workbook(write_only=True)
+    sheets = (
+        [(f"Students_{name}", STUDENT_HEADER, rows) for name, rows in student_groups.items()]
+        + [(f"Parents_{name}", PARENT_HEADER, rows) for name, rows in parent_groups.items()]
+        + [("Teachers", TEACHER_HEADER, teacher_rows)]
+    )
+    for title, header, rows in sheets:
+        sheet = workbook.create_sheet(title=title)
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+    workbook.save(output_file)
+    report(100)
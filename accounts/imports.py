@@ -0,0 +1,349 @@
+"""
+Bulk student import from a CSV or XLSX roster.
+
+``StudentImporter.run()`` reads the roster in chunks. Every row is
+validated with the Add Student page's rules (StudentProfileForm, and
+parentProfileForm for a new parent); the valid rows of a chunk are then
+written with bulk_create in one transaction: parent and student users,
+profiles, parent links and subject enrollments. Rows that fail are
+skipped and reported by line number.
+
+Roster columns (header row, any order, case-insensitive):
+
+* ``student_ID``, ``first_name``, ``middle_name``, ``last_name``
+* ``course`` (name or id), ``year``, ``section``, ``is_regular`` (code
+  or label, e.g. ``1st`` / ``1st Year``), ``semester`` (default ``1st``)
+* ``subjects``: subject codes of that course and semester, ``;``-separated
+* the parent, either ``parent_email`` of an existing parent account, or
+  ``parent_first_name``, ``parent_middle_name``, ``parent_last_name`` and
+  ``parent_contact_number`` for a new one (siblings listing the same new
+  parent share one account); leave all blank for no parent
+
+Initial passwords come from accounts.passwords. bulk_create sends no
+post_save signals, so the class caches, dashboard cache and search index
+are refreshed here.
+"""
+import codecs
+import csv
+from dataclasses import dataclass, field
+import re
+
+from django.db import IntegrityError, transaction
+from openpyxl import load_workbook
+
+from academics.models import Course, Subject
+from academics.services import invalidate_rosters, invalidate_section_sizes
+from core import search
+from dashboard.cache import invalidate_dashboards
+
+from .constants import SECTION_CHOICES, STUDENT_STATUS_CHOICES, YEAR_LEVEL_CHOICES
+from .forms import StudentProfileForm, parentProfileForm
+from .models import CustomUser, ParentProfile, StudentProfile
+from .naming import NameAllocator
+from .passwords import initial_password_hashes
+
+
+CHUNK_SIZE = 500
+
+STUDENT_DOMAIN = "student.isufst.com"
+PARENT_DOMAIN = "parent.isufst.com"
+
+COLUMNS = [
+    'student_ID', 'first_name', 'middle_name', 'last_name', 'course', 'year', 'section',
+    'is_regular', 'semester', 'subjects', 'parent_email', 'parent_first_name',
+    'parent_middle_name', 'parent_last_name', 'parent_contact_number',
+]
+REQUIRED_COLUMNS = ['student_ID', 'first_name', 'last_name', 'course', 'year', 'section', 'is_regular']
+PARENT_FIELDS = ['first_name', 'middle_name', 'last_name', 'contact_number']
+
+ERROR_REPORT_HEADER = ["Row", "Student ID", "Errors"]
+
+SEMESTER_CHOICES = (('1st', '1st Semester'), ('2nd', '2nd Semester'))
+
+
+class RosterError(ValueError):
+    """The roster file itself cannot be read (format or header)."""
+
+
+# -------------------------------
+# Reading
+# -------------------------------
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _header(cells):
+    names = {column.lower(): column for column in COLUMNS}
+    header = [names.get(re.sub(r'\s+', '_', _cell(cell).lower()), None) for cell in cells]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise RosterError(f"Missing column(s): {', '.join(missing)}")
+    return header
+
+
+def read_roster(handle, filename):
+    """
+    Yield ``(line_number, row_dict)`` from a binary file handle holding a
+    .csv or .xlsx roster, one row at a time. Blank rows are skipped.
+    """
+    if filename.lower().endswith('.xlsx'):
+        workbook = load_workbook(handle, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+    elif filename.lower().endswith('.csv'):
+        rows = csv.reader(codecs.iterdecode(handle, 'utf-8-sig'))
+    else:
+        raise RosterError("Upload a .csv or .xlsx file.")
+
+    header = None
+    for line, cells in enumerate(rows, start=1):
+        cells = [_cell(cell) for cell in cells]
+        if not any(cells):
+            continue
+        if header is None:
+            header = _header(cells)
+            continue
+        yield line, {column: value for column, value in zip(header, cells) if column}
+    if header is None:
+        raise RosterError("The file is empty.")
+
+
+def write_error_report(errors, handle):
+    """Write ``ImportResult.errors`` as CSV to a text handle."""
+    writer = csv.writer(handle)
+    writer.writerow(ERROR_REPORT_HEADER)
+    writer.writerows(errors)
+
+
+# -------------------------------
+# Importing
+# -------------------------------
+class ImportStudentForm(StudentProfileForm):
+    """
+    StudentProfileForm for roster rows. The importer resolves course names
+    and subject codes against lookups it loads once, and checks student_ID
+    uniqueness per chunk, so those per-row queries are skipped here.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        del self.fields['course']
+        del self.fields['subjects']
+
+    def validate_unique(self):
+        pass
+
+
+def _choice(value, choices):
+    """The choice code for a code or label typed in any case; unknown values pass through."""
+    for code, label in choices:
+        if value.lower() in (code.lower(), label.lower()):
+            return code
+    return value
+
+
+@dataclass
+class ImportResult:
+    students: int = 0
+    parents: int = 0
+    errors: list = field(default_factory=list)   # (line, student_ID, message)
+
+
+@dataclass
+class _Row:
+    line: int
+    student: dict                  # StudentProfileForm.cleaned_data
+    course_id: int
+    subject_ids: list
+    parent_id: int = None          # existing parent
+    parent_key: tuple = None       # new parent, shared by siblings in the file
+    parent: dict = None            # parentProfileForm.cleaned_data
+
+
+class StudentImporter:
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.result = ImportResult()
+        self.allocator = NameAllocator()
+        self.seen_ids = set()
+        self.new_parents = {}   # parent_key -> ParentProfile id
+        self.courses = {}
+        for pk, name in Course.objects.values_list('id', 'name'):
+            self.courses.setdefault(name.lower(), pk)
+            self.courses[str(pk)] = pk
+        self.subjects = {
+            (course_id, semester, code.lower()): pk
+            for pk, course_id, semester, code in Subject.objects.values_list(
+                'id', 'course_id', 'semester_number', 'subject_code',
+            )
+        }
+        self.parents_by_email = {
+            email.lower(): pk
+            for pk, email in ParentProfile.objects.values_list('id', 'user__email')
+            if email
+        }
+
+    def run(self, rows):
+        """Import ``(line, row_dict)`` pairs (see ``read_roster``). Returns an ImportResult."""
+        chunk = []
+        for line, row in rows:
+            chunk.append((line, row))
+            if len(chunk) == self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        if self.result.students:
+            # Every chunk has committed by now
+            invalidate_section_sizes()
+            invalidate_rosters()
+            invalidate_dashboards()
+        return self.result
+
+    def _error(self, line, row, message):
+        self.result.errors.append((line, row.get('student_ID', ''), message))
+
+    def _validate(self, line, row):
+        """A _Row for a valid roster row, or None after recording its errors."""
+        semester = _choice(row.get('semester') or '1st', SEMESTER_CHOICES)
+        data = {
+            'student_ID': row.get('student_ID', ''),
+            'first_name': row.get('first_name', ''),
+            'middle_name': row.get('middle_name', ''),
+            'last_name': row.get('last_name', ''),
+            'year': _choice(row.get('year', ''), YEAR_LEVEL_CHOICES),
+            'section': _choice(row.get('section', ''), SECTION_CHOICES),
+            'is_regular': _choice(row.get('is_regular', ''), STUDENT_STATUS_CHOICES),
+            'semester': semester,
+        }
+        errors = []
+        course_id = self.courses.get(row.get('course', '').lower())
+        if course_id is None:
+            errors.append(f"course: no course named {row.get('course', '')!r}" if row.get('course') else "course: This field is required.")
+
+        subject_ids = []
+        for code in filter(None, (code.strip() for code in re.split(r'[;,]', row.get('subjects', '')))):
+            subject_id = self.subjects.get((course_id, semester, code.lower()))
+            if subject_id is None:
+                errors.append(f"subjects: no {code} in this course's {semester} semester")
+            else:
+                subject_ids.append(subject_id)
+
+        form = ImportStudentForm(data, semester=semester, course=course_id)
+        if not form.is_valid():
+            errors.extend(
+                f"{name}: {' '.join(messages)}" if name != '__all__' else ' '.join(messages)
+                for name, messages in form.errors.items()
+            )
+        student_id = data['student_ID']
+        if student_id in self.seen_ids:
+            errors.append(f"student_ID: {student_id} appears more than once in the file")
+
+        parsed = _Row(line=line, student=form.cleaned_data, course_id=course_id, subject_ids=subject_ids)
+        parent_email = row.get('parent_email', '').lower()
+        parent_data = {name: row.get(f'parent_{name}', '') for name in PARENT_FIELDS}
+        if parent_email:
+            parsed.parent_id = self.parents_by_email.get(parent_email)
+            if parsed.parent_id is None:
+                errors.append(f"parent_email: no parent account with email {parent_email}")
+        elif any(parent_data.values()):
+            parent_form = parentProfileForm(parent_data)
+            if parent_form.is_valid():
+                parsed.parent = parent_form.cleaned_data
+                parsed.parent_key = tuple(str(parent_data[name]).lower() for name in PARENT_FIELDS)
+            else:
+                errors.extend(
+                    f"parent_{name}: {' '.join(messages)}" for name, messages in parent_form.errors.items()
+                )
+
+        if errors:
+            self._error(line, row, '; '.join(errors))
+            return None
+        self.seen_ids.add(student_id)
+        return parsed
+
+    def _import_chunk(self, chunk):
+        parsed = [row for row in (self._validate(line, row) for line, row in chunk) if row]
+        if not parsed:
+            return
+
+        # Already enrolled student IDs, one query per chunk
+        taken = set(
+            StudentProfile.objects.filter(
+                student_ID__in=[row.student['student_ID'] for row in parsed]
+            ).values_list('student_ID', flat=True)
+        )
+        by_line = dict(chunk)
+        for row in parsed:
+            if row.student['student_ID'] in taken:
+                self._error(row.line, by_line[row.line], "student_ID: Student profile with this Student ID already exists.")
+        parsed = [row for row in parsed if row.student['student_ID'] not in taken]
+        if not parsed:
+            return
+
+        known_parents = set(self.new_parents)
+        try:
+            with transaction.atomic():
+                students, parents = self._write(parsed)
+        except IntegrityError as error:
+            # A concurrent create took an ID or username; the chunk is rolled back
+            for row in parsed:
+                self._error(row.line, by_line[row.line], f"Not imported: {error}")
+            for key in set(self.new_parents) - known_parents:
+                del self.new_parents[key]
+            return
+        self.result.students += students
+        self.result.parents += parents
+
+    def _write(self, rows):
+        new_parents = {}
+        for row in rows:
+            if row.parent_key and row.parent_key not in self.new_parents:
+                new_parents.setdefault(row.parent_key, row.parent)
+
+        people = [(p['first_name'], p['last_name'], PARENT_DOMAIN) for p in new_parents.values()]
+        people += [(row.student['first_name'], row.student['last_name'], STUDENT_DOMAIN) for row in rows]
+        names = self.allocator.allocate_many(people)
+        passwords = initial_password_hashes(len(names))
+
+        users = CustomUser.objects.bulk_create([
+            CustomUser(
+                email=email, username=username, password=password, first_login=True,
+                role='parent' if index < len(new_parents) else 'student',
+            )
+            for index, ((email, username), password) in enumerate(zip(names, passwords))
+        ])
+        parent_users, student_users = users[:len(new_parents)], users[len(new_parents):]
+
+        parent_profiles = ParentProfile.objects.bulk_create([
+            ParentProfile(user=user, **data)
+            for user, data in zip(parent_users, new_parents.values())
+        ])
+        for key, profile in zip(new_parents, parent_profiles):
+            self.new_parents[key] = profile.pk
+
+        student_fields = ['student_ID', 'first_name', 'middle_name', 'last_name', 'year', 'section', 'is_regular']
+        profiles = StudentProfile.objects.bulk_create([
+            StudentProfile(user=user, course_id=row.course_id, **{name: row.student[name] for name in student_fields})
+            for user, row in zip(student_users, rows)
+        ])
+
+        ParentLink = StudentProfile.parents.through
+        ParentLink.objects.bulk_create([
+            ParentLink(studentprofile_id=profile.pk, parentprofile_id=row.parent_id or self.new_parents[row.parent_key])
+            for profile, row in zip(profiles, rows)
+            if row.parent_id or row.parent_key
+        ])
+        Enrollment = StudentProfile.subjects.through
+        Enrollment.objects.bulk_create([
+            Enrollment(studentprofile_id=profile.pk, subject_id=subject_id)
+            for profile, row in zip(profiles, rows)
+            for subject_id in row.subject_ids
+        ])
+
+        search.index('student', pk__in=[profile.pk for profile in profiles])
+        search.index('parent', pk__in=[profile.pk for profile in parent_profiles])
+        return len(profiles), len(parent_profiles)
@@ -0,0 +1,68 @@
+"""
+Local background runner for account exports.
+
+Jobs are rows in ExportJob. Submitting a job hands its id to a small
+in-process thread pool; the ``run_export_jobs`` management command can
+also drain pending jobs (for example ones queued before a restart).
+Either way a job is claimed with a conditional UPDATE, so it only runs
+once.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from .exports import export_accounts
+from .models import ExportJob
+
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='export-job')
+
+
+def export_dir():
+    path = getattr(settings, 'EXPORT_ROOT', settings.BASE_DIR / 'exports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def submit_export_job(user):
+    """Queue a new account export for ``user`` and start it in the background."""
+    job = ExportJob.objects.create(requested_by=user)
+    _executor.submit(run_export_job, job.pk)
+    return job
+
+
+def run_export_job(job_id):
+    """Claim and run one pending job. Returns False if someone else claimed it."""
+    close_old_connections()
+    try:
+        claimed = ExportJob.objects.filter(pk=job_id, status='pending').update(status='running')
+        if not claimed:
+            return False
+
+        job = ExportJob.objects.get(pk=job_id)
+        output_file = os.path.join(export_dir(), job.filename)
+
+        def progress(percent):
+            ExportJob.objects.filter(pk=job_id).update(progress=percent)
+
+        try:
+            export_accounts(output_file, progress=progress)
+        except Exception as error:
+            logger.exception("Account export job %s failed", job_id)
+            ExportJob.objects.filter(pk=job_id).update(
+                status='failed', error=str(error), finished_at=timezone.now(),
+            )
+        else:
+            ExportJob.objects.filter(pk=job_id).update(
+                status='done', progress=100, file_path=output_file, finished_at=timezone.now(),
+            )
+        return True
+    finally:
+        # Worker threads own their connection; don't leak it
+        connection.close()
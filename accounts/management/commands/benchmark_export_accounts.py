@@ -0,0 +1,108 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+import os
+import tempfile
+import time
+
+from academics.models import Course, Subject, SubjectOffering
+from accounts.exports import export_accounts
+from accounts.models import CustomUser, ParentProfile, StudentProfile, TeacherProfile
+from accounts.constants import SECTION_CHOICES, YEAR_LEVEL_CHOICES
+
+
+class _Rollback(Exception):
+    """Raised to discard the seeded accounts after the run."""
+
+
+class _QueryCounter:
+    """Counts executed statements without keeping them in memory."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = "Benchmark export_accounts: query count and seconds per 1k accounts (seeded data is rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students',
+            type=int,
+            nargs='+',
+            default=[1000, 5000],
+            help='Number of students to seed per run; each gets a parent, plus 1 teacher per 25 students',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'accounts':>9} {'queries':>8} {'seconds':>9} {'s/1k':>8}")
+        for students in options['students']:
+            try:
+                with transaction.atomic():
+                    accounts = self._seed(students)
+                    queries, seconds = self._run()
+                    self.stdout.write(
+                        f"{accounts:>9} {queries:>8} {seconds:>9.3f} {seconds / accounts * 1000:>8.3f}"
+                    )
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _run(self):
+        counter = _QueryCounter()
+        fd, path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        try:
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                export_accounts(path)
+                elapsed = time.perf_counter() - started
+        finally:
+            os.remove(path)
+        return counter.count, elapsed
+
+    def _seed(self, students):
+        teachers = max(1, students // 25)
+        course = Course.objects.create(name='BENCH', description='Benchmark course')
+        subjects = Subject.objects.bulk_create([
+            Subject(course=course, subject_code=f'BX-{i}', name=f'Bench {i}',
+                    semester_number='1st', year_level=YEAR_LEVEL_CHOICES[i % 4][0])
+            for i in range(teachers)
+        ])
+
+        users = CustomUser.objects.bulk_create(
+            [CustomUser(username=f'bx-s{i}', email=f'bx-s{i}@bench.local', role='student') for i in range(students)]
+            + [CustomUser(username=f'bx-p{i}', email=f'bx-p{i}@bench.local', role='parent') for i in range(students)]
+            + [CustomUser(username=f'bx-t{i}', email=f'bx-t{i}@bench.local', role='teacher') for i in range(teachers)]
+        )
+        student_users = users[:students]
+        parent_users = users[students:2 * students]
+        teacher_users = users[2 * students:]
+
+        student_rows = StudentProfile.objects.bulk_create([
+            StudentProfile(user=user, student_ID=f'BX{i:07d}', first_name='Bench', last_name=str(i),
+                           course=course, year=YEAR_LEVEL_CHOICES[i % 4][0],
+                           section=SECTION_CHOICES[i % 4][0], is_regular='reg')
+            for i, user in enumerate(student_users)
+        ])
+        parent_rows = ParentProfile.objects.bulk_create([
+            ParentProfile(user=user, first_name='Parent', middle_name='', last_name=str(i))
+            for i, user in enumerate(parent_users)
+        ])
+        StudentProfile.parents.through.objects.bulk_create([
+            StudentProfile.parents.through(studentprofile_id=s.pk, parentprofile_id=p.pk)
+            for s, p in zip(student_rows, parent_rows)
+        ])
+        teacher_rows = TeacherProfile.objects.bulk_create([
+            TeacherProfile(user=user, first_name='Teacher', last_name=str(i))
+            for i, user in enumerate(teacher_users)
+        ])
+        SubjectOffering.objects.bulk_create([
+            SubjectOffering(subject=subject, teacher=teacher, year=subject.year_level,
+                            section=SECTION_CHOICES[0][0], school_year='bench')
+            for subject, teacher in zip(subjects, teacher_rows)
+        ])
+        return students * 2 + teachers
@@ -0,0 +1,93 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils.functional import SimpleLazyObject
+import time
+
+from accounts.middleware import FirstLoginMiddleware
+from accounts.models import CustomUser
+
+
+class _Rollback(Exception):
+    """Raised to discard the seeded users after the run."""
+
+
+class _QueryCounter:
+    """Counts executed statements without keeping them in memory."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _ok(request):
+    return HttpResponse()
+
+
+class Command(BaseCommand):
+    help = "Benchmark FirstLoginMiddleware: per-request overhead and queries (seeded users are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        try:
+            with transaction.atomic():
+                returning = CustomUser.objects.create(
+                    username='bench-returning', email='bench-returning@bench.local', role='teacher',
+                    first_login=False,
+                )
+                first = CustomUser.objects.create(
+                    username='bench-first', email='bench-first@bench.local', role='teacher',
+                    first_login=True,
+                )
+                scenarios = [
+                    ('static file', '/static/css/style.css', None),
+                    ('anonymous', '/dashboard/', None),
+                    ('returning user', '/dashboard/', returning.pk),
+                    ('first login (redirect)', '/dashboard/', first.pk),
+                ]
+                self.stdout.write(f"{total} requests per scenario")
+                self.stdout.write(f"{'scenario':<24} {'queries':>8} {'us/request':>11} {'overhead us':>12}")
+                baseline = self._time(_ok, total, '/dashboard/', None)[1]
+                for label, path, user_id in scenarios:
+                    queries, seconds = self._time(FirstLoginMiddleware(_ok), total, path, user_id)
+                    self.stdout.write(
+                        f"{label:<24} {queries:>8} {seconds / total * 1e6:>11.2f} "
+                        f"{(seconds - baseline) / total * 1e6:>12.2f}"
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _time(self, handler, total, path, user_id):
+        """
+        Send ``total`` requests through ``handler``. As with a real browser,
+        the session persists across requests; the user is loaded lazily
+        like AuthenticationMiddleware does, so untouched users cost nothing.
+        """
+        factory = RequestFactory()
+        session = {}
+        requests = []
+        for _ in range(total):
+            request = factory.get(path)
+            request.session = session
+            if user_id is None:
+                request.user = AnonymousUser()
+            else:
+                request.user = SimpleLazyObject(lambda: CustomUser.objects.get(pk=user_id))
+            requests.append(request)
+
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            started = time.perf_counter()
+            for request in requests:
+                handler(request)
+            elapsed = time.perf_counter() - started
+        return counter.count, elapsed
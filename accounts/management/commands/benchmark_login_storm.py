@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+import random
+import time
+
+import numpy as np
+
+from accounts.models import CustomUser
+
+
+PASSWORD = 'bench-password'
+PREFIX = 'bench-storm-'
+
+
+class _QueryCounter:
+    """Counts executed statements without keeping them in memory."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark a login storm: every login submitted at once (the 8am rush), "
+        "reporting p50/p99 latency for good, wrong-password and unknown-account logins. "
+        "Seeded users are committed so worker threads can see them, and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=16, help='Concurrent request threads')
+        parser.add_argument('--failed', type=float, default=0.2, help='Share of failed logins')
+
+    def handle(self, *args, **options):
+        logins, workers = options['logins'], options['workers']
+        rng = random.Random(0)
+        attempts = []
+        for i in range(logins):
+            roll = rng.random()
+            if roll >= options['failed']:
+                # Half by username, half by email typed in upper case
+                name = f'{PREFIX}{i}' if i % 2 else f'{PREFIX}{i}@BENCH.LOCAL'
+                attempts.append(('ok', name, PASSWORD))
+            elif roll < options['failed'] / 2:
+                attempts.append(('wrong password', f'{PREFIX}{i}', 'not-the-password'))
+            else:
+                attempts.append(('unknown account', f'nobody-{i}@bench.local', PASSWORD))
+
+        # Hash once and share it; hashing every password up front would dwarf the run
+        encoded = make_password(PASSWORD)
+        CustomUser.objects.bulk_create([
+            CustomUser(username=f'{PREFIX}{i}', email=f'{PREFIX}{i}@bench.local', role='student',
+                       first_login=False, password=encoded)
+            for i in range(logins)
+        ])
+
+        try:
+            self.stdout.write(f"queries per login: {self._queries_per_login(attempts)}")
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda attempt: self._login(attempt, started), attempts))
+            elapsed = time.perf_counter() - started
+        finally:
+            CustomUser.objects.filter(username__startswith=PREFIX).delete()
+
+        self.stdout.write(f"{logins} logins, {workers} workers, {elapsed:.2f}s wall clock")
+        self.stdout.write(
+            f"{'outcome':<16} {'count':>6} {'p50 auth':>9} {'p99 auth':>9} {'p50 wait':>9} {'p99 wait':>9}"
+        )
+        for outcome in ('ok', 'wrong password', 'unknown account'):
+            rows = [(auth, done) for kind, auth, done, _user in results if kind == outcome]
+            if not rows:
+                continue
+            auth, done = np.array(rows).T
+            self.stdout.write(
+                f"{outcome:<16} {len(rows):>6} {np.percentile(auth, 50):>8.3f}s {np.percentile(auth, 99):>8.3f}s "
+                f"{np.percentile(done, 50):>8.3f}s {np.percentile(done, 99):>8.3f}s"
+            )
+        wrong = [kind for kind, _auth, _done, user in results if (user is None) == (kind == 'ok')]
+        if wrong:
+            self.stderr.write(f"{len(wrong)} logins had an unexpected outcome")
+
+    def _queries_per_login(self, attempts):
+        counts = {}
+        for kind, username, password in attempts:
+            if kind in counts:
+                continue
+            counter = _QueryCounter()
+            with connection.execute_wrapper(counter):
+                authenticate(None, username=username, password=password)
+            counts[kind] = counter.count
+        return ', '.join(f'{kind} {count}' for kind, count in counts.items())
+
+    @staticmethod
+    def _login(attempt, storm_started):
+        """
+        One login as a request thread would run it. Returns the outcome,
+        the authenticate() time, the time since the storm began (queueing
+        included) and the user.
+        """
+        kind, username, password = attempt
+        try:
+            started = time.perf_counter()
+            user = authenticate(None, username=username, password=password)
+            finished = time.perf_counter()
+        finally:
+            connection.close()
+        return kind, finished - started, finished - storm_started, user
+
@@ -0,0 +1,53 @@
+from django.contrib.auth.hashers import check_password, get_hasher
+from django.core.management.base import BaseCommand
+import copy
+import os
+import time
+
+from accounts.passwords import hash_passwords
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark initial password hashing for bulk provisioning: serial versus "
+        "accounts.passwords.hash_passwords() across worker processes. No database access."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, nargs='+', default=[1000, 10000])
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Default: one per core')
+        parser.add_argument('--hasher', default='default', help="A PASSWORD_HASHERS algorithm, e.g. 'pbkdf2_sha256'")
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            help="Override the hasher's iteration count for a shorter run (PBKDF2 only)",
+        )
+
+    def handle(self, *args, **options):
+        hasher = copy.copy(get_hasher(options['hasher']))
+        if options['iterations']:
+            hasher.iterations = options['iterations']
+        workers = options['workers']
+
+        self.stdout.write(
+            f"{hasher.algorithm}, {getattr(hasher, 'iterations', '-')} iterations, "
+            f"{workers} workers, {os.cpu_count()} cores"
+        )
+        self.stdout.write(f"{'accounts':>8} {'serial':>9} {'parallel':>9} {'per hash':>9} {'speedup':>8}")
+        for count in options['accounts']:
+            passwords = [f'initial-{i}' for i in range(count)]
+
+            started = time.perf_counter()
+            hash_passwords(passwords, hasher=hasher, workers=1)
+            serial = time.perf_counter() - started
+
+            started = time.perf_counter()
+            hashed = hash_passwords(passwords, hasher=hasher, workers=workers)
+            parallel = time.perf_counter() - started
+
+            if not check_password(passwords[-1], hashed[-1]):
+                self.stderr.write(f"{count}: parallel hashes don't verify")
+            self.stdout.write(
+                f"{count:>8} {serial:>8.2f}s {parallel:>8.2f}s {parallel / count * 1000:>7.2f}ms "
+                f"{serial / parallel:>7.1f}x"
+            )
@@ -0,0 +1,50 @@
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+import os
+import time
+
+from accounts.imports import CHUNK_SIZE, RosterError, StudentImporter, read_roster, write_error_report
+
+
+class _DryRun(Exception):
+    """Raised to roll the whole import back."""
+
+
+class Command(BaseCommand):
+    help = "Import students (with parents and subject enrollments) from a .csv or .xlsx roster"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Roster file (.csv or .xlsx); see accounts/imports.py for the columns')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--errors',
+            help='Where to write the per-row error report (default: <roster>.errors.csv)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Validate and import, then roll back')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        importer = StudentImporter(chunk_size=options['chunk_size'])
+        started = time.perf_counter()
+        try:
+            # Chunks commit one by one, except in a dry run
+            with open(path, 'rb') as handle, transaction.atomic() if options['dry_run'] else nullcontext():
+                result = importer.run(read_roster(handle, path))
+                if options['dry_run']:
+                    raise _DryRun
+        except _DryRun:
+            result = importer.result
+        except (OSError, RosterError) as error:
+            raise CommandError(str(error))
+        elapsed = time.perf_counter() - started
+
+        verb = "Would import" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result.students} students and {result.parents} new parents in {elapsed:.1f}s."
+        ))
+        if result.errors:
+            report = options['errors'] or f"{os.path.splitext(path)[0]}.errors.csv"
+            with open(report, 'w', newline='') as handle:
+                write_error_report(result.errors, handle)
+            self.stdout.write(self.style.WARNING(f"{len(result.errors)} rows skipped; see {report}"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+import time
+
+from accounts.jobs import run_export_job
+from accounts.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = "Run pending account export jobs (use --once to drain the queue and exit)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the pending jobs once and exit instead of polling',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds between polls when running continuously (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            pending = list(
+                ExportJob.objects.filter(status='pending').order_by('created_at').values_list('id', flat=True)
+            )
+            for job_id in pending:
+                if run_export_job(job_id):
+                    job = ExportJob.objects.get(pk=job_id)
+                    style = self.style.SUCCESS if job.status == 'done' else self.style.ERROR
+                    self.stdout.write(style(f'Export job #{job_id}: {job.status}'))
+
+            if options['once']:
+                break
+            time.sleep(options['interval'])
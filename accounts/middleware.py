@@ -2,38 +2,59 @@
 from django.shortcuts import redirect
 from django.urls import reverse
 
+# Session key caching whether the logged-in user still has to change
+# their first-login password (see FirstLoginMiddleware)
+FIRST_LOGIN_SESSION_KEY = '_first_login'
+
+
 class FirstLoginMiddleware:
     """
     Redirect users to change password if first_login=True,
     but exclude superusers, login page, change-password page, admin, and static files.
+
+    Excluded paths are checked first, so static/admin requests never touch
+    the session or the user. The flag is cached in the session on the
+    first authenticated request, and later requests do not need to load
+    the user at all. change_password clears it.
     """
+    excluded_prefixes = ('/admin/', '/static/', '/media/')
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self._excluded_paths = None
+
+    @property
+    def excluded_paths(self):
+        # Resolved once, on first use: the URLconf is not necessarily
+        # importable yet while middleware is being instantiated
+        if self._excluded_paths is None:
+            self._excluded_paths = frozenset([
+                reverse('accounts:change_password'),  # change password page
+                reverse('accounts:login'),            # login page
+            ])
+        return self._excluded_paths
 
     def __call__(self, request):
-        # Only apply if user is authenticated
-        user = request.user
-        if user.is_authenticated:
-            # Exclude superusers
-            if user.is_superuser:
-                return self.get_response(request)
+        path = request.path
+        if path.startswith(self.excluded_prefixes) or path in self.excluded_paths:
+            return self.get_response(request)
 
-            # Excluded paths
-            excluded_paths = [
-                reverse('accounts:change_password'),  # change password page
-                reverse('accounts:login'),           # login page
-            ]
-            
-            if request.path.startswith('/admin/'):
-                return self.get_response(request)
-            if request.path.startswith('/static/') or request.path.startswith('/media/'):
-                return self.get_response(request)
-            if request.path in excluded_paths:
-                return self.get_response(request)
-
-            # Redirect first-login users
-            if getattr(user, 'first_login', False):
-                return redirect('accounts:change_password')
-
-        response = self.get_response(request)
-        return response
+        # Redirect first-login users
+        if must_change_password(request):
+            return redirect('accounts:change_password')
+
+        return self.get_response(request)
+
+
+def must_change_password(request):
+    """Whether the request's user still has to replace their first-login password."""
+    session = request.session
+    flag = session.get(FIRST_LOGIN_SESSION_KEY)
+    if flag is None:
+        user = request.user
+        if not user.is_authenticated:
+            return False
+        # Superusers are never forced through the change-password page
+        flag = bool(getattr(user, 'first_login', False)) and not user.is_superuser
+        session[FIRST_LOGIN_SESSION_KEY] = flag
+    return flag
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 from accounts.constants import YEAR_LEVEL_CHOICES, SECTION_CHOICES, STUDENT_STATUS_CHOICES
 
@@ -13,6 +14,12 @@ class CustomUser(AbstractUser):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES)
     first_login = models.BooleanField(default=True)
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Login by email (EmailOrUsernameBackend matches it case-insensitively)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+        ]
+
 # Parent Profile
 class ParentProfile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE, limit_choices_to={'role':'parent'})
@@ -55,3 +62,27 @@ class StudentProfile(models.Model):
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
+
+
+# Background account export
+class ExportJob(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    requested_by = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, related_name='export_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    file_path = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Export #{self.pk} - {self.status}"
+
+    @property
+    def filename(self):
+        return f"school_accounts_{self.pk}.xlsx"
@@ -0,0 +1,137 @@
+"""
+Unique email/username allocation for new accounts.
+
+Accounts are named ``first.last@domain`` / ``first.last``, with the
+first free numeric suffix (``first.last1``, ``first.last2``...) when
+taken. ``NameAllocator`` reads every existing email and username that
+starts with a name's slug in one indexed range query and picks suffixes
+in memory, remembering what it has handed out, so a batch of thousands
+of names costs one query per few hundred distinct slugs.
+
+Two requests can still pick the same free username at once; the unique
+constraint on username catches that, and ``save_with_unique_name()``
+retries with a fresh read.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.text import slugify
+
+from .models import CustomUser
+
+
+# Distinct slugs per lookup query (4 bound parameters each)
+LOOKUP_CHUNK = 200
+
+SAVE_ATTEMPTS = 3
+
+# Sorts after any character a slug can continue with
+_RANGE_END = '\U0010ffff'
+
+
+def name_base(first_name, last_name):
+    return f"{slugify(first_name)}.{slugify(last_name)}"
+
+
+def _prefixes(value, bases):
+    """The loaded slugs ``value`` starts with."""
+    return [value[:end] for end in range(len(value), 0, -1) if value[:end] in bases]
+
+
+class NameAllocator:
+    """
+    Hands out unique ``(email, username)`` pairs, e.g.::
+
+        allocator = NameAllocator()
+        email, username = allocator.allocate('Juan', 'Dela Cruz', 'student.isufst.com')
+        pairs = allocator.allocate_many([('Ana', 'Reyes', 'student.isufst.com'), ...])
+    """
+
+    def __init__(self):
+        self._emails = {}      # base -> emails starting with it (lowercased)
+        self._usernames = {}   # base -> usernames starting with it
+        self._next = {}        # (kind, key) -> first suffix worth trying
+
+    def prefetch(self, bases):
+        """Load the taken names for every slug in ``bases`` not loaded yet."""
+        pending = [base for base in dict.fromkeys(bases) if base not in self._usernames]
+        for start in range(0, len(pending), LOOKUP_CHUNK):
+            chunk = pending[start:start + LOOKUP_CHUNK]
+            condition = Q()
+            for base in chunk:
+                # Ranges rather than startswith, which is LIKE on SQLite and
+                # skips the username and LOWER(email) indexes
+                condition |= Q(username__gte=base, username__lt=base + _RANGE_END)
+                condition |= Q(email_lower__gte=base, email_lower__lt=base + _RANGE_END)
+            rows = (
+                CustomUser.objects.alias(email_lower=Lower('email'))
+                .filter(condition)
+                .values_list('username', 'email')
+            )
+            for base in chunk:
+                self._emails[base] = set()
+                self._usernames[base] = set()
+            for username, email in rows:
+                for base in _prefixes(username, self._usernames):
+                    self._usernames[base].add(username)
+                for base in _prefixes(email.lower(), self._emails):
+                    self._emails[base].add(email.lower())
+
+    def forget(self, base):
+        """Drop what is known about ``base`` so the next allocation re-reads it."""
+        self._emails.pop(base, None)
+        self._usernames.pop(base, None)
+        for key in [key for key in self._next if key[1][0] == base]:
+            del self._next[key]
+
+    def _first_free(self, kind, key, taken, candidate):
+        counter = self._next.get((kind, key), 0)
+        while candidate(counter) in taken:
+            counter += 1
+        self._next[(kind, key)] = counter + 1
+        name = candidate(counter)
+        taken.add(name)
+        return name
+
+    def allocate(self, first_name, last_name, domain='CSS.com'):
+        base = name_base(first_name, last_name)
+        self.prefetch([base])
+        domain = domain.lower()
+        email = self._first_free(
+            'email', (base, domain), self._emails[base],
+            lambda counter: f"{base}{counter or ''}@{domain}",
+        )
+        username = self._first_free(
+            'username', (base,), self._usernames[base],
+            lambda counter: f"{base}{counter or ''}",
+        )
+        return email, username
+
+    def allocate_many(self, people):
+        """
+        ``(email, username)`` for every ``(first_name, last_name, domain)``
+        in ``people``, in order, unique among themselves and against the
+        database.
+        """
+        people = list(people)
+        self.prefetch(name_base(first, last) for first, last, _domain in people)
+        return [self.allocate(first, last, domain) for first, last, domain in people]
+
+
+def save_with_unique_name(user, first_name, last_name, domain, allocator=None):
+    """
+    Name ``user`` with a fresh email/username and save it. If a concurrent
+    request took the username in the meantime, re-read and try again.
+    """
+    allocator = allocator or NameAllocator()
+    base = name_base(first_name, last_name)
+    for attempt in range(SAVE_ATTEMPTS):
+        user.email, user.username = allocator.allocate(first_name, last_name, domain)
+        try:
+            with transaction.atomic():
+                user.save()
+            return user
+        except IntegrityError:
+            if attempt == SAVE_ATTEMPTS - 1:
+                raise
+            allocator.forget(base)
@@ -0,0 +1,58 @@
+"""
+Initial password hashes for new accounts.
+
+Bulk-provisioned accounts get a random password nobody is told (the
+first login goes straight to the change-password page), hashed with the
+default hasher unless ``settings.INITIAL_PASSWORD_HASHER`` names another.
+``hash_passwords()`` spreads a batch over a process pool, one worker per
+core, so PBKDF2 (about 0.4s a hash at Django 5.2's iteration count)
+doesn't serialize bulk provisioning; the hashes come back in order,
+ready for ``bulk_create``.
+
+Workers only receive the hasher instance and plain strings, never Django
+settings or models, so they work with any multiprocessing start method.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.utils.crypto import get_random_string
+
+
+# Fewer passwords per worker than this and starting the pool costs more than it saves
+MIN_PER_WORKER = 8
+
+# Batches handed out per worker, so a slow worker doesn't hold up the rest
+BATCHES_PER_WORKER = 4
+
+
+def _encode(hasher, passwords):
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
+
+
+def hash_passwords(passwords, hasher='default', workers=None):
+    """
+    ``make_password()`` of every password in ``passwords``, in order.
+    ``workers`` defaults to the number of cores; 1 hashes in this process.
+    """
+    hasher = get_hasher(hasher)
+    passwords = list(passwords)
+    workers = min(workers or os.cpu_count() or 1, len(passwords) // MIN_PER_WORKER)
+    if workers <= 1:
+        return _encode(hasher, passwords)
+
+    size = -(-len(passwords) // (workers * BATCHES_PER_WORKER))
+    batches = [passwords[start:start + size] for start in range(0, len(passwords), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hashed = pool.map(_encode, [hasher] * len(batches), batches)
+        return [encoded for batch in hashed for encoded in batch]
+
+
+def initial_password_hashes(count, workers=None):
+    """Hashes of ``count`` random initial passwords."""
+    return hash_passwords(
+        (get_random_string(8) for _ in range(count)),
+        hasher=getattr(settings, 'INITIAL_PASSWORD_HASHER', 'default'),
+        workers=workers,
+    )
@@ -1,3 +1,44 @@
-from django.test import TestCase
+import copy
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password, get_hasher
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from academics.models import Course
+from dashboard.cache import make_key
+
+from .imports import StudentImporter
+from .models import StudentProfile
+from .passwords import hash_passwords, initial_password_hashes
+
+
+class HashPasswordsTests(SimpleTestCase):
+    def setUp(self):
+        # Real PBKDF2 with a work factor small enough for a test
+        self.hasher = copy.copy(get_hasher('pbkdf2_sha256'))
+        self.hasher.iterations = 1000
+
+    def test_parallel_hashes_verify_in_order(self):
+        passwords = [f'password-{index}' for index in range(40)]
+        hashed = hash_passwords(passwords, hasher=self.hasher, workers=2)
+        self.assertEqual(len(hashed), len(passwords))
+        self.assertTrue(all(check_password(password, encoded) for password, encoded in zip(passwords, hashed)))
+
+    def test_initial_passwords_use_the_default_hasher(self):
+        self.assertTrue(initial_password_hashes(1)[0].startswith('pbkdf2_sha256$'))
+
+
+class StudentImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Course.objects.create(name='BSIT', description='Information Technology')
+
+    def test_import_invalidates_dashboards(self):
+        cached_under = make_key('admin', 1, {})
+        result = StudentImporter().run([(2, {
+            'student_ID': '2025-0001', 'first_name': 'Ana', 'last_name': 'Cruz',
+            'course': 'BSIT', 'year': '1st', 'section': 'a', 'is_regular': 'reg',
+        })])
+        self.assertEqual((result.students, result.errors), (1, []))
+        self.assertTrue(StudentProfile.objects.filter(student_ID='2025-0001').exists())
+        self.assertNotEqual(make_key('admin', 1, {}), cached_under)
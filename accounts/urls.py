@@ -8,6 +8,7 @@ urlpatterns = [
     path("teachers/<int:teacher_id>/delete/", views.delete_teacher, name="delete_teacher"),
     path('student/',views.manage_student,name='manage_student'),
     path('students/add/',views.add_student,name='add_student'),
+    path('students/import/',views.import_students,name='import_students'),
     path('student/<str:student_id>/edit/',views.edit_student, name = 'edit_student'),
     path('delete-student/<str:student_id>/',views.delete_student, name='delete_student'),
     path('ajax/load-subjects/', views.load_subjects, name='load_subjects'),
@@ -20,4 +21,7 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('accounts-dashboard/',views.accounts_dashboard, name='accounts_dashboard'),
     path('export-accounts/', views.export_accounts_view, name='export_accounts_view'),
+    path('export-accounts/<int:job_id>/', views.export_job_status, name='export_job_status'),
+    path('export-accounts/<int:job_id>/progress/', views.export_job_progress, name='export_job_progress'),
+    path('export-accounts/<int:job_id>/download/', views.export_job_download, name='export_job_download'),
 ]
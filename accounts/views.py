@@ -1,21 +1,28 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import TeacherProfile,StudentProfile,CustomUser,ParentProfile
+from .models import TeacherProfile,StudentProfile,CustomUser,ParentProfile,ExportJob
 from .forms import TeacherProfileForm, TeacherUserForm,StudentUserForm,StudentProfileForm,parentProfileForm,parentUserForm
 from django.contrib.auth import get_user_model,update_session_auth_hash,authenticate,login,logout
 from django.utils.crypto import get_random_string
 from django.contrib import messages
 from django.views.decorators.http import require_POST
-from django.http import JsonResponse,HttpResponse
+from django.http import JsonResponse,HttpResponse,FileResponse
 from django.views.decorators.http import require_GET
 from academics.models import Semester, Subject, SubjectOffering,Course
+from academics.services import subjects_by_class
+from core.pagination import PrimaryKeyPaginator
 from django.utils.text import slugify
 from django.contrib.auth import get_user_model
 from django.db import IntegrityError
+from django.db.models import Q
 from django.core.exceptions import ValidationError
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.forms import SetPasswordForm
 from accounts.constants import YEAR_LEVEL_CHOICES, SECTION_CHOICES
-from django.core.management import call_command
+from .jobs import submit_export_job
+from .middleware import FIRST_LOGIN_SESSION_KEY
+from .naming import NameAllocator, save_with_unique_name
+from .imports import COLUMNS as IMPORT_COLUMNS, RosterError, StudentImporter, read_roster, write_error_report
+import io
 import os
 
 
@@ -24,26 +31,8 @@ User = get_user_model()
 
 
 def generate_unique_email(first_name, last_name, domain='CSS.com'):
-    # Base parts
-    base = f"{slugify(first_name)}.{slugify(last_name)}"
-
-    # ---- UNIQUE EMAIL ----
-    email = f"{base}@{domain}"
-    counter = 1
-    while CustomUser.objects.filter(email=email).exists():
-        email = f"{base}{counter}@{domain}"
-        counter += 1   # <-- FIXED (you wrote =+1 which is wrong)
-
-    # ---- UNIQUE USERNAME ----
-    username = base
-    counter = 1
-    while CustomUser.objects.filter(username=username).exists():
-        username = f"{base}{counter}"
-        counter += 1
-
-    return email, username
-
-    
+    """First free ``(email, username)`` for a new account; see accounts.naming."""
+    return NameAllocator().allocate(first_name, last_name, domain)
 
 
 # -------------------------------
@@ -78,17 +67,12 @@ def add_teacher(request):
 
             teacher_first_name = profile_form.cleaned_data['first_name']
             teacher_last_name = profile_form.cleaned_data['last_name']
-            teacher_email,teacher_username = generate_unique_email(
-                teacher_first_name,teacher_last_name,domain="teacher.isufst.com"
-            )
 
             user = user_form.save(commit=False)
-            user.email = teacher_email
-            user.username = teacher_username
             user.set_password(get_random_string(8))
             user.first_login = True
             user.role = 'teacher'
-            user.save()
+            save_with_unique_name(user, teacher_first_name, teacher_last_name, domain="teacher.isufst.com")
 
             teacher = profile_form.save(commit=False)
             teacher.user = user
@@ -155,21 +139,70 @@ def delete_teacher(request, teacher_id):
     messages.success(request, "Teacher deleted successfully.")
     return redirect('accounts:manage_teacher')
 
+def _student_search(search, class_subjects):
+    """
+    Filter matching every word of ``search`` against a student's ID, name,
+    course, year or section, or the subjects offered to their class.
+    """
+    condition = Q()
+    for term in search.split():
+        needle = term.lower()
+        match = (
+            Q(student_ID__icontains=term)
+            | Q(first_name__icontains=term)
+            | Q(middle_name__icontains=term)
+            | Q(last_name__icontains=term)
+            | Q(course__name__icontains=term)
+            | Q(year__icontains=term)
+            | Q(section__icontains=term)
+        )
+        for (course_id, year), subjects in class_subjects.items():
+            if any(needle in subject.subject_code.lower() or needle in subject.name.lower() for subject in subjects):
+                match |= Q(course_id=course_id, year=year)
+        condition &= match
+    return condition
+
+
 def manage_student(request):
-    students = StudentProfile.objects.select_related('course').all()
+    search = request.GET.get('q', '').strip()
+    # One query for every offering, shared by all rows on the page
+    class_subjects = subjects_by_class()
+
+    students = StudentProfile.objects.select_related('course')
+    if search:
+        students = students.filter(_student_search(search, class_subjects))
+    page = PrimaryKeyPaginator(students).page(request.GET)
 
     # Attach subjects to each student
-    for student in students:
-        offerings = SubjectOffering.objects.filter(
-            year=student.year,
-            subject__course=student.course
-        )
-        student.subject_list = [o.subject for o in offerings]
+    for student in page:
+        student.subject_list = class_subjects.get((student.course_id, student.year), [])
 
     return render(request, 'dashboard/managestudents.html', {
-        'students': students
+        'students': page,
+        'page': page,
+        'search': search,
     })
 
+@login_required
+def import_students(request):
+    """Upload a CSV/XLSX roster and bulk-create its students (see accounts.imports)."""
+    if not request.user.is_superuser and getattr(request.user, 'role', None) != 'admin':
+        return redirect('accounts:manage_student')
+
+    context = {'active': 'students', 'columns': IMPORT_COLUMNS}
+    if request.method == 'POST' and request.FILES.get('roster'):
+        roster = request.FILES['roster']
+        try:
+            result = StudentImporter().run(read_roster(roster, roster.name))
+        except RosterError as error:
+            messages.error(request, str(error))
+        else:
+            report = io.StringIO()
+            write_error_report(result.errors, report)
+            context.update({'result': result, 'error_report': report.getvalue()})
+    return render(request, 'dashboard/import_students.html', context)
+
+
 @login_required
 
 def add_student(request):
@@ -200,17 +233,12 @@ def add_student(request):
                 if create_new_parent:
                     parent_first = parent_profile_form.cleaned_data['first_name']
                     parent_last = parent_profile_form.cleaned_data['last_name']
-                    parent_email, parent_username = generate_unique_email(
-                        parent_first, parent_last, domain="parent.isufst.com"
-                    )
 
                     parent_user = parent_user_form.save(commit=False)
-                    parent_user.email = parent_email
-                    parent_user.username = parent_username
                     parent_user.set_password(get_random_string(8))
                     parent_user.role = 'parent'
                     parent_user.first_login = True
-                    parent_user.save()
+                    save_with_unique_name(parent_user, parent_first, parent_last, domain="parent.isufst.com")
 
                     parent_profile = parent_profile_form.save(commit=False)
                     parent_profile.user = parent_user
@@ -221,17 +249,12 @@ def add_student(request):
                 # Student handling
                 student_first = student_form.cleaned_data['first_name']
                 student_last = student_form.cleaned_data['last_name']
-                student_email, student_username = generate_unique_email(
-                    student_first, student_last, domain="student.isufst.com"
-                )
 
                 student_user = user_form.save(commit=False)
-                student_user.email = student_email
-                student_user.username = student_username
                 student_user.set_password(get_random_string(8))
                 student_user.role = 'student'
                 student_user.first_login = True
-                student_user.save()
+                save_with_unique_name(student_user, student_first, student_last, domain="student.isufst.com")
 
                 student_profile = student_form.save(commit=False)
                 student_profile.user = student_user
@@ -327,17 +350,12 @@ def edit_student(request, student_id):
                     # Create new parent
                     parent_first = parent_profile_form.cleaned_data['first_name']
                     parent_last = parent_profile_form.cleaned_data['last_name']
-                    parent_email, parent_username = generate_unique_email(
-                        parent_first, parent_last, domain="parent.isufst.com"
-                    )
                     
                     parent_user = parent_user_form.save(commit=False)
-                    parent_user.email = parent_email
-                    parent_user.username = parent_username
                     parent_user.set_password(get_random_string(8))
                     parent_user.role = 'parent'
                     parent_user.first_login = True
-                    parent_user.save()
+                    save_with_unique_name(parent_user, parent_first, parent_last, domain="parent.isufst.com")
                     
                     parent_profile = parent_profile_form.save(commit=False)
                     parent_profile.user = parent_user
@@ -442,16 +460,11 @@ def add_parent(request):
             
             parent_first_name = parent_form.cleaned_data['first_name']
             parent_last_name = parent_form.cleaned_data['last_name']
-            parent_email,parent_username =  generate_unique_email(
-                parent_first_name,parent_last_name,domain="parent.isufst.com"
-            )
             user = user_form.save(commit=False)
-            user.email = parent_email
-            user.username = parent_username
             user.set_password(get_random_string(8))
             user.role = 'parent'
             user.first_login = True
-            user.save()
+            save_with_unique_name(user, parent_first_name, parent_last_name, domain="parent.isufst.com")
 
             parent = parent_form.save(commit=False)
             parent.user = user
@@ -508,6 +521,7 @@ def change_password(request):
             user.first_login = False
             user.save()
             update_session_auth_hash(request, user)
+            request.session[FIRST_LOGIN_SESSION_KEY] = False
             messages.success(request, "Password changed successfully!")
 
             # Role-based redirect
@@ -659,18 +673,48 @@ def accounts_dashboard(request):
 @login_required
 def export_accounts_view(request):
     """
-    Runs the export_accounts management command and returns the Excel file as download.
+    Queues an account export in the background and sends the admin to its
+    status page.
     """
-    output_file = "school_accounts.xlsx"
-    
-    # Run the management command
-    call_command("export_accounts")
-    
-    # Serve the file as download
-    if os.path.exists(output_file):
-        with open(output_file, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-            response['Content-Disposition'] = f'attachment; filename={output_file}'
-            return response
-    else:
-        return HttpResponse("Export failed, file not found.", status=404)
\ No newline at end of file
+    if request.method != 'POST':
+        return redirect('accounts:accounts_dashboard')
+    job = submit_export_job(request.user)
+    return redirect('accounts:export_job_status', job_id=job.id)
+
+
+def _get_export_job(request, job_id):
+    jobs = ExportJob.objects.all()
+    if not request.user.is_superuser:
+        jobs = jobs.filter(requested_by=request.user)
+    return get_object_or_404(jobs, id=job_id)
+
+
+@login_required
+def export_job_status(request, job_id):
+    job = _get_export_job(request, job_id)
+    return render(request, 'dashboard/export_job.html', {'job': job})
+
+
+@login_required
+@require_GET
+def export_job_progress(request, job_id):
+    job = _get_export_job(request, job_id)
+    return JsonResponse({
+        'id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'error': job.error,
+    })
+
+
+@login_required
+def export_job_download(request, job_id):
+    job = _get_export_job(request, job_id)
+    if job.status != 'done' or not os.path.exists(job.file_path):
+        return HttpResponse("Export is not ready yet.", status=404)
+    return FileResponse(
+        open(job.file_path, 'rb'),
+        as_attachment=True,
+        filename=job.filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
@@ -0,0 +1,115 @@
+# core/middleware.py
+import hashlib
+import json
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger('core.instrumentation')
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised in strict mode when a view runs more queries than its budget."""
+
+
+class _QueryRecorder:
+    """execute_wrapper hook that counts and times every SQL statement."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            # Parameters are passed separately, so the SQL text is already
+            # the query "shape"; repeats of one shape usually mean an N+1 loop
+            self.fingerprints[sql] += 1
+
+    def duplicates(self):
+        return {
+            hashlib.sha1(sql.encode()).hexdigest()[:10]: {'count': count, 'sql': sql[:200]}
+            for sql, count in self.fingerprints.most_common()
+            if count > 1
+        }
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record per-request query count, SQL time, duplicate query shapes and
+    the time spent outside SQL (view logic + template rendering).
+
+    Install it first in MIDDLEWARE so session and auth queries count too.
+
+    Metrics go out as a ``Server-Timing`` header when
+    ``settings.QUERY_TIMING_HEADER`` is true and as a JSON log line on the
+    ``core.instrumentation`` logger when ``settings.QUERY_METRICS_LOG`` is
+    true (both follow DEBUG when unset). ``settings.QUERY_BUDGETS`` maps URL
+    names (e.g. ``'reports:attendance_summary'``) to a maximum query count;
+    going over logs a warning, or raises QueryBudgetExceeded when
+    ``settings.QUERY_BUDGET_STRICT`` is true (as it is under tests).
+    Settings are read per request so tests can override them.
+    """
+
+    skipped_prefixes = ('/static/', '/media/')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith(self.skipped_prefixes):
+            return self.get_response(request)
+
+        recorder = _QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.view_name if match else None
+        db_ms = recorder.duration * 1000
+        total_ms = total * 1000
+        render_ms = max(total_ms - db_ms, 0.0)
+
+        if getattr(settings, 'QUERY_TIMING_HEADER', settings.DEBUG):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={db_ms:.1f};desc="{recorder.count} queries"',
+                f'render;dur={render_ms:.1f}',
+                f'total;dur={total_ms:.1f}',
+            ])
+
+        if getattr(settings, 'QUERY_METRICS_LOG', settings.DEBUG):
+            logger.info(json.dumps({
+                'event': 'request_metrics',
+                'method': request.method,
+                'path': request.path,
+                'url_name': url_name,
+                'status': response.status_code,
+                'queries': recorder.count,
+                'db_ms': round(db_ms, 1),
+                'render_ms': round(render_ms, 1),
+                'total_ms': round(total_ms, 1),
+                'duplicate_queries': recorder.duplicates(),
+            }))
+
+        budget = getattr(settings, 'QUERY_BUDGETS', {}).get(url_name)
+        if budget is not None and recorder.count > budget:
+            message = f"{url_name} ran {recorder.count} queries (budget {budget})"
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+        return response
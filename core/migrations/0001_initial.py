@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-18 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('student', 'Student'), ('teacher', 'Teacher'), ('parent', 'Parent'), ('subject', 'Subject')], max_length=10)),
+                ('object_id', models.CharField(max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('detail', models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+
+FTS_SQL = [
+    (
+        "CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5("
+        "title, detail, content='core_searchdocument', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        "DROP TABLE core_searchdocument_fts",
+    ),
+    (
+        "CREATE TRIGGER core_searchdocument_ai AFTER INSERT ON core_searchdocument BEGIN "
+        "INSERT INTO core_searchdocument_fts(rowid, title, detail) VALUES (new.id, new.title, new.detail); "
+        "END",
+        "DROP TRIGGER core_searchdocument_ai",
+    ),
+    (
+        "CREATE TRIGGER core_searchdocument_ad AFTER DELETE ON core_searchdocument BEGIN "
+        "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, detail) "
+        "VALUES ('delete', old.id, old.title, old.detail); "
+        "END",
+        "DROP TRIGGER core_searchdocument_ad",
+    ),
+    (
+        "CREATE TRIGGER core_searchdocument_au AFTER UPDATE ON core_searchdocument BEGIN "
+        "INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, detail) "
+        "VALUES ('delete', old.id, old.title, old.detail); "
+        "INSERT INTO core_searchdocument_fts(rowid, title, detail) VALUES (new.id, new.title, new.detail); "
+        "END",
+        "DROP TRIGGER core_searchdocument_au",
+    ),
+]
+
+
+def build_index(apps, schema_editor):
+    from core.search import rebuild_index
+
+    rebuild_index(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0017_absenteeismflag'),
+        ('accounts', '0006_customuser_email_lower_idx'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [sql for sql, _reverse in FTS_SQL],
+            [reverse for _sql, reverse in reversed(FTS_SQL)],
+        ),
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
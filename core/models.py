@@ -1,3 +1,26 @@
 from django.db import models
 
-# Create your models here.
+
+# Universal search
+class SearchDocument(models.Model):
+    """
+    One searchable student, teacher, parent or subject. The text columns
+    are mirrored into the ``core_searchdocument_fts`` FTS5 table by SQL
+    triggers (see migration 0001); keep rows current through core.search.
+    """
+    KIND_CHOICES = (
+        ('student', 'Student'),
+        ('teacher', 'Teacher'),
+        ('parent', 'Parent'),
+        ('subject', 'Subject'),
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=20)
+    title = models.CharField(max_length=255)
+    detail = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
@@ -0,0 +1,178 @@
+"""
+Keyset (cursor) pagination for attendance and other long listings.
+
+Pages are selected with a WHERE clause on the ordering key instead of
+OFFSET, so page 500 of a multi-year history costs the same as page one.
+The cursor in the querystring is the key of the row at the page
+boundary, (date, time, id) for attendance, plus the direction to read in.
+"""
+import base64
+from datetime import date, time
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+CURSOR_PARAM = 'cursor'
+
+
+def encode_cursor(direction, parts):
+    raw = '|'.join([direction, *parts])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """Return ``(direction, [key parts])`` or ``None`` for a bad cursor."""
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        direction, *parts = base64.urlsafe_b64decode(padded).decode().split('|')
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if direction not in ('next', 'prev'):
+        return None
+    return direction, parts
+
+
+class KeysetPage:
+    def __init__(self, object_list, params, next_cursor, prev_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self._params = params
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def _query(self, cursor):
+        params = self._params.copy()
+        params[CURSOR_PARAM] = cursor
+        return params.urlencode()
+
+    @property
+    def next_query(self):
+        return self._query(self.next_cursor) if self.has_next else ''
+
+    @property
+    def previous_query(self):
+        return self._query(self.prev_cursor) if self.has_previous else ''
+
+
+class KeysetPaginator:
+    """
+    Paginate an Attendance-like queryset on (date, time, id).
+
+    ``descending`` picks newest-first (the default) or oldest-first order.
+    ``extra_querysets`` are read with the same cursor and merged in, for
+    listings that also span AttendanceArchive; ids must not collide
+    across them.
+    """
+
+    fields = ('date', 'time', 'pk')
+
+    def row_key(self, row):
+        return tuple(getattr(row, field) for field in self.fields)
+
+    def format_key(self, key):
+        day, clock, pk = key
+        return [day.isoformat(), clock.isoformat(), str(pk)]
+
+    def parse_key(self, parts):
+        """Inverse of ``format_key``; raises ValueError for malformed parts."""
+        day, clock, pk = parts
+        return date.fromisoformat(day), time.fromisoformat(clock), int(pk)
+
+    def _cursor(self, row, direction):
+        return encode_cursor(direction, self.format_key(self.row_key(row)))
+
+    def __init__(self, queryset, per_page=50, descending=True, extra_querysets=()):
+        self.querysets = [queryset, *extra_querysets]
+        self.per_page = per_page
+        self.descending = descending
+
+    def _ordering(self, descending):
+        prefix = '-' if descending else ''
+        return [f'{prefix}{field}' for field in self.fields]
+
+    def _after(self, key, descending):
+        """Rows strictly after ``key`` when reading in the given order."""
+        op = 'lt' if descending else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f'{field}__{op}': key[index]})
+            for prior, prior_field in enumerate(self.fields[:index]):
+                step &= Q(**{prior_field: key[prior]})
+            condition |= step
+        return condition
+
+    def page(self, params):
+        """Return the ``KeysetPage`` selected by the cursor in ``params`` (a QueryDict)."""
+        cursor = decode_cursor(params.get(CURSOR_PARAM, ''))
+        params = params.copy()
+        params.pop(CURSOR_PARAM, None)
+
+        direction, key = 'next', None
+        if cursor is not None:
+            try:
+                direction, key = cursor[0], self.parse_key(cursor[1])
+            except (ValueError, ValidationError):
+                direction, key = 'next', None
+
+        # Reading backwards flips the order; the rows are reversed afterwards
+        descending = self.descending if direction == 'next' else not self.descending
+        rows = []
+        for queryset in self.querysets:
+            queryset = queryset.order_by(*self._ordering(descending))
+            if key is not None:
+                queryset = queryset.filter(self._after(key, descending))
+            rows.extend(queryset[:self.per_page + 1])
+        if len(self.querysets) > 1:
+            rows.sort(key=self.row_key, reverse=descending)
+            rows = rows[:self.per_page + 1]
+
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if direction == 'prev':
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+
+        next_cursor = self._cursor(rows[-1], 'next') if rows and has_next else None
+        prev_cursor = self._cursor(rows[0], 'prev') if rows and has_previous else None
+        return KeysetPage(rows, params, next_cursor, prev_cursor)
+
+
+class PrimaryKeyPaginator(KeysetPaginator):
+    """
+    Paginate any queryset on its primary key, ascending by default (e.g.
+    StudentProfile on student_ID).
+    """
+
+    fields = ('pk',)
+
+    def __init__(self, queryset, per_page=50, descending=False):
+        super().__init__(queryset, per_page=per_page, descending=descending)
+        self.pk_field = queryset.model._meta.pk
+
+    def format_key(self, key):
+        return [str(key[0])]
+
+    def parse_key(self, parts):
+        # The key itself may contain the separator
+        return (self.pk_field.to_python('|'.join(parts)),)
@@ -0,0 +1,162 @@
+"""
+Server-side universal search over students, teachers, parents and subjects.
+
+Every searchable object has one SearchDocument row (a display ``title``
+and a ``detail`` line). SQL triggers mirror those rows into the
+``core_searchdocument_fts`` FTS5 table, tokenized with
+``unicode61 remove_diacritics 2`` so "jose" finds "José"; every query
+word is matched as a prefix, so "mar dela" finds "Maria Dela Cruz".
+
+signals.py reindexes objects on save/delete. Bulk writers that skip
+signals call ``index()`` themselves, or run ``manage.py
+rebuild_search_index`` afterwards.
+"""
+import re
+
+from django.apps import apps as global_apps
+from django.db import connection
+from django.urls import reverse
+
+
+FTS_TABLE = 'core_searchdocument_fts'
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Page a search result links to, per kind
+DOCUMENT_URLS = {
+    'student': 'accounts:edit_student',
+    'teacher': 'accounts:edit_teacher',
+    'parent': 'accounts:edit_parent',
+    'subject': 'academics:edit_subject',
+}
+
+# Which document a user account's email/username belongs to
+ROLE_KINDS = {'student': 'student', 'teacher': 'teacher', 'parent': 'parent'}
+
+
+def _join(*parts, sep=' '):
+    return sep.join(str(part) for part in parts if part)
+
+
+# -------------------------------
+# Documents
+# -------------------------------
+# Each builder yields (object_id, title, detail) for the objects matching
+# ``filters``. ``apps`` is the app registry, or the historical one when
+# called from a migration.
+def _students(apps, **filters):
+    StudentProfile = apps.get_model('accounts', 'StudentProfile')
+    rows = StudentProfile.objects.filter(**filters).values_list(
+        'student_ID', 'first_name', 'middle_name', 'last_name', 'course__name', 'year', 'section', 'user__email',
+    )
+    for student_id, first, middle, last, course, year, section, email in rows.iterator():
+        yield student_id, _join(first, middle, last), _join(
+            student_id, course, _join(year, section, sep='-'), email, sep=' · ',
+        )
+
+
+def _teachers(apps, **filters):
+    TeacherProfile = apps.get_model('accounts', 'TeacherProfile')
+    rows = TeacherProfile.objects.filter(**filters).values_list(
+        'id', 'first_name', 'middle_name', 'last_name', 'user__email',
+    )
+    for pk, first, middle, last, email in rows.iterator():
+        yield pk, _join(first, middle, last), _join('Teacher', email, sep=' · ')
+
+
+def _parents(apps, **filters):
+    ParentProfile = apps.get_model('accounts', 'ParentProfile')
+    rows = ParentProfile.objects.filter(**filters).values_list(
+        'id', 'first_name', 'middle_name', 'last_name', 'contact_number', 'user__email',
+    )
+    for pk, first, middle, last, contact, email in rows.iterator():
+        yield pk, _join(first, middle, last), _join('Parent', email, contact, sep=' · ')
+
+
+def _subjects(apps, **filters):
+    Subject = apps.get_model('academics', 'Subject')
+    rows = Subject.objects.filter(**filters).values_list(
+        'id', 'subject_code', 'name', 'course__name', 'year_level', 'semester_number',
+    )
+    for pk, code, name, course, year, semester in rows.iterator():
+        yield pk, _join(code, name, sep=' - '), _join(
+            course, f'{year} year' if year else '', f'{semester} semester' if semester else '', sep=' · ',
+        )
+
+
+BUILDERS = {
+    'student': _students,
+    'teacher': _teachers,
+    'parent': _parents,
+    'subject': _subjects,
+}
+
+
+def index(kind, apps=global_apps, **filters):
+    """
+    Create or refresh the documents of the ``kind`` objects matching
+    ``filters`` (e.g. ``pk=...``, ``course_id=...``); every object of that
+    kind without filters. Returns the number of documents written.
+    """
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    documents = [
+        SearchDocument(kind=kind, object_id=str(object_id), title=title[:255], detail=detail[:255])
+        for object_id, title, detail in BUILDERS[kind](apps, **filters)
+    ]
+    SearchDocument.objects.bulk_create(
+        documents,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['kind', 'object_id'],
+        update_fields=['title', 'detail'],
+    )
+    return len(documents)
+
+
+def unindex(kind, object_ids, apps=global_apps):
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    SearchDocument.objects.filter(kind=kind, object_id__in=[str(pk) for pk in object_ids]).delete()
+
+
+def rebuild_index(apps=global_apps):
+    """Rebuild every document and the FTS table from scratch. Returns the document count."""
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    SearchDocument.objects.all().delete()
+    total = sum(index(kind, apps=apps) for kind in BUILDERS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return total
+
+
+# -------------------------------
+# Querying
+# -------------------------------
+def match_expression(query):
+    """An FTS5 query matching every word of ``query`` as a prefix, or '' for no words."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def search(query, kind=None, limit=DEFAULT_LIMIT):
+    """The best-ranked SearchDocuments for ``query``, optionally of one ``kind``."""
+    from .models import SearchDocument
+
+    expression = match_expression(query)
+    if not expression:
+        return []
+    sql = (
+        f'SELECT d.id, d.kind, d.object_id, d.title, d.detail '
+        f'FROM {SearchDocument._meta.db_table} d JOIN {FTS_TABLE} f ON f.rowid = d.id '
+        f'WHERE {FTS_TABLE} MATCH %s'
+    )
+    params = [expression]
+    if kind:
+        sql += ' AND d.kind = %s'
+        params.append(kind)
+    sql += ' ORDER BY f.rank LIMIT %s'
+    params.append(min(limit, MAX_LIMIT))
+    return list(SearchDocument.objects.raw(sql, params))
+
+
+def document_url(document):
+    return reverse(DOCUMENT_URLS[document.kind], args=[document.object_id])
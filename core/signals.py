@@ -0,0 +1,55 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import Course, Subject
+from accounts.models import CustomUser, ParentProfile, StudentProfile, TeacherProfile
+
+from . import search
+
+
+PROFILE_KINDS = {
+    StudentProfile: 'student',
+    TeacherProfile: 'teacher',
+    ParentProfile: 'parent',
+    Subject: 'subject',
+}
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_save, sender=TeacherProfile)
+@receiver(post_save, sender=ParentProfile)
+@receiver(post_save, sender=Subject)
+def index_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index(PROFILE_KINDS[sender], pk=instance.pk)
+
+
+@receiver(post_delete, sender=StudentProfile)
+@receiver(post_delete, sender=TeacherProfile)
+@receiver(post_delete, sender=ParentProfile)
+@receiver(post_delete, sender=Subject)
+def unindex_document(sender, instance, **kwargs):
+    search.unindex(PROFILE_KINDS[sender], [instance.pk])
+
+
+@receiver(post_save, sender=CustomUser)
+def reindex_account(sender, instance, raw=False, **kwargs):
+    """The email shown in a profile's search detail lives on the user."""
+    kind = search.ROLE_KINDS.get(instance.role)
+    if kind and not raw:
+        search.index(kind, user_id=instance.pk)
+
+
+@receiver(post_save, sender=Course)
+def reindex_course(sender, instance, raw=False, **kwargs):
+    """Students and subjects show their course name."""
+    if not raw:
+        search.index('student', course_id=instance.pk)
+        search.index('subject', course_id=instance.pk)
+
+
+@receiver(post_delete, sender=Course)
+def reindex_orphans(sender, instance, **kwargs):
+    # The course's students and subjects were SET_NULL without post_save
+    search.index('student', course__isnull=True)
+    search.index('subject', course__isnull=True)
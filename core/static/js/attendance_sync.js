@@ -0,0 +1,124 @@
+// attendance_sync.js
+// Offline queue for the mark-attendance form. Each submit is stored in
+// localStorage with its own idempotency key and the queue is sent to the
+// sync endpoint in batches of at most MAX_BATCH items; anything that cannot
+// be sent stays queued and is retried when the browser comes back online.
+// Loaded on every teacher page, so a queue left over from an offline class
+// drains on whichever page the teacher opens next.
+
+document.addEventListener("DOMContentLoaded", function () {
+  const QUEUE_KEY = "attendanceSyncQueue";
+  // academics.services.MAX_SYNC_ITEMS
+  const MAX_BATCH = 200;
+  const form = document.querySelector(".attendance-sync-form");
+  const statusBox = document.querySelector(".attendance-sync-status");
+  const syncUrl = document.body.dataset.attendanceSyncUrl;
+  if (!syncUrl) return;
+  let flushing = false;
+
+  function loadQueue() {
+    try {
+      return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+    } catch (e) {
+      return [];
+    }
+  }
+
+  function saveQueue(queue) {
+    localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+  }
+
+  function showStatus(message) {
+    if (statusBox) {
+      statusBox.textContent = message;
+      statusBox.style.display = message ? "" : "none";
+    }
+  }
+
+  function newKey() {
+    if (window.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return Date.now().toString(36) + "-" + Math.random().toString(36).slice(2);
+  }
+
+  function csrfToken() {
+    const input = document.querySelector("[name=csrfmiddlewaretoken]");
+    return input ? input.value : document.body.dataset.csrfToken || "";
+  }
+
+  function sendBatch(batch) {
+    return fetch(syncUrl, {
+      method: "POST",
+      headers: { "Content-Type": "application/json", "X-CSRFToken": csrfToken() },
+      credentials: "same-origin",
+      body: JSON.stringify({ items: batch }),
+    }).then(response => {
+      if (!response.ok) throw new Error("Sync failed with status " + response.status);
+      return response.json();
+    });
+  }
+
+  function flush() {
+    if (flushing || loadQueue().length === 0) return Promise.resolve();
+    flushing = true;
+    const rejected = [];
+
+    // One batch at a time, each dropped from the queue as soon as it is
+    // answered, so an interrupted flush resumes where it stopped
+    function next() {
+      const batch = loadQueue().slice(0, MAX_BATCH);
+      if (batch.length === 0) return Promise.resolve();
+      return sendBatch(batch).then(data => {
+        // Every answered key is settled; only items marked later stay queued
+        const answered = new Set(data.results.map(result => result.key));
+        saveQueue(loadQueue().filter(item => !answered.has(item.key)));
+        rejected.push(...data.results.filter(result => result.status === "rejected"));
+        if (answered.size === 0) throw new Error("Sync answered no items");
+        return next();
+      });
+    }
+
+    return next()
+      .then(() => {
+        if (rejected.length) {
+          showStatus("Some attendance could not be saved: " +
+            rejected.map(result => result.errors.join(" ")).join(" "));
+        } else {
+          showStatus("Attendance has been successfully recorded!");
+        }
+      })
+      .catch(() => {
+        const pending = loadQueue().length;
+        showStatus(pending + " attendance submission(s) saved on this device; they will be sent when you are back online.");
+      })
+      .finally(() => {
+        flushing = false;
+      });
+  }
+
+  if (form) {
+    form.addEventListener("submit", function (event) {
+      event.preventDefault();
+
+      const marks = {};
+      form.querySelectorAll("input[type=radio]:checked").forEach(input => {
+        marks[input.name.replace(/^status_/, "")] = input.value;
+      });
+
+      const queue = loadQueue();
+      queue.push({
+        key: newKey(),
+        offering: form.dataset.offering,
+        date: form.dataset.date,
+        time: form.dataset.time,
+        year: form.dataset.year,
+        section: form.dataset.section,
+        marks: marks,
+      });
+      saveQueue(queue);
+      flush();
+    });
+  }
+
+  window.addEventListener("online", flush);
+  flush();
+});
@@ -19,7 +19,63 @@ document.addEventListener("DOMContentLoaded", function () {
         row.style.display = rowText.includes(searchValue) ? "" : "none";
       });
     });
+
+    // Boxes with a data-search-url also search the whole table server-side
+    // (the page itself only holds its first rows) and list the best matches
+    if (searchBox.dataset.searchUrl) attachServerSearch(searchBox);
   });
+
+  function attachServerSearch(searchBox) {
+    const results = document.createElement("ul");
+    results.className = "search-results";
+    results.style.display = "none";
+    searchBox.insertAdjacentElement("afterend", results);
+
+    let timer = null;
+    let controller = null;
+
+    function render(items) {
+      results.replaceChildren(...items.map(item => {
+        const li = document.createElement("li");
+        const link = document.createElement("a");
+        link.href = item.url;
+        const title = document.createElement("strong");
+        title.textContent = item.title;
+        const detail = document.createElement("span");
+        detail.textContent = item.detail;
+        link.append(title, detail);
+        li.append(link);
+        return li;
+      }));
+      results.style.display = items.length ? "" : "none";
+    }
+
+    function fetchResults() {
+      const query = searchBox.value.trim();
+      if (controller) controller.abort();
+      if (!query) return render([]);
+
+      controller = new AbortController();
+      const params = new URLSearchParams({ q: query });
+      if (searchBox.dataset.searchKind) params.set("kind", searchBox.dataset.searchKind);
+      fetch(searchBox.dataset.searchUrl + "?" + params, {
+        credentials: "same-origin",
+        signal: controller.signal,
+      })
+        .then(response => (response.ok ? response.json() : { results: [] }))
+        .then(data => render(data.results))
+        .catch(() => {});
+    }
+
+    // Debounced: one request once typing pauses, not one per key
+    searchBox.addEventListener("input", function () {
+      clearTimeout(timer);
+      timer = setTimeout(fetchResults, 250);
+    });
+    searchBox.addEventListener("keydown", function (event) {
+      if (event.key === "Escape") render([]);
+    });
+  }
 });
 // student_search.js
 document.addEventListener("DOMContentLoaded", function () {
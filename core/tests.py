@@ -1,3 +1,209 @@
-from django.test import TestCase
+import base64
+import datetime
+import unittest
 
-# Create your tests here.
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from academics.models import Attendance, AttendanceArchive, Course, Subject, SubjectOffering
+from accounts.models import CustomUser, StudentProfile
+
+from . import search
+from .middleware import QueryBudgetExceeded
+from .models import SearchDocument
+from .pagination import CURSOR_PARAM, KeysetPaginator, PrimaryKeyPaginator, encode_cursor
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        admin = CustomUser.objects.create(username='admin', role='admin', is_superuser=True, first_login=False)
+        self.client.force_login(admin)
+        self.url = reverse('core:search')
+
+    @override_settings(QUERY_BUDGET_STRICT=True, QUERY_BUDGETS={'core:search': 1})
+    def test_over_budget_fails_in_strict_mode(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'core:search ran'):
+            self.client.get(self.url, {'q': 'ana'})
+
+    @override_settings(QUERY_BUDGET_STRICT=False, QUERY_BUDGETS={'core:search': 1})
+    def test_over_budget_warns_otherwise(self):
+        with self.assertLogs('core.instrumentation', 'WARNING') as logs:
+            response = self.client.get(self.url, {'q': 'ana'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('(budget 1)', logs.output[0])
+
+    @override_settings(QUERY_TIMING_HEADER=True)
+    def test_counts_session_and_auth_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'q': 'ana'})
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+        self.assertIn('django_session', queries[0]['sql'])
+
+    def test_no_timing_header_outside_debug(self):
+        response = self.client.get(self.url, {'q': 'ana'})
+        self.assertNotIn('Server-Timing', response)
+
+
+class KeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        course = Course.objects.create(name='BSIT', description='Information Technology')
+        subject = Subject.objects.create(course=course, subject_code='IT101', name='Programming', semester_number='1st')
+        cls.offering = SubjectOffering.objects.create(subject=subject, year='1st', section='a', school_year='2025-2026')
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'student-{index}', role='student', first_login=False) for index in range(7)
+        ])
+        cls.students = StudentProfile.objects.bulk_create([
+            StudentProfile(
+                user=user, student_ID=f'S{index}', first_name='Student', last_name=str(index),
+                course=course, year='1st', section='a', is_regular='reg',
+            )
+            for index, user in enumerate(users)
+        ])
+        # Every row of a day shares its date and time: only the id breaks ties
+        Attendance.objects.bulk_create([
+            Attendance(
+                student=student, subject_offering=cls.offering, date=datetime.date(2025, 8, 4 + day),
+                time=datetime.time(8), status='present',
+            )
+            for day in range(3)
+            for student in cls.students
+        ])
+
+    def walk(self, paginator):
+        """Follow next cursors to the end, then prev cursors back; return both lists of pages."""
+        forward = [paginator.page(QueryDict())]
+        while forward[-1].has_next:
+            forward.append(paginator.page(QueryDict(forward[-1].next_query)))
+        backward = [forward[-1]]
+        while backward[-1].has_previous:
+            backward.append(paginator.page(QueryDict(backward[-1].previous_query)))
+        return [[row.pk for row in page] for page in forward], [[row.pk for row in page] for page in backward]
+
+    def assertWalks(self, paginator, expected):
+        forward, backward = self.walk(paginator)
+        self.assertEqual([pk for page in forward for pk in page], expected)
+        self.assertTrue(all(len(page) == paginator.per_page for page in forward[:-1]))
+        self.assertEqual(backward, forward[::-1])
+
+    def test_tied_sort_keys_are_neither_skipped_nor_repeated(self):
+        rows = Attendance.objects.order_by('date', 'time', 'pk').values_list('pk', flat=True)
+        self.assertWalks(KeysetPaginator(Attendance.objects.all(), per_page=4), list(rows)[::-1])
+        self.assertWalks(KeysetPaginator(Attendance.objects.all(), per_page=4, descending=False), list(rows))
+
+    def test_extra_querysets_are_merged(self):
+        AttendanceArchive.objects.bulk_create([
+            AttendanceArchive(
+                id=1000 + index, student=student, subject_offering=self.offering, school_year='2024-2025',
+                date=datetime.date(2025, 8, 5), time=datetime.time(8), status='absent',
+            )
+            for index, student in enumerate(self.students)
+        ])
+        live = list(Attendance.objects.values_list('date', 'time', 'pk'))
+        archived = list(AttendanceArchive.objects.values_list('date', 'time', 'pk'))
+        expected = [pk for _date, _time, pk in sorted(live + archived)]
+        paginator = KeysetPaginator(
+            Attendance.objects.all(), per_page=5, descending=False, extra_querysets=[AttendanceArchive.objects.all()],
+        )
+        self.assertWalks(paginator, expected)
+
+    def test_invalid_cursors_fall_back_to_the_first_page(self):
+        paginator = KeysetPaginator(Attendance.objects.all(), per_page=4)
+        first = [row.pk for row in paginator.page(QueryDict())]
+        tampered = [
+            'not base64 !',
+            base64.urlsafe_b64encode(b'\xff\xfe').decode(),
+            encode_cursor('sideways', ['2025-08-04', '08:00:00', '1']),
+            encode_cursor('next', ['2025-02-30', '08:00:00', '1']),
+            encode_cursor('next', ['2025-08-04', '25:00', '1']),
+            encode_cursor('prev', ['2025-08-04', '08:00:00', 'x']),
+            encode_cursor('next', ['2025-08-04']),
+        ]
+        for cursor in tampered:
+            with self.subTest(cursor=cursor):
+                page = paginator.page(QueryDict(f'{CURSOR_PARAM}={cursor}'))
+                self.assertEqual([row.pk for row in page], first)
+                self.assertFalse(page.has_previous)
+
+    def test_invalid_primary_key_cursor_falls_back_to_the_first_page(self):
+        paginator = PrimaryKeyPaginator(CustomUser.objects.all(), per_page=3)
+        page = paginator.page(QueryDict(f"{CURSOR_PARAM}={encode_cursor('next', ['abc'])}"))
+        first = CustomUser.objects.order_by('pk').values_list('pk', flat=True)[:3]
+        self.assertEqual([user.pk for user in page], list(first))
+
+    def test_tampered_cursor_in_a_view_is_not_a_server_error(self):
+        self.client.force_login(self.students[0].user)
+        response = self.client.get(reverse('dashboard:subject_attendance'), {
+            'start_date': '2025-08-01', 'end_date': '2025-08-31', CURSOR_PARAM: 'garbage',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['page']), 3)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'The search index is an SQLite FTS5 table')
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(name='BSIT', description='Information Technology')
+
+    def indexed_ids(self, expression):
+        """Rowids the FTS index itself returns, without joining the documents."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {search.FTS_TABLE} WHERE {search.FTS_TABLE} MATCH %s', [expression])
+            return {row[0] for row in cursor.fetchall()}
+
+    def assertIndexIntact(self):
+        # Raises if the index disagrees with core_searchdocument
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {search.FTS_TABLE}({search.FTS_TABLE}) VALUES ('integrity-check')")
+
+    def test_triggers_follow_insert_update_and_delete(self):
+        document = SearchDocument.objects.create(kind='subject', object_id='1', title='Networking Basics')
+        self.assertEqual(self.indexed_ids('"network"*'), {document.pk})
+
+        document.title = 'Database Systems'
+        document.save()
+        self.assertEqual(self.indexed_ids('"network"*'), set())
+        self.assertEqual(self.indexed_ids('"databa"*'), {document.pk})
+        self.assertIndexIntact()
+
+        SearchDocument.objects.filter(pk=document.pk).update(detail='Elective')
+        self.assertEqual(self.indexed_ids('"elect"*'), {document.pk})
+
+        document.delete()
+        self.assertEqual(self.indexed_ids('"databa"*'), set())
+        self.assertEqual(self.indexed_ids('"elect"*'), set())
+        self.assertIndexIntact()
+
+    def test_model_writes_are_searchable(self):
+        subject = Subject.objects.create(course=self.course, subject_code='IT101', name='Programming', semester_number='1st')
+        self.assertEqual([document.title for document in search.search('progr')], ['IT101 - Programming'])
+        subject.name = 'Data Structures'
+        subject.save()
+        self.assertEqual(search.search('progr'), [])
+        self.assertEqual(len(search.search('data struct')), 1)
+        subject.delete()
+        self.assertEqual(search.search('data'), [])
+
+    def test_fts_syntax_in_user_input_is_matched_as_text(self):
+        SearchDocument.objects.create(kind='teacher', object_id='1', title='José Dela Cruz', detail='Teacher')
+        # Operators and punctuation never reach MATCH as syntax: every word
+        # is a quoted prefix, so "OR", "NOT", "NEAR" and "title" must match
+        # as words too
+        queries = {
+            '"': 0, '*': 0, '"jose': 1, 'jose*': 1, 'dela"cruz': 1, '-jose': 1, '^jose': 1, '(jose)': 1,
+            'jose OR': 0, 'NOT jose': 0, 'NEAR(jose': 0, 'title:jose': 0, "o'neil": 0,
+        }
+        for query, found in queries.items():
+            with self.subTest(query=query):
+                self.assertEqual(len(search.search(query)), found)
+
+    def test_search_page_survives_fts_syntax(self):
+        admin = CustomUser.objects.create(username='admin', role='admin', is_superuser=True, first_login=False)
+        self.client.force_login(admin)
+        for query in ('"', '*', '"unbalanced', 'a AND OR', 'NEAR(', 'col:umn'):
+            with self.subTest(query=query):
+                response = self.client.get(reverse('core:search'), {'q': query})
+                self.assertEqual(response.status_code, 200)
@@ -1,3 +1,42 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from .models import SearchDocument
+from .search import DEFAULT_LIMIT, MAX_LIMIT, document_url, search as search_documents
+
+
+# Search results link to the admin's edit pages
+SEARCH_ROLES = ('admin', 'teacher')
+
+
+@login_required
+@require_GET
+def search(request):
+    """
+    Universal search API: ``?q=<words>[&kind=student|teacher|parent|subject][&limit=N]``.
+    Returns the best matches as ``{"results": [{kind, id, title, detail, url}]}``.
+    """
+    user = request.user
+    if not (user.is_superuser or user.role in SEARCH_ROLES):
+        return JsonResponse({'error': "Search is not available for this account."}, status=403)
+
+    kind = request.GET.get('kind') or None
+    if kind is not None and kind not in dict(SearchDocument.KIND_CHOICES):
+        return JsonResponse({'error': f"Unknown kind: {kind}"}, status=400)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+    except ValueError:
+        return JsonResponse({'error': "limit must be a number."}, status=400)
+
+    documents = search_documents(request.GET.get('q', ''), kind=kind, limit=limit)
+    return JsonResponse({'results': [
+        {
+            'kind': document.kind,
+            'id': document.object_id,
+            'title': document.title,
+            'detail': document.detail,
+            'url': document_url(document),
+        }
+        for document in documents
+    ]})
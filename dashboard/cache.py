@@ -0,0 +1,92 @@
+"""
+Cache for the dashboard landing pages.
+
+Entries are keyed by role, user and the page filters. Instead of deleting
+keys (the local-memory and file-based backends cannot delete by pattern),
+every key embeds a generation number; ``invalidate_dashboards()`` bumps
+the generation so all older entries are simply never read again and age
+out through their TTL. The TTL also bounds staleness when several
+processes each keep their own local-memory cache.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+KEY_PREFIX = 'dashboard'
+GENERATION_KEY = f'{KEY_PREFIX}:generation'
+HITS_KEY = f'{KEY_PREFIX}:hits'
+MISSES_KEY = f'{KEY_PREFIX}:misses'
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def _incr(key):
+    cache = _cache()
+    # add() is a no-op when the counter already exists
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def _generation():
+    generation = _cache().get(GENERATION_KEY)
+    if generation is None:
+        # Seed from the clock so a lost counter never reuses an old generation
+        _cache().add(GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = _cache().get(GENERATION_KEY)
+    return generation
+
+
+def make_key(role, user_id, filters):
+    digest = hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest()
+    return f'{KEY_PREFIX}:{_generation()}:{role}:{user_id}:{digest}'
+
+
+def cached_dashboard(role, user_id, filters, compute):
+    """
+    Return the cached dashboard data for (role, user, filters), calling
+    ``compute()`` and storing its result on a miss.
+    """
+    key = make_key(role, user_id, filters)
+    data = _cache().get(key)
+    if data is None:
+        _incr(MISSES_KEY)
+        data = compute()
+        _cache().set(key, data, timeout=_timeout())
+    else:
+        _incr(HITS_KEY)
+    return data
+
+
+def invalidate_dashboards():
+    """Make every cached dashboard entry stale."""
+    _generation()
+    _incr(GENERATION_KEY)
+
+
+def cache_stats():
+    cache = _cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 3) if lookups else 0,
+        'generation': cache.get(GENERATION_KEY),
+        'timeout': _timeout(),
+    }
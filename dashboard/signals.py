@@ -0,0 +1,31 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from academics.models import Attendance, Subject, SubjectOffering
+from academics.signals import attendance_bulk_saved
+from accounts.models import ParentProfile, StudentProfile, TeacherProfile
+
+from .cache import invalidate_dashboards
+
+
+def _invalidate(sender, **kwargs):
+    invalidate_dashboards()
+
+
+# Models whose writes change a dashboard total, chart or recent list
+DASHBOARD_MODELS = (Attendance, SubjectOffering, StudentProfile, TeacherProfile, ParentProfile, Subject)
+
+
+def connect_signals():
+    for model in DASHBOARD_MODELS:
+        post_save.connect(_invalidate, sender=model, dispatch_uid=f'dashboard-save-{model.__name__}')
+        if model is Attendance:
+            # A delete receiver would disable fast delete for every student or
+            # offering cascade; those send their own post_delete, and
+            # academics.services.delete_attendance sends attendance_bulk_saved
+            continue
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=f'dashboard-delete-{model.__name__}')
+    attendance_bulk_saved.connect(_invalidate, dispatch_uid='dashboard-attendance-bulk')
+    # Enrollment drives the teacher's distinct-student count
+    m2m_changed.connect(
+        _invalidate, sender=StudentProfile.subjects.through, dispatch_uid='dashboard-enrollment',
+    )
@@ -1,3 +1,48 @@
+import datetime
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from academics.archive import archive_school_year
+from academics.models import Course, Subject, SubjectOffering
+from academics.services import save_attendance_roster
+from accounts.models import CustomUser, StudentProfile
+
+
+class ArchivedAttendanceHistoryTests(TestCase):
+    """A student's attendance history still shows archived school years."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        course = Course.objects.create(name='BSIT', description='Information Technology')
+        subject = Subject.objects.create(course=course, subject_code='IT101', name='Programming', semester_number='1st')
+        user = CustomUser.objects.create(username='student', role='student', first_login=False)
+        self.student = StudentProfile.objects.create(
+            user=user, student_ID='2024-0001', first_name='Ana', last_name='Cruz',
+            course=course, year='1st', section='a', is_regular='reg',
+        )
+        self.student.subjects.add(subject)
+        for school_year, day in (('2024-2025', datetime.date(2024, 8, 5)), ('2026-2027', datetime.date(2026, 8, 3))):
+            offering = SubjectOffering.objects.create(subject=subject, year='1st', section='a', school_year=school_year)
+            save_attendance_roster(offering, day, datetime.time(8), {self.student.pk: 'present'})
+        archive_school_year('2024-2025')
+        self.range = {'start_date': '2024-01-01', 'end_date': '2026-12-31'}
+
+    def test_student_overview(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('dashboard:subject_attendance'), self.range)
+        self.assertEqual(
+            [record.date for record in response.context['page']],
+            [datetime.date(2026, 8, 3), datetime.date(2024, 8, 5)],
+        )
 
-# Create your tests here.
+    def test_parent_overview(self):
+        admin = CustomUser.objects.create(username='admin', role='admin', is_superuser=True, first_login=False)
+        self.client.force_login(admin)
+        response = self.client.get(reverse('dashboard:student_attendances', args=[self.student.pk]), self.range)
+        self.assertEqual(
+            [record.date for record in response.context['page']],
+            [datetime.date(2024, 8, 5), datetime.date(2026, 8, 3)],
+        )
@@ -5,6 +5,7 @@ urlpatterns = [
     path('admin/',views.admin_dashboard,name='admin_dashboard'),
     path('teacher/',views.teacher_home,name='teacher_dashboard'),
     path('student/',views.student_dashboard,name='student_dashboard'),
+    path('cache-stats/',views.dashboard_cache_stats,name='cache_stats'),
     path('student-subjects/',views.student_subjects,name='student_subjects'),
     path('subject-attendance/',views.student_attendance_overview,name='subject_attendance'),
     path('parent-dashboard', views.parent_dashboard, name='dashboard'),
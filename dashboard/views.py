@@ -1,60 +1,77 @@
 from django.shortcuts import render, redirect,get_object_or_404
+from django.http import JsonResponse
 
 from django.utils import timezone
 from accounts.models import TeacherProfile, StudentProfile,ParentProfile
-from academics.models import SubjectOffering, Attendance,Subject
+from academics.archive import needs_archive
+from academics.models import SubjectOffering, Attendance, AttendanceArchive, Subject
+from academics.services import EMPTY_TALLY, tally_totals, tallies_per_subject
 from django.db.models import Count, Q
 from datetime import datetime, date
 from django.contrib.auth.decorators import login_required
 
+from core.pagination import KeysetPaginator
+
+from .cache import cache_stats, cached_dashboard
+
 # Create your views here.
 
 YEAR_LEVELS = ['1st','2nd','3rd','4th']
 @login_required
 def admin_dashboard(request):
-
-    total_students = StudentProfile.objects.all().count()
-    total_teachers = TeacherProfile.objects.all().count()
-    total_parents = ParentProfile.objects.all().count()
-    total_subjects = Subject.objects.all().count()
-    # Get the 5 most recent attendance records with related student and subject_offering
-    recent_attendance_list = Attendance.objects.select_related(
-        'student',                 # fetch related student
-        'subject_offering__subject' # fetch related subject through SubjectOffering
-    ).order_by('-date', '-time')[:8]
-
     # --- Dropdown Filters ---
     selected_year = request.GET.get('year', '1st')
     selected_subject_id = request.GET.get('subject', None)
 
-    subjects_for_year = SubjectOffering.objects.filter(year=selected_year).values_list(
-        'subject__id', 'subject__subject_code'
-    ).distinct()
-
-    if selected_subject_id is None and subjects_for_year:
-        selected_subject_id = subjects_for_year[0][0]
+    def compute():
+        total_students = StudentProfile.objects.all().count()
+        total_teachers = TeacherProfile.objects.all().count()
+        total_parents = ParentProfile.objects.all().count()
+        total_subjects = Subject.objects.all().count()
+        # Get the 5 most recent attendance records with related student and subject_offering
+        recent_attendance_list = list(Attendance.objects.select_related(
+            'student',                 # fetch related student
+            'subject_offering__subject' # fetch related subject through SubjectOffering
+        ).order_by('-date', '-time')[:8])
+
+        subjects_for_year = list(SubjectOffering.objects.filter(year=selected_year).values_list(
+            'subject__id', 'subject__subject_code'
+        ).distinct())
+
+        subject_id = selected_subject_id
+        if subject_id is None and subjects_for_year:
+            subject_id = subjects_for_year[0][0]
+
+        attendance_qs = Attendance.objects.filter(
+            student__year=selected_year,
+            subject_offering__subject_id=subject_id
+        )
 
-    attendance_qs = Attendance.objects.filter(
-        student__year=selected_year,
-        subject_offering__subject_id=selected_subject_id
+        status_counts = attendance_qs.values('status').annotate(count=Count('id'))
+        data = {'present':0, 'absent':0, 'late':0}
+        for item in status_counts:
+            data[item['status']] = item['count']
+
+        return {
+            'subjects': subjects_for_year,
+            'selected_subject_id': int(subject_id) if subject_id else None,
+            'attendance_data': data,
+            'recent_attendance_list': recent_attendance_list,
+            'total_students':total_students,
+            'total_parents':total_parents,
+            'total_subjects':total_subjects,
+            'total_teachers':total_teachers
+        }
+
+    context = cached_dashboard(
+        'admin', request.user.pk,
+        {'year': selected_year, 'subject': selected_subject_id},
+        compute,
     )
-
-    status_counts = attendance_qs.values('status').annotate(count=Count('id'))
-    data = {'present':0, 'absent':0, 'late':0}
-    for item in status_counts:
-        data[item['status']] = item['count']
-
     context = {
+        **context,
         'years': YEAR_LEVELS,
         'selected_year': selected_year,
-        'subjects': subjects_for_year,
-        'selected_subject_id': int(selected_subject_id) if selected_subject_id else None,
-        'attendance_data': data,
-        'recent_attendance_list': recent_attendance_list,
-        'total_students':total_students,
-        'total_parents':total_parents,
-        'total_subjects':total_subjects,
-        'total_teachers':total_teachers
     }
 
     return render(request,'dashboard/admindashboard.html', context)
@@ -62,110 +79,131 @@ def admin_dashboard(request):
 def teacher_home(request):
     teacher = request.user.teacherprofile
 
-    total_students = StudentProfile.objects.filter(
-        subjects__offerings__teacher=teacher
-    ).distinct().count()
-
-    total_subjects = SubjectOffering.objects.filter(teacher=teacher).count()
-    today = timezone.now().date()
-    total_attendance = Attendance.objects.filter(
-        subject_offering__teacher=teacher,
-        date=today
-    ).count()
-
-    # Recent attendance
-    recent_attendance_list = Attendance.objects.select_related(
-        'student',
-        'subject_offering__subject'
-    ).filter(subject_offering__teacher=teacher).order_by('-date', '-time')[:5]
-
     # --- Dropdown Filter for Subjects ---
     selected_subject_id = request.GET.get('subject', None)
-    subjects_for_teacher = SubjectOffering.objects.filter(teacher=teacher).values_list(
-        'subject__id', 'subject__subject_code'
-    ).distinct()
 
-    if selected_subject_id is None and subjects_for_teacher:
-        selected_subject_id = subjects_for_teacher[0][0]
+    def compute():
+        total_students = StudentProfile.objects.filter(
+            subjects__offerings__teacher=teacher
+        ).distinct().count()
+
+        total_subjects = SubjectOffering.objects.filter(teacher=teacher).count()
+        today = timezone.now().date()
+        total_attendance = Attendance.objects.filter(
+            subject_offering__teacher=teacher,
+            date=today
+        ).count()
+
+        # Recent attendance
+        recent_attendance_list = list(Attendance.objects.select_related(
+            'student',
+            'subject_offering__subject'
+        ).filter(subject_offering__teacher=teacher).order_by('-date', '-time')[:5])
+
+        subjects_for_teacher = list(SubjectOffering.objects.filter(teacher=teacher).values_list(
+            'subject__id', 'subject__subject_code'
+        ).distinct())
+
+        subject_id = selected_subject_id
+        if subject_id is None and subjects_for_teacher:
+            subject_id = subjects_for_teacher[0][0]
+
+        # Attendance overview for selected subject
+        attendance_qs = Attendance.objects.filter(
+            subject_offering__teacher=teacher,
+            subject_offering__subject_id=subject_id
+        )
 
-    # Attendance overview for selected subject
-    attendance_qs = Attendance.objects.filter(
-        subject_offering__teacher=teacher,
-        subject_offering__subject_id=selected_subject_id
+        status_counts = attendance_qs.values('status').annotate(count=Count('id'))
+        attendance_data = {'present': 0, 'absent': 0, 'late': 0}
+        for item in status_counts:
+            attendance_data[item['status']] = item['count']
+
+        return {
+            'total_students': total_students,
+            'total_subjects': total_subjects,
+            'total_attendance': total_attendance,
+            'recent_attendance_list': recent_attendance_list,
+            'subjects_for_teacher': subjects_for_teacher,
+            'selected_subject_id': int(subject_id) if subject_id else None,
+            'attendance_data': attendance_data,
+        }
+
+    # "today" is part of the key so the daily count rolls over at midnight
+    context = cached_dashboard(
+        'teacher', request.user.pk,
+        {'subject': selected_subject_id, 'today': timezone.now().date()},
+        compute,
     )
-
-    status_counts = attendance_qs.values('status').annotate(count=Count('id'))
-    attendance_data = {'present': 0, 'absent': 0, 'late': 0}
-    for item in status_counts:
-        attendance_data[item['status']] = item['count']
-
-    context = {
-        'total_students': total_students,
-        'total_subjects': total_subjects,
-        'total_attendance': total_attendance,
-        'recent_attendance_list': recent_attendance_list,
-        'subjects_for_teacher': subjects_for_teacher,
-        'selected_subject_id': int(selected_subject_id) if selected_subject_id else None,
-        'attendance_data': attendance_data,
-    }
     return render(request, 'dashboard/teacherhome.html', context)
 
 @login_required
 def student_dashboard(request):
     student = request.user.studentprofile
-    subjects = student.subjects.all()
 
     # Subject filter for chart, stats & recent attendance
     subject_id = request.GET.get('subject')
 
-    # Base queryset: all attendance for this student (will be filtered below)
-    attendance_qs = student.attendances.all().select_related(
-        'subject_offering__subject'
-    )
-
-    # Optional filter by subject
-    selected_subject_id = None
-    if subject_id:
-        try:
-            selected_subject = subjects.get(id=subject_id)
-            selected_subject_id = selected_subject.id
-            offerings = SubjectOffering.objects.filter(subject=selected_subject)
-            attendance_qs = attendance_qs.filter(subject_offering__in=offerings)
-        except Subject.DoesNotExist:
-            selected_subject = None
-    else:
-        selected_subject = None
-
-    # Totals & stats use the (possibly filtered) attendance_qs so
-    # the chart and percentage reflect the current subject filter.
-    total_subjects = subjects.count()
-    status_counts = attendance_qs.values('status').annotate(count=Count('id'))
-
-    attendance_data = {'present': 0, 'absent': 0, 'late': 0}
-    for item in status_counts:
-        attendance_data[item['status']] = item['count']
+    def compute():
+        subjects = student.subjects.all()
 
-    total_records = attendance_qs.count()
-    if total_records > 0:
-        attendance_percentage = (attendance_data["present"] / total_records) * 100
-    else:
-        attendance_percentage = 0
+        # Base queryset: all attendance for this student (will be filtered below)
+        attendance_qs = student.attendances.all().select_related(
+            'subject_offering__subject'
+        )
 
-    # Recent attendance (respecting subject filter if any)
-    recent_attendance_list = attendance_qs.order_by('-date', '-time')[:10]
+        # Optional filter by subject
+        selected_subject_id = None
+        if subject_id:
+            try:
+                selected_subject = subjects.get(id=subject_id)
+                selected_subject_id = selected_subject.id
+                offerings = SubjectOffering.objects.filter(subject=selected_subject)
+                attendance_qs = attendance_qs.filter(subject_offering__in=offerings)
+            except Subject.DoesNotExist:
+                selected_subject = None
+        else:
+            selected_subject = None
 
-    context = {
-        'student': student,
-        'total_subjects': total_subjects,
-        "attendance_data": attendance_data,
-        "attendance_percentage": round(attendance_percentage, 1),
-        "total_records": total_records,
-        'subjects': subjects,
-        'selected_subject_id': selected_subject_id,
-        'recent_attendance_list': recent_attendance_list,
-    }
+        # Totals & stats use the (possibly filtered) attendance_qs so
+        # the chart and percentage reflect the current subject filter.
+        total_subjects = subjects.count()
+        status_counts = attendance_qs.values('status').annotate(count=Count('id'))
+
+        attendance_data = {'present': 0, 'absent': 0, 'late': 0}
+        for item in status_counts:
+            attendance_data[item['status']] = item['count']
+
+        total_records = sum(attendance_data.values())
+        if total_records > 0:
+            attendance_percentage = (attendance_data["present"] / total_records) * 100
+        else:
+            attendance_percentage = 0
+
+        # Recent attendance (respecting subject filter if any)
+        recent_attendance_list = list(attendance_qs.order_by('-date', '-time')[:10])
+
+        return {
+            'total_subjects': total_subjects,
+            "attendance_data": attendance_data,
+            "attendance_percentage": round(attendance_percentage, 1),
+            "total_records": total_records,
+            'subjects': list(subjects),
+            'selected_subject_id': selected_subject_id,
+            'recent_attendance_list': recent_attendance_list,
+        }
+
+    context = cached_dashboard('student', request.user.pk, {'subject': subject_id}, compute)
+    context = {**context, 'student': student}
     return render(request, 'dashboard/student_dashboard.html', context)
 
+@login_required
+def dashboard_cache_stats(request):
+    """Hit/miss counters of the dashboard cache, for monitoring."""
+    if not request.user.is_superuser and getattr(request.user, 'role', None) != 'admin':
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    return JsonResponse(cache_stats())
+
 @login_required
 def student_subjects(request):
     student = request.user.studentprofile
@@ -173,17 +211,16 @@ def student_subjects(request):
 
     subject_data = []
 
+    # Rolled-up counts per subject, summed across all of its offerings
+    tallies_by_subject = tallies_per_subject(student.attendance_tallies.all())
+
     for subject in subjects:
-        # Get all subject offerings for this subject
-        offerings = SubjectOffering.objects.filter(subject=subject)
-        
-        # Aggregate attendances across all offerings
-        attendances = student.attendances.filter(subject_offering__in=offerings)
-
-        total_classes = attendances.count()
-        present_count = attendances.filter(status='present').count()
-        absent_count = attendances.filter(status='absent').count()
-        late_count = attendances.filter(status='late').count()
+        tally = tallies_by_subject.get(subject.id, EMPTY_TALLY)
+
+        total_classes = tally['total']
+        present_count = tally['present']
+        absent_count = tally['absent']
+        late_count = tally['late']
         attendance_percentage = (present_count / total_classes * 100) if total_classes > 0 else 0
 
         subject_data.append({
@@ -226,16 +263,26 @@ def student_attendance_overview(request):
     start_date_str = start_date.isoformat()
     end_date_str = end_date.isoformat()
 
-    # Filter attendance records
-    attendance_qs = student.attendances.filter(date__range=[start_date, end_date])
+    # Filter attendance records (the same filters work on the archive)
     selected_subject = None
     if subject_id:
-        attendance_qs = attendance_qs.filter(subject_offering__subject_id=subject_id)
         selected_subject = subjects.get(id=subject_id)
 
+    def filter_records(records):
+        records = records.filter(date__range=[start_date, end_date])
+        if subject_id:
+            records = records.filter(subject_offering__subject_id=subject_id)
+        return records.select_related('student')
+
+    archived = [filter_records(student.archived_attendances.all())] if needs_archive(start_date) else []
+    page = KeysetPaginator(
+        filter_records(student.attendances.all()), extra_querysets=archived,
+    ).page(request.GET)
+
     context = {
         'subjects': subjects,
-        'attendance_records': attendance_qs.order_by('-date', '-time'),
+        'attendance_records': page,
+        'page': page,
         'selected_subject': selected_subject,
         'start_date': start_date_str,
         'end_date': end_date_str,
@@ -311,14 +358,17 @@ def parent_dashboard(request):
 
         # Filter attendance by subject if selected
         attendances = selected_child.attendances.all()
+        tallies = selected_child.attendance_tallies.all()
         if selected_subject_id:
             attendances = attendances.filter(subject_offering__subject__id=selected_subject_id)
+            tallies = tallies.filter(subject_offering__subject__id=selected_subject_id)
 
-        attendance_data['present'] = attendances.filter(status='present').count()
-        attendance_data['absent'] = attendances.filter(status='absent').count()
-        attendance_data['late'] = attendances.filter(status='late').count()
+        totals = tally_totals(tallies)
+        attendance_data['present'] = totals['present']
+        attendance_data['absent'] = totals['absent']
+        attendance_data['late'] = totals['late']
 
-        total_classes = attendances.count()
+        total_classes = totals['total']
         attendance_percentage = round((attendance_data['present'] / total_classes) * 100, 2) if total_classes > 0 else 0
 
         # Get recent 10 attendance records
@@ -353,24 +403,47 @@ def attendance_detail_per_subject(request, student_id, subject_id):
     start_date = request.GET.get('start_date') or None
     end_date = request.GET.get('end_date') or timezone.now().date()
 
-    # Get all offerings for this subject
-    offerings = SubjectOffering.objects.filter(subject=subject)
-    attendances = student.attendances.filter(subject_offering__in=offerings)
+    # The subject's records, live and (when the range reaches back that
+    # far) archived, so the list and the counts cover the same rows
+    sources = [student.attendances.all()]
+    if needs_archive(start_date):
+        sources.append(student.archived_attendances.all())
+    sources = [records.filter(subject_offering__subject=subject) for records in sources]
+    if start_date:
+        sources = [records.filter(date__range=[start_date, end_date]) for records in sources]
+    attendance_records = sorted(
+        (record for records in sources for record in records.order_by('date', 'time')),
+        key=lambda record: (record.date, record.time),
+    )
 
     if start_date:
-        attendances = attendances.filter(date__range=[start_date, end_date])
+        totals = {'present': 0, 'absent': 0, 'late': 0, 'total': 0}
+        for records in sources:
+            counts = records.aggregate(
+                present=Count('pk', filter=Q(status='present')),
+                absent=Count('pk', filter=Q(status='absent')),
+                late=Count('pk', filter=Q(status='late')),
+                total=Count('pk'),
+            )
+            for key, value in counts.items():
+                totals[key] += value
+    else:
+        # Whole history: read the rollup instead of scanning attendance
+        totals = tally_totals(
+            student.attendance_tallies.filter(subject_offering__subject=subject)
+        )
 
     # Summary stats
-    total_classes = attendances.count()
-    present_count = attendances.filter(status='present').count()
-    absent_count = attendances.filter(status='absent').count()
-    late_count = attendances.filter(status='late').count()
+    total_classes = totals['total']
+    present_count = totals['present']
+    absent_count = totals['absent']
+    late_count = totals['late']
     attendance_percentage = (present_count / total_classes * 100) if total_classes > 0 else 0
 
     context = {
         'student': student,
         'subject': subject,
-        'attendance_records': attendances.order_by('date', 'time'),
+        'attendance_records': attendance_records,
         'total_classes': total_classes,
         'present_count': present_count,
         'absent_count': absent_count,
@@ -396,19 +469,21 @@ def parent_student_attendance_overview(request, student_id):
     start_date = request.GET.get('start_date') or today
     end_date = request.GET.get('end_date') or today
 
-    # Filter logic
-    if selected_subject_id:
-        selected_subject = subjects.get(id=selected_subject_id)
-        offerings = SubjectOffering.objects.filter(subject=selected_subject)
-        attendance_records = student.attendances.filter(
-            subject_offering__in=offerings,
-            date__range=[start_date, end_date]
-        )
-    else:
-        selected_subject = None
-        attendance_records = student.attendances.filter(
-            date__range=[start_date, end_date]
-        )
+    # Filter logic (the same filters work on the archive)
+    selected_subject = subjects.get(id=selected_subject_id) if selected_subject_id else None
+
+    def filter_records(records):
+        records = records.filter(date__range=[start_date, end_date])
+        if selected_subject:
+            records = records.filter(subject_offering__subject=selected_subject)
+        return records.select_related('subject_offering__subject')
+
+    archived = [filter_records(student.archived_attendances.all())] if needs_archive(start_date) else []
+    page = KeysetPaginator(
+        filter_records(student.attendances.all()),
+        descending=False,
+        extra_querysets=archived,
+    ).page(request.GET)
 
     context = {
         'student': student,
@@ -416,7 +491,8 @@ def parent_student_attendance_overview(request, student_id):
         'selected_subject': selected_subject,
         'start_date': start_date,
         'end_date': end_date,
-        'attendance_records': attendance_records.order_by('date', 'time'),
+        'attendance_records': page,
+        'page': page,
     }
     return render(request, 'dashboard/attendance_overview.html', context)
 
@@ -0,0 +1,313 @@
+"""
+Columnar attendance snapshot for whole-semester analytics.
+
+``build_snapshot()`` dumps Attendance (live and archived) into a small
+star layout under ``settings.ANALYTICS_ROOT``:
+
+* ``attendance``: one row per record with ``id``, ``date``, ``status``
+  (categorical), ``student_user_id`` and ``offering_id``
+* ``students``: ``user_id``, ``student_ID``, ``full_name``, ``course_id``,
+  ``course_name``, ``section`` (categorical)
+* ``offerings``: ``id``, ``year`` / ``semester`` (categorical),
+  ``subject_id``, ``subject_code``, ``subject_name``
+
+Student and offering attributes live in the small dimension tables and
+are looked up by position at query time. As a result, a student moving
+section or a subject renamed is picked up by the nightly incremental
+run without rewriting the fact table.
+
+Files are Parquet (pyarrow is in requirements.txt); without pyarrow the
+build falls back to pickled DataFrames and logs a warning. Both keep
+the categorical columns. The rollup functions mirror the admin
+attendance report filters (course, year, semester, subject, section)
+with vectorized pandas/NumPy operations.
+"""
+from datetime import timedelta
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
+import numpy as np
+import pandas as pd
+
+from academics.models import Attendance, AttendanceArchive, SubjectOffering
+from accounts.constants import SECTION_CHOICES, YEAR_LEVEL_CHOICES
+from accounts.models import StudentProfile
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - depends on the environment
+    SNAPSHOT_FORMAT = 'pickle'
+else:
+    SNAPSHOT_FORMAT = 'parquet'
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 100_000
+
+# Incremental runs reload this many days before the newest snapshot date,
+# since marks for recent days are still being corrected
+REFRESH_DAYS = 14
+
+STATUSES = [value for value, _label in Attendance.STATUS_CHOICES]
+STATUS_DTYPE = pd.CategoricalDtype(STATUSES)
+SECTION_DTYPE = pd.CategoricalDtype([code for code, _label in SECTION_CHOICES])
+YEAR_DTYPE = pd.CategoricalDtype([code for code, _label in YEAR_LEVEL_CHOICES])
+SEMESTER_DTYPE = pd.CategoricalDtype(['1st', '2nd'])
+
+TABLES = ('attendance', 'students', 'offerings')
+FACT_COLUMNS = ['id', 'date', 'status', 'student_user_id', 'offering_id']
+
+
+def snapshot_dir():
+    path = getattr(settings, 'ANALYTICS_ROOT', settings.BASE_DIR / 'analytics')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _table_path(directory, name):
+    extension = 'parquet' if SNAPSHOT_FORMAT == 'parquet' else 'pkl'
+    return os.path.join(directory, f'{name}.{extension}')
+
+
+def _write(frame, path):
+    if SNAPSHOT_FORMAT == 'parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        frame.to_pickle(path)
+
+
+def _read(path):
+    if SNAPSHOT_FORMAT == 'parquet':
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+# -------------------------------
+# Building
+# -------------------------------
+def _fact_frame(rows):
+    frame = pd.DataFrame.from_records(rows, columns=FACT_COLUMNS)
+    return frame.astype({
+        'id': 'int64',
+        'date': 'datetime64[ns]',
+        'status': STATUS_DTYPE,
+        'student_user_id': 'int64',
+        'offering_id': 'int64',
+    })
+
+
+def _fact_chunks(**filters):
+    """Yield fact-table DataFrames of up to CHUNK_SIZE rows from both tables."""
+    for model in (Attendance, AttendanceArchive):
+        rows = model.objects.filter(**filters).order_by().values_list(
+            'id', 'date', 'status', 'student__user_id', 'subject_offering_id',
+        )
+        chunk = []
+        for row in rows.iterator(chunk_size=CHUNK_SIZE):
+            chunk.append(row)
+            if len(chunk) == CHUNK_SIZE:
+                yield _fact_frame(chunk)
+                chunk = []
+        if chunk:
+            yield _fact_frame(chunk)
+
+
+def _concat(frames):
+    frames = list(frames)
+    if not frames:
+        return _fact_frame([])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _students_frame():
+    rows = StudentProfile.objects.annotate(
+        full_name=Concat(
+            F('first_name'),
+            Value(' '),
+            Coalesce(F('middle_name'), Value('')),
+            Value(' '),
+            F('last_name'),
+        ),
+    ).values_list('user_id', 'student_ID', 'full_name', 'course_id', 'course__name', 'section')
+    frame = pd.DataFrame.from_records(
+        list(rows),
+        columns=['user_id', 'student_ID', 'full_name', 'course_id', 'course_name', 'section'],
+    )
+    return frame.astype({'user_id': 'int64', 'course_id': 'Int64', 'section': SECTION_DTYPE})
+
+
+def _offerings_frame():
+    rows = SubjectOffering.objects.values_list(
+        'id', 'year', 'subject__semester_number', 'subject_id', 'subject__subject_code', 'subject__name',
+    )
+    frame = pd.DataFrame.from_records(
+        list(rows),
+        columns=['id', 'year', 'semester', 'subject_id', 'subject_code', 'subject_name'],
+    )
+    return frame.astype({
+        'id': 'int64', 'year': YEAR_DTYPE, 'semester': SEMESTER_DTYPE, 'subject_id': 'int64',
+    })
+
+
+def _meta_path(directory):
+    return os.path.join(directory, 'meta.json')
+
+
+def read_meta(directory=None):
+    directory = directory or snapshot_dir()
+    try:
+        with open(_meta_path(directory)) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def build_snapshot(directory=None, incremental=False):
+    """
+    Write the attendance snapshot to ``directory`` (default
+    ``snapshot_dir()``) and return its metadata.
+
+    With ``incremental`` an existing snapshot is kept and only rows newer
+    than it, or dated within REFRESH_DAYS of its newest date, are
+    reloaded. Rows deleted from the database since the last full build
+    are not noticed, so schedule a full build now and then.
+    """
+    if SNAPSHOT_FORMAT != 'parquet':
+        logger.warning('pyarrow is not installed; writing the analytics snapshot as pickled DataFrames')
+    directory = directory or snapshot_dir()
+    os.makedirs(directory, exist_ok=True)
+    meta = read_meta(directory) if incremental else None
+    if meta is not None and meta.get('format') != SNAPSHOT_FORMAT:
+        meta = None
+
+    if meta is None or meta['max_date'] is None:
+        fact = _concat(_fact_chunks())
+        mode = 'full'
+    else:
+        window_start = pd.Timestamp(meta['max_date']) - timedelta(days=REFRESH_DAYS)
+        fresh = _concat(_fact_chunks(date__gte=window_start.date()))
+        newer = _concat(_fact_chunks(id__gt=meta['max_id'], date__lt=window_start.date()))
+        fact = _read(_table_path(directory, 'attendance'))
+        reloaded = pd.concat([fresh['id'], newer['id']])
+        fact = fact[(fact['date'] < window_start) & ~fact['id'].isin(reloaded)]
+        fact = pd.concat([fact, fresh, newer], ignore_index=True)
+        mode = 'incremental'
+
+    _write(fact, _table_path(directory, 'attendance'))
+    _write(_students_frame(), _table_path(directory, 'students'))
+    _write(_offerings_frame(), _table_path(directory, 'offerings'))
+
+    meta = {
+        'format': SNAPSHOT_FORMAT,
+        'mode': mode,
+        'built_at': timezone.now().isoformat(),
+        'rows': int(len(fact)),
+        'max_id': int(fact['id'].max()) if len(fact) else 0,
+        'max_date': fact['date'].max().date().isoformat() if len(fact) else None,
+    }
+    with open(_meta_path(directory), 'w') as handle:
+        json.dump(meta, handle)
+    return meta
+
+
+# -------------------------------
+# Querying
+# -------------------------------
+class Snapshot:
+    """The loaded snapshot tables, with fact rows resolved to dimension rows."""
+
+    def __init__(self, attendance, students, offerings):
+        self.students = students.reset_index(drop=True)
+        self.offerings = offerings.reset_index(drop=True)
+        student_pos = pd.Index(self.students['user_id']).get_indexer(attendance['student_user_id'])
+        offering_pos = pd.Index(self.offerings['id']).get_indexer(attendance['offering_id'])
+        # Records of students or offerings deleted since the build drop out,
+        # as they would from the ORM joins
+        known = (student_pos >= 0) & (offering_pos >= 0)
+        self.attendance = attendance[known].reset_index(drop=True)
+        self.student_pos = student_pos[known]
+        self.offering_pos = offering_pos[known]
+
+
+def load_snapshot(directory=None):
+    directory = directory or snapshot_dir()
+    return Snapshot(*(_read(_table_path(directory, name)) for name in TABLES))
+
+
+def _mask(snapshot, course=None, year=None, semester=None, subject=None, section=None):
+    """Boolean mask over the fact rows for the admin report filters."""
+    mask = np.ones(len(snapshot.attendance), dtype=bool)
+    students, offerings = snapshot.students, snapshot.offerings
+    if course:
+        course_ids = students['course_id'].to_numpy(dtype='float64', na_value=np.nan)
+        mask &= course_ids[snapshot.student_pos] == int(course)
+    if year:
+        mask &= (offerings['year'] == year).to_numpy()[snapshot.offering_pos]
+    if semester:
+        mask &= (offerings['semester'] == semester).to_numpy()[snapshot.offering_pos]
+    if subject:
+        mask &= (offerings['subject_id'] == int(subject)).to_numpy()[snapshot.offering_pos]
+    if section:
+        mask &= (students['section'] == section).to_numpy()[snapshot.student_pos]
+    return mask
+
+
+def _status_counts(keys, statuses, size):
+    """
+    present/absent/late counts per key in ``range(size)``, from one
+    bincount over ``key * 3 + status_code``.
+    """
+    codes = statuses.cat.codes.to_numpy().astype('int64')
+    counts = np.bincount(keys * len(STATUSES) + codes, minlength=size * len(STATUSES))
+    counts = counts.reshape(size, len(STATUSES))
+    return pd.DataFrame(counts, columns=STATUSES)
+
+
+def student_summary(snapshot, **filters):
+    """
+    Per-student totals, like the admin report summary: ``student_ID``,
+    ``full_name``, ``course_name``, ``present``, ``absent``, ``late``.
+    """
+    mask = _mask(snapshot, **filters)
+    students = snapshot.students
+    counts = _status_counts(
+        snapshot.student_pos[mask], snapshot.attendance['status'][mask], len(students),
+    )
+    summary = pd.concat([students[['student_ID', 'full_name', 'course_name']], counts], axis=1)
+    summary = summary[counts.sum(axis=1).to_numpy() > 0]
+    return summary.sort_values('student_ID').reset_index(drop=True)
+
+
+def subject_summary(snapshot, **filters):
+    """Totals per subject: ``subject_id``, ``subject_code``, ``subject_name`` and counts."""
+    mask = _mask(snapshot, **filters)
+    offerings = snapshot.offerings
+    per_offering = _status_counts(
+        snapshot.offering_pos[mask], snapshot.attendance['status'][mask], len(offerings),
+    )
+    per_offering = pd.concat([offerings[['subject_id', 'subject_code', 'subject_name']], per_offering], axis=1)
+    summary = per_offering.groupby(['subject_id', 'subject_code', 'subject_name'], as_index=False)[STATUSES].sum()
+    return summary[summary[STATUSES].sum(axis=1) > 0].reset_index(drop=True)
+
+
+def section_summary(snapshot, **filters):
+    """Totals per class: ``course_name``, ``year``, ``section`` and counts."""
+    mask = _mask(snapshot, **filters)
+    students, offerings = snapshot.students, snapshot.offerings
+    student_pos = snapshot.student_pos[mask]
+    codes = snapshot.attendance['status'][mask].cat.codes.to_numpy()
+    frame = pd.DataFrame({
+        'course_name': students['course_name'].to_numpy()[student_pos],
+        'year': offerings['year'].to_numpy()[snapshot.offering_pos[mask]],
+        'section': students['section'].to_numpy()[student_pos],
+    })
+    for code, status in enumerate(STATUSES):
+        frame[status] = codes == code
+    summary = frame.groupby(['course_name', 'year', 'section'], dropna=False, sort=True)[STATUSES].sum()
+    return summary.reset_index()
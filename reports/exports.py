@@ -0,0 +1,136 @@
+"""
+Streaming CSV / XLSX writers for the attendance reports.
+
+Rows are read with ``.iterator(chunk_size=...)`` so neither the queryset
+cache nor the response ever holds the whole report in memory.
+"""
+import csv
+import tempfile
+
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.http import FileResponse, StreamingHttpResponse
+from openpyxl import Workbook
+
+
+CHUNK_SIZE = 2000
+
+DETAIL_HEADER = [
+    'Student ID', 'Student', 'Course', 'Year', 'Section', 'Subject',
+    'Semester', 'School Year', 'Date', 'Time', 'Status',
+]
+SUMMARY_HEADER = ['Student ID', 'Student', 'Course', 'Total Present', 'Total Absent', 'Total Late']
+TEACHER_DETAILS_HEADER = [
+    'Teacher', 'Email', 'Subject Code', 'Subject', 'Year', 'School Year',
+    'Section A', 'Section B', 'Section C', 'Section D',
+]
+
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def detail_rows(report_data):
+    """
+    Yield one flat row per attendance record of the report querysets
+    (live and archived), each in date order.
+    """
+    for queryset in report_data:
+        yield from _detail_rows(queryset)
+
+
+def _detail_rows(queryset):
+    rows = queryset.select_related(None).order_by('date', 'time', 'pk').annotate(
+        export_name=Concat(F('student__first_name'), Value(' '), F('student__last_name')),
+        export_subject=Concat(
+            F('subject_offering__subject__subject_code'),
+            Value(' - '),
+            F('subject_offering__subject__name'),
+        ),
+    ).values_list(
+        'student_id',
+        'export_name',
+        'student__course__name',
+        'subject_offering__year',
+        'student__section',
+        'export_subject',
+        'subject_offering__subject__semester_number',
+        'subject_offering__school_year',
+        'date',
+        'time',
+        'status',
+    )
+    yield from rows.iterator(chunk_size=CHUNK_SIZE)
+
+
+def summary_rows(summary_data):
+    """Yield one row per student of the report summary queryset."""
+    for row in summary_data.order_by('student__student_ID').iterator(chunk_size=CHUNK_SIZE):
+        yield (
+            row['student__student_ID'],
+            ' '.join(row['full_name'].split()),
+            row['student__course__name'],
+            row['total_present'],
+            row['total_absent'],
+            row['total_late'],
+        )
+
+
+def teacher_details_rows(teachers_data):
+    """Yield one row per offering of the teacher details report data."""
+    for entry in teachers_data:
+        teacher = entry['teacher']
+        name = ' '.join(filter(None, [teacher.first_name, teacher.middle_name, teacher.last_name]))
+        for info in entry['subjects_info']:
+            yield (
+                name,
+                teacher.user.email,
+                info['subject'].subject_code,
+                info['subject'].name,
+                info['year'],
+                info['school_year'],
+                *info['section_counts'].values(),
+            )
+
+
+def csv_response(filename, header, rows):
+    """Stream ``header`` + ``rows`` as a CSV attachment."""
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def xlsx_response(filename, sheets):
+    """
+    Build a workbook from ``(title, header, rows)`` sheets in write-only mode
+    and send it as an attachment.
+
+    Write-only worksheets flush rows to disk as they are appended, and the
+    finished file is spooled from a temporary file rather than memory.
+    """
+    workbook = Workbook(write_only=True)
+    for title, header, rows in sheets:
+        sheet = workbook.create_sheet(title=title)
+        sheet.append(header)
+        for row in rows:
+            sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
@@ -0,0 +1,148 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from django.http import QueryDict
+from datetime import date, timedelta
+import math
+import tempfile
+import time
+
+from academics.models import Attendance, Course, Subject, SubjectOffering
+from academics.services import refresh_attendance_tallies
+from accounts.constants import SECTION_CHOICES, YEAR_LEVEL_CHOICES
+from accounts.models import CustomUser, StudentProfile
+from reports.analytics import build_snapshot, load_snapshot, section_summary, student_summary, subject_summary
+from reports.views import filter_attendance_report
+
+
+SUBJECTS_PER_YEAR = 8
+STATUSES = ('present', 'present', 'present', 'late', 'absent')
+
+
+class _Rollback(Exception):
+    """Raised to discard the seeded attendance after the run."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the admin report rollups through the ORM vs the columnar snapshot "
+        "(seeded data is rolled back)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=200_000,
+            help='Attendance rows to seed (default 200000; the target workload is 5000000)',
+        )
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                seeded = self._seed(rows)
+                # bulk_create skips the tally signals; the report summary reads tallies
+                refresh_attendance_tallies()
+                self.stdout.write(f"Seeded {seeded} attendance rows in {time.perf_counter() - started:.1f}s")
+                self._compare()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _timed(self, label, func):
+        started = time.perf_counter()
+        result = func()
+        self.stdout.write(f"  {label:<28} {time.perf_counter() - started:>8.3f}s")
+        return result
+
+    def _compare(self):
+        self.stdout.write("ORM")
+        summary_data = filter_attendance_report(QueryDict())[1]
+        orm_students = self._timed('student summary', lambda: list(summary_data))
+        self._timed('per-subject rollup', lambda: list(
+            Attendance.objects.order_by().values('subject_offering__subject_id').annotate(**self._counts())
+        ))
+        self._timed('per-section rollup', lambda: list(
+            Attendance.objects.order_by().values(
+                'student__course__name', 'subject_offering__year', 'student__section',
+            ).annotate(**self._counts())
+        ))
+
+        self.stdout.write("Snapshot")
+        with tempfile.TemporaryDirectory() as directory:
+            self._timed('build (full)', lambda: build_snapshot(directory))
+            self._timed('build (incremental)', lambda: build_snapshot(directory, incremental=True))
+            snapshot = self._timed('load', lambda: load_snapshot(directory))
+        students = self._timed('student summary', lambda: student_summary(snapshot))
+        self._timed('per-subject rollup', lambda: subject_summary(snapshot))
+        self._timed('per-section rollup', lambda: section_summary(snapshot))
+
+        orm_total = sum(row['total_present'] + row['total_absent'] + row['total_late'] for row in orm_students)
+        snapshot_total = int(students[['present', 'absent', 'late']].to_numpy().sum())
+        self.stdout.write(
+            f"Totals: ORM {orm_total}, snapshot {snapshot_total}"
+            + ("" if orm_total == snapshot_total else "  (MISMATCH)")
+        )
+
+    @staticmethod
+    def _counts():
+        return {
+            status: Count('pk', filter=Q(status=status))
+            for status in ('present', 'absent', 'late')
+        }
+
+    def _seed(self, rows):
+        per_student = SUBJECTS_PER_YEAR * 180
+        students = min(max(rows // per_student, 50), 10_000)
+        days = math.ceil(rows / (students * SUBJECTS_PER_YEAR))
+
+        course = Course.objects.create(name='BENCH', description='Benchmark course')
+        years = [code for code, _label in YEAR_LEVEL_CHOICES]
+        sections = [code for code, _label in SECTION_CHOICES]
+        subjects = Subject.objects.bulk_create([
+            Subject(course=course, subject_code=f'BA-{year}-{i}', name=f'Bench {year} {i}',
+                    semester_number='1st' if i % 2 else '2nd', year_level=year)
+            for year in years for i in range(SUBJECTS_PER_YEAR)
+        ])
+        offerings = SubjectOffering.objects.bulk_create([
+            SubjectOffering(subject=subject, year=subject.year_level, section='a', school_year='bench')
+            for subject in subjects
+        ])
+        offerings_by_year = {year: [o for o in offerings if o.year == year] for year in years}
+
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'ba-{i}', email=f'ba-{i}@bench.local', role='student')
+            for i in range(students)
+        ])
+        profiles = StudentProfile.objects.bulk_create([
+            StudentProfile(user=user, student_ID=f'BA{i:07d}', first_name='Bench', last_name=str(i),
+                           course=course, year=years[i % len(years)],
+                           section=sections[(i // len(years)) % len(sections)], is_regular='reg')
+            for i, user in enumerate(users)
+        ])
+
+        start = date(2020, 1, 1)
+        seeded = 0
+        batch = []
+        for day in range(days):
+            for index, student in enumerate(profiles):
+                for offering in offerings_by_year[student.year]:
+                    if seeded + len(batch) >= rows:
+                        break
+                    batch.append(Attendance(
+                        student_id=student.pk,
+                        subject_offering_id=offering.pk,
+                        date=start + timedelta(days=day),
+                        time='08:00',
+                        status=STATUSES[(index + day + offering.pk) % len(STATUSES)],
+                    ))
+                if len(batch) >= 50_000:
+                    Attendance.objects.bulk_create(batch, batch_size=5000)
+                    seeded += len(batch)
+                    batch = []
+        if batch:
+            Attendance.objects.bulk_create(batch, batch_size=5000)
+            seeded += len(batch)
+        return seeded
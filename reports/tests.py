@@ -1,3 +1,215 @@
+import datetime
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from academics.archive import archive_school_year
+from academics.models import Attendance, AttendanceArchive, Course, Subject, SubjectOffering
+from academics.services import save_attendance_roster
+from accounts.models import CustomUser, StudentProfile, TeacherProfile
+
+from . import analytics
+
+
+def make_teacher(username):
+    user = CustomUser.objects.create(username=username, role='teacher', first_login=False)
+    return TeacherProfile.objects.create(user=user, first_name='Teacher', last_name=username)
+
+
+def make_offerings(teacher, count, students_per_section=3, attendance_date=None):
+    """
+    ``count`` offerings of ``teacher``, each its own subject and course with
+    students in two sections, every student marked present on
+    ``attendance_date`` when given.
+    """
+    offerings = []
+    for index in range(count):
+        course = Course.objects.create(name=f'{teacher.last_name}-C{index}', description='Course')
+        subject = Subject.objects.create(
+            course=course, subject_code=f'{teacher.last_name}-S{index}', name=f'Subject {index}',
+            semester_number='1st',
+        )
+        offering = SubjectOffering.objects.create(
+            subject=subject, teacher=teacher, year='1st', section='a', school_year='2025-2026',
+        )
+        for section in ('a', 'b'):
+            for number in range(students_per_section):
+                student_id = f'{course.pk}-{section}{number}'
+                user = CustomUser.objects.create(username=f'student-{student_id}', role='student', first_login=False)
+                student = StudentProfile.objects.create(
+                    user=user, student_ID=student_id, first_name='Student', last_name=student_id,
+                    course=course, year='1st', section=section, is_regular='reg',
+                )
+                if attendance_date:
+                    Attendance.objects.create(
+                        student=student, subject_offering=offering, date=attendance_date, status='present',
+                    )
+        offerings.append(offering)
+    return offerings
+
+
+class ReportQueryCountTests(TestCase):
+    """Pin the query counts of reports that used to issue queries per row."""
+
+    def setUp(self):
+        cache.clear()
+
+    def log_in(self, user, url):
+        """Log in and settle the session, leaving the report's caches cold."""
+        self.client.force_login(user)
+        self.client.get(url)
+        cache.clear()
+
+    def test_attendance_summary_query_count_is_constant(self):
+        today = datetime.date.today()
+        url = reverse('reports:attendance_summary')
+        for count in (2, 8):
+            teacher = make_teacher(f'summary-{count}')
+            make_offerings(teacher, count, attendance_date=today)
+            self.log_in(teacher.user, url)
+            # session, user, teacher profile, archive bound, section sizes,
+            # offerings with their status counts, three filter choice lists
+            with self.assertNumQueries(9):
+                response = self.client.get(url)
+            self.assertEqual(len(response.context['data']), count)
+            self.assertEqual(response.context['data'][0]['present'], 6)
+
+    def test_class_overview_query_count_is_constant(self):
+        url = reverse('reports:attendance_overview')
+        for count in (2, 8):
+            teacher = make_teacher(f'overview-{count}')
+            make_offerings(teacher, count)
+            self.log_in(teacher.user, url)
+            # session, user, teacher profile, offerings, section sizes,
+            # two filter choice lists
+            with self.assertNumQueries(7):
+                response = self.client.get(url)
+            self.assertEqual(len(response.context['data']), count)
+            row = response.context['data'][0]
+            self.assertEqual((row['section_counts_list'], row['total_students']), ([3, 3, 0, 0], 6))
+
+
+class TeacherDetailsReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create(username='admin', role='admin', is_superuser=True, first_login=False)
+        course = Course.objects.create(name='BSIT', description='Information Technology')
+        subjects = Subject.objects.bulk_create([
+            Subject(course=course, subject_code=f'IT{index}', name=f'Subject {index}', semester_number='1st')
+            for index in range(20)
+        ])
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'teacher-{index}', role='teacher', first_login=False) for index in range(200)
+        ])
+        teachers = TeacherProfile.objects.bulk_create([
+            TeacherProfile(user=user, first_name='Teacher', last_name=str(index)) for index, user in enumerate(users)
+        ])
+        # Two offerings per teacher, each subject taught to ten sections
+        SubjectOffering.objects.bulk_create([
+            SubjectOffering(
+                subject=subjects[(2 * index + offset) % 20], teacher=teacher, year='1st',
+                section='a', school_year=f'{2000 + (2 * index + offset) // 20}',
+            )
+            for index, teacher in enumerate(teachers)
+            for offset in range(2)
+        ])
+        users = CustomUser.objects.bulk_create([
+            CustomUser(username=f'student-{index}', role='student', first_login=False) for index in range(40)
+        ])
+        students = StudentProfile.objects.bulk_create([
+            StudentProfile(
+                user=user, student_ID=f'S{index}', first_name='Student', last_name=str(index),
+                course=course, year='1st', section='ab'[index % 2], is_regular='reg',
+            )
+            for index, user in enumerate(users)
+        ])
+        StudentProfile.subjects.through.objects.bulk_create([
+            StudentProfile.subjects.through(studentprofile_id=student.pk, subject_id=subject.pk)
+            for student in students
+            for subject in subjects
+        ])
+
+    def test_report_query_count_with_200_teachers(self):
+        url = reverse('reports:teacher_details_report')
+        self.client.force_login(self.admin)
+        self.client.get(url)
+        # session, user, offerings with subjects and teachers, enrollment
+        # counts, course filter choices
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        teachers_data = response.context['teachers_data']
+        self.assertEqual(len(teachers_data), 200)
+        self.assertEqual(teachers_data[0]['rowspan'], 2)
+        self.assertEqual(teachers_data[0]['subjects_info'][0]['section_counts'], {'a': 20, 'b': 20, 'c': 0, 'd': 0})
+
+    def test_export_query_count_with_200_teachers(self):
+        url = reverse('reports:teacher_details_report_export')
+        self.client.force_login(self.admin)
+        self.client.get(url)
+        with self.assertNumQueries(4):
+            content = b''.join(self.client.get(url).streaming_content)
+        # header + one line per offering
+        self.assertEqual(len(content.splitlines()), 401)
+
+
+class ArchivedAttendanceReportTests(TestCase):
+    """Reports keep showing a school year's history after it is archived."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.admin = CustomUser.objects.create(username='admin', role='admin', is_superuser=True, first_login=False)
+        old, = make_offerings(make_teacher('archived'), 1, attendance_date=datetime.date(2024, 8, 5))
+        self.current = SubjectOffering.objects.create(
+            subject=old.subject, teacher=old.teacher, year='1st', section='a', school_year='2026-2027',
+        )
+        old.school_year = '2024-2025'
+        old.save()
+        self.students = list(StudentProfile.objects.order_by('pk'))
+        save_attendance_roster(
+            self.current, datetime.date(2026, 8, 3), datetime.time(8),
+            {student.pk: 'absent' for student in self.students},
+        )
+        archive_school_year('2024-2025')
+        self.assertEqual((AttendanceArchive.objects.count(), Attendance.objects.count()), (6, 6))
+        self.client.force_login(self.admin)
+
+    def test_admin_report_lists_and_counts_archived_rows(self):
+        response = self.client.get(reverse('reports:attendance_report'))
+        self.assertEqual(len(response.context['page']), 12)
+        summary = {row['student__student_ID']: row for row in response.context['summary_data']}
+        self.assertEqual(len(summary), 6)
+        self.assertEqual(
+            {(row['total_present'], row['total_absent']) for row in summary.values()}, {(1, 1)},
+        )
+
+    def test_export_includes_archived_rows_first(self):
+        response = self.client.get(reverse('reports:attendance_report_export'))
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        # header + 6 archived + 6 live rows, oldest first
+        self.assertEqual(len(lines), 13)
+        self.assertIn('2024-08-05', lines[1])
+        self.assertIn('2026-08-03', lines[-1])
+
+
+class AnalyticsSnapshotTests(TestCase):
+    def setUp(self):
+        make_offerings(make_teacher('snapshot'), 1, attendance_date=datetime.date(2025, 8, 4))
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_snapshot_is_parquet(self):
+        meta = analytics.build_snapshot(self.directory.name)
+        self.assertEqual(meta['format'], 'parquet')
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, 'attendance.parquet')))
+        snapshot = analytics.load_snapshot(self.directory.name)
+        self.assertEqual(int(analytics.student_summary(snapshot)['present'].sum()), 6)
 
-# Create your tests here.
+    def test_pickle_fallback_is_logged(self):
+        with mock.patch.object(analytics, 'SNAPSHOT_FORMAT', 'pickle'):
+            with self.assertLogs('reports.analytics', 'WARNING'):
+                analytics.build_snapshot(self.directory.name)
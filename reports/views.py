@@ -1,56 +1,70 @@
-from academics.models import SubjectOffering, Subject, Attendance, Course
+from academics.absenteeism import REASONS as ABSENTEEISM_REASONS
+from academics.archive import needs_archive
+from academics.models import (
+    AbsenteeismFlag, SubjectOffering, Subject, Attendance, AttendanceArchive, AttendanceTally, Course,
+)
+from academics.services import EMPTY_TALLY, section_size_matrix, section_sizes, tally_totals, tallies_per_subject
 from accounts.constants import YEAR_LEVEL_CHOICES,SECTION_CHOICES
 from django.shortcuts import render,redirect
 from accounts.models import StudentProfile,ParentProfile,TeacherProfile
 from django.db.models import Value, F
 from django.db.models.functions import Concat,Coalesce
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
 from django.http import JsonResponse
 from collections import defaultdict
 from datetime import datetime,date
+import pandas as pd
 from django.contrib.auth.decorators import login_required
 
+from core.pagination import KeysetPaginator
 
-SEMESTER_CHOICES = [('1st','1st Semester'),('2nd','2nd Semester')]
+from . import exports
 
 
+SEMESTER_CHOICES = [('1st','1st Semester'),('2nd','2nd Semester')]
 
 
-@login_required
-def attendance_report(request):
-    courses = Course.objects.all()
-    year_levels = YEAR_LEVEL_CHOICES
-    semesters = SEMESTER_CHOICES
-    sections = SECTION_CHOICES
 
-    course = request.GET.get('course')
-    year = request.GET.get('year')
-    semester = request.GET.get('semester')
-    subject = request.GET.get('subject')
-    section = request.GET.get('section')
 
-    # Load subjects based on selected course
-    subjects = Subject.objects.filter(course__id=course) if course else Subject.objects.all()
+def filter_attendance_report(params):
+    """
+    Apply the admin attendance report filters (course, year, semester,
+    subject, section) from ``params``.
+
+    Returns ``(report_data, summary_data, archived_data)``: the filtered
+    Attendance rows, the per-student present/absent/late summary, and a
+    list holding the filtered AttendanceArchive rows once anything has
+    been archived (empty otherwise). The summary is read from
+    AttendanceTally, which counts archived rows too.
+    """
+    course = params.get('course')
+    year = params.get('year')
+    semester = params.get('semester')
+    subject = params.get('subject')
+    section = params.get('section')
+
+    # The same filters work on Attendance, AttendanceArchive and AttendanceTally
+    def apply_filters(queryset):
+        if course:
+            queryset = queryset.filter(student__course__id=course)
+        if year:
+            queryset = queryset.filter(subject_offering__year=year)
+        if semester:
+            queryset = queryset.filter(subject_offering__subject__semester_number=semester)
+        if subject:
+            queryset = queryset.filter(subject_offering__subject__id=subject)
+        if section:
+            queryset = queryset.filter(student__section=section)
+        return queryset
 
-    # Base queryset
-    report_data = Attendance.objects.select_related(
-        'student', 'subject_offering', 'subject_offering__subject'
+    related = ('student__course', 'subject_offering__subject')
+    report_data = apply_filters(Attendance.objects.select_related(*related))
+    archived_data = (
+        [apply_filters(AttendanceArchive.objects.select_related(*related))] if needs_archive() else []
     )
 
-    # Apply filters
-    if course:
-        report_data = report_data.filter(student__course__id=course)
-    if year:
-        report_data = report_data.filter(subject_offering__year=year)
-    if semester:
-        report_data = report_data.filter(subject_offering__subject__semester_number=semester)
-    if subject:
-        report_data = report_data.filter(subject_offering__subject__id=subject)
-    if section:
-        report_data = report_data.filter(student__section=section)
-
     # Summary
-    summary_data = report_data.values(
+    summary_data = apply_filters(AttendanceTally.objects.all()).values(
         'student__student_ID',
         'student__course__name',
     ).annotate(
@@ -61,18 +75,41 @@ def attendance_report(request):
             Value(' '),
             F('student__last_name'),
         ),
-        total_present=Count('pk', filter=Q(status='present')),
-        total_absent=Count('pk', filter=Q(status='absent')),
-        total_late=Count('pk', filter=Q(status='late'))
+        total_present=Sum('present'),
+        total_absent=Sum('absent'),
+        total_late=Sum('late'),
     )
 
+    return report_data, summary_data, archived_data
+
+
+@login_required
+def attendance_report(request):
+    courses = Course.objects.all()
+    year_levels = YEAR_LEVEL_CHOICES
+    semesters = SEMESTER_CHOICES
+    sections = SECTION_CHOICES
+
+    course = request.GET.get('course')
+    year = request.GET.get('year')
+    semester = request.GET.get('semester')
+    subject = request.GET.get('subject')
+    section = request.GET.get('section')
+
+    # Load subjects based on selected course
+    subjects = Subject.objects.filter(course__id=course) if course else Subject.objects.all()
+
+    report_data, summary_data, archived_data = filter_attendance_report(request.GET)
+    page = KeysetPaginator(report_data, extra_querysets=archived_data).page(request.GET)
+
     context = {
         'courses': courses,
         'year_levels': year_levels,
         'semesters': semesters,
         'sections': sections,
         'subjects': subjects,
-        'report_data': report_data,
+        'report_data': page,
+        'page': page,
         'summary_data': summary_data,
         'selected_course': course,
         'selected_year': year,
@@ -84,6 +121,39 @@ def attendance_report(request):
 
     return render(request, 'reports/report.html', context)
 
+
+@login_required
+def attendance_report_export(request):
+    """
+    Download the admin attendance report with the same filters as the page.
+
+    ``?format=csv`` (default) streams either the detail rows or, with
+    ``part=summary``, the per-student summary. ``?format=xlsx`` returns a
+    workbook with both sheets, written in openpyxl write-only mode.
+    """
+    export_format = request.GET.get('format', 'csv')
+    part = request.GET.get('part', 'detail')
+    report_data, summary_data, archived_data = filter_attendance_report(request.GET)
+    # Archived school years are closed, so their rows come first
+    report_data = [*archived_data, report_data]
+
+    if export_format == 'xlsx':
+        return exports.xlsx_response(
+            'attendance_report.xlsx',
+            [
+                ('Detail', exports.DETAIL_HEADER, exports.detail_rows(report_data)),
+                ('Summary', exports.SUMMARY_HEADER, exports.summary_rows(summary_data)),
+            ],
+        )
+
+    if part == 'summary':
+        return exports.csv_response(
+            'attendance_summary.csv', exports.SUMMARY_HEADER, exports.summary_rows(summary_data)
+        )
+    return exports.csv_response(
+        'attendance_report.csv', exports.DETAIL_HEADER, exports.detail_rows(report_data)
+    )
+
 @login_required
 def parent_student_report(request):
     # Filters
@@ -156,64 +226,119 @@ def student_details(request):
     }
     return render(request, 'reports/student_details.html', context)
 
-@login_required
-def teacher_details_report(request):
-    courses = Course.objects.all()
-    year_levels = StudentProfile._meta.get_field('year').choices
-    sections = StudentProfile._meta.get_field('section').choices
 
+@login_required
+def absenteeism_report(request):
+    """Students flagged by the nightly ``detect_absenteeism`` job."""
     selected_course = request.GET.get('course')
     selected_year = request.GET.get('year')
+    selected_section = request.GET.get('section')
+    selected_reason = request.GET.get('reason')
 
-    teachers_data = []
-
-    teachers = TeacherProfile.objects.all()
-
-    for teacher in teachers:
-        # Assigned subjects, filtered by course/year if selected
-        subject_offerings = SubjectOffering.objects.filter(teacher=teacher)
-        if selected_course:
-            subject_offerings = subject_offerings.filter(subject__course_id=selected_course)
-        if selected_year:
-            subject_offerings = subject_offerings.filter(year=selected_year)
-
-        subjects_info = []
-
-        for so in subject_offerings:
-            # Count students in each section
-            section_counts = {code: 0 for code, _ in sections}  # initialize
-            students_in_subject = StudentProfile.objects.filter(
-                subjects=so.subject,
-                course=so.subject.course,
-                year=so.year
-            ).values('section').annotate(count=Count('student_ID'))
-
-            for s in students_in_subject:
-                section_counts[s['section']] = s['count']
-
-            subjects_info.append({
-                'subject': so.subject,
-                'year': so.year,
-                'school_year': so.school_year,
-                'section_counts': section_counts
-            })
-
-        if subjects_info:
-            teachers_data.append({
-                'teacher': teacher,
-                'subjects_info': subjects_info,
-                'rowspan': len(subjects_info)
-            })
+    flags = AbsenteeismFlag.objects.select_related(
+        'student__course', 'subject_offering__subject'
+    ).order_by('-current_streak', '-absence_rate')
+    if selected_course:
+        flags = flags.filter(student__course__id=selected_course)
+    if selected_year:
+        flags = flags.filter(subject_offering__year=selected_year)
+    if selected_section:
+        flags = flags.filter(student__section=selected_section)
+    if selected_reason:
+        flags = flags.filter(reasons__contains=selected_reason)
+    flags = list(flags)
 
     context = {
-        'courses': courses,
-        'year_levels': year_levels,
-        'sections': sections,
+        'flags': flags,
+        'computed_at': flags[0].computed_at if flags else None,
+        'courses': Course.objects.all(),
+        'year_levels': YEAR_LEVEL_CHOICES,
+        'sections': SECTION_CHOICES,
+        'reasons': ABSENTEEISM_REASONS,
         'selected_course': selected_course,
         'selected_year': selected_year,
-        'teachers_data': teachers_data,
+        'selected_section': selected_section,
+        'selected_reason': selected_reason,
+        'active': 'reports',
+    }
+    return render(request, 'reports/absenteeism_report.html', context)
+
+def teacher_details(params):
+    """
+    Offerings per teacher with enrolled-student counts per section, for
+    the teacher details report and its CSV export.
+
+    Built from one offerings query and one grouped count over the
+    enrollment table keyed by (subject, course, year, section), so the
+    query count does not grow with the number of teachers or offerings.
+    """
+    sections = StudentProfile._meta.get_field('section').choices
+    selected_course = params.get('course')
+    selected_year = params.get('year')
+
+    offerings = SubjectOffering.objects.filter(teacher__isnull=False).select_related(
+        'subject__course', 'teacher__user'
+    ).order_by('teacher_id', 'pk')
+    if selected_course:
+        offerings = offerings.filter(subject__course_id=selected_course)
+    if selected_year:
+        offerings = offerings.filter(year=selected_year)
+    offerings = list(offerings)
+
+    Enrollment = StudentProfile.subjects.through
+    counts = Enrollment.objects.filter(
+        subject_id__in={so.subject_id for so in offerings}
+    ).values(
+        'subject_id', 'studentprofile__course_id', 'studentprofile__year', 'studentprofile__section',
+    ).annotate(count=Count('studentprofile_id')).order_by()
+    section_counts_by_key = {
+        (row['subject_id'], row['studentprofile__course_id'], row['studentprofile__year'],
+         row['studentprofile__section']): row['count']
+        for row in counts
+    }
+
+    teachers_data = []
+    by_teacher = {}
+    for so in offerings:
+        entry = by_teacher.get(so.teacher_id)
+        if entry is None:
+            entry = by_teacher[so.teacher_id] = {'teacher': so.teacher, 'subjects_info': []}
+            teachers_data.append(entry)
+        entry['subjects_info'].append({
+            'subject': so.subject,
+            'year': so.year,
+            'school_year': so.school_year,
+            'section_counts': {
+                code: section_counts_by_key.get((so.subject_id, so.subject.course_id, so.year, code), 0)
+                for code, _ in sections
+            },
+        })
+    for entry in teachers_data:
+        entry['rowspan'] = len(entry['subjects_info'])
+    return teachers_data
+
+
+@login_required
+def teacher_details_report(request):
+    context = {
+        'courses': Course.objects.all(),
+        'year_levels': StudentProfile._meta.get_field('year').choices,
+        'sections': StudentProfile._meta.get_field('section').choices,
+        'selected_course': request.GET.get('course'),
+        'selected_year': request.GET.get('year'),
+        'teachers_data': teacher_details(request.GET),
     }
     return render(request, 'reports/teacher_details_report.html', context)
+
+
+@login_required
+def teacher_details_report_export(request):
+    """Download the teacher details report as CSV, with the page's filters."""
+    return exports.csv_response(
+        'teacher_details.csv',
+        exports.TEACHER_DETAILS_HEADER,
+        exports.teacher_details_rows(teacher_details(request.GET)),
+    )
 @login_required
 def class_subject_overview(request):
     teacher = request.user.teacherprofile
@@ -223,32 +348,27 @@ def class_subject_overview(request):
     year = request.GET.get('year')
     section = request.GET.get('section')
 
-    offerings = SubjectOffering.objects.filter(teacher=teacher)
+    offerings = SubjectOffering.objects.filter(teacher=teacher).select_related('subject__course')
 
     if semester:
         offerings = offerings.filter(subject__semester_number=semester)
     if year:
         offerings = offerings.filter(year=year)
+    offerings = list(offerings)
 
-    data = []
-    for offering in offerings:
-        # Create a list of student counts per section in order of SECTION_CHOICES
-        section_counts_list = []
-        total_students = 0
-        for sec_value, sec_display in SECTION_CHOICES:
-            qs = StudentProfile.objects.filter(
-                course=offering.subject.course,
-                year=offering.year,
-                section=sec_value
-            )
-            # Apply section filter if set
-            if section and section != sec_value:
-                count = 0
-            else:
-                count = qs.count()
-            section_counts_list.append(count)
-            total_students += count
+    # Section sizes for every offering's (course, year) in one lookup on the
+    # cached size matrix, columns in SECTION_CHOICES order
+    classes = pd.MultiIndex.from_tuples(
+        [(offering.subject.course_id, offering.year) for offering in offerings],
+        names=['course_id', 'year'],
+    )
+    counts = section_size_matrix().reindex(classes, fill_value=0)
+    if section:
+        counts.loc[:, counts.columns != section] = 0
+    totals = counts.sum(axis=1).tolist()
 
+    data = []
+    for offering, section_counts_list, total_students in zip(offerings, counts.values.tolist(), totals):
         data.append({
             'subject': offering.subject.name,
             'course': offering.subject.course.name if offering.subject.course else 'N/A',
@@ -270,6 +390,25 @@ def class_subject_overview(request):
         'colspan': 2 + len(SECTION_CHOICES) + 4,
     }
     return render(request, 'reports/class_subject_overview.html', context)
+def summary_offerings(teacher, start_date, end_date, section=None):
+    """
+    The teacher's offerings annotated with ``present_count``,
+    ``late_count`` and ``absent_count`` of live attendance in the date
+    range (and, when given, only ``section``'s students), in one grouped
+    query. explain_attendance_queries checks its plan.
+    """
+    in_range = Q(attendances__date__range=[start_date, end_date])
+    if section:
+        in_range &= Q(attendances__student__section=section)
+    return SubjectOffering.objects.filter(teacher=teacher).select_related(
+        'subject__course'
+    ).annotate(
+        present_count=Count('attendances', filter=in_range & Q(attendances__status='present')),
+        late_count=Count('attendances', filter=in_range & Q(attendances__status='late')),
+        absent_count=Count('attendances', filter=in_range & Q(attendances__status='absent')),
+    )
+
+
 @login_required
 def attendance_summary(request):
     teacher = request.user.teacherprofile
@@ -287,8 +426,8 @@ def attendance_summary(request):
     if not end_date:
         end_date = date.today().isoformat()
 
-    # Get teacher's subject offerings
-    offerings = SubjectOffering.objects.filter(teacher=teacher)
+    # Teacher's subject offerings with their status counts in one grouped query
+    offerings = summary_offerings(teacher, start_date, end_date, section)
 
     if semester:
         offerings = offerings.filter(subject__semester_number=semester)
@@ -297,26 +436,43 @@ def attendance_summary(request):
     if year:
         offerings = offerings.filter(year=year)
 
-    data = []
-    for offering in offerings:
-        # Filter students by course, year, and section
-        students_qs = StudentProfile.objects.filter(course=offering.subject.course, year=offering.year)
+    # Closed school years live in the archive; count them only when the
+    # range reaches back that far
+    archived_counts = {}
+    if needs_archive(start_date):
+        archived = AttendanceArchive.objects.filter(
+            subject_offering__teacher=teacher, date__range=[start_date, end_date],
+        )
         if section:
-            students_qs = students_qs.filter(section=section)
+            archived = archived.filter(student__section=section)
+        archived_counts = {
+            row['subject_offering_id']: row
+            for row in archived.order_by().values('subject_offering_id').annotate(
+                present=Count('pk', filter=Q(status='present')),
+                late=Count('pk', filter=Q(status='late')),
+                absent=Count('pk', filter=Q(status='absent')),
+            )
+        }
 
-        total_in_class = students_qs.count()
-
-        # Attendance counts
-        attendance_qs = Attendance.objects.filter(subject_offering=offering)
-        if start_date and end_date:
-            attendance_qs = attendance_qs.filter(date__range=[start_date, end_date])
+    # Class sizes for every (course, year, section), cached between requests
+    sizes = section_sizes()
 
+    data = []
+    for offering in offerings:
+        # Students in the offering's course and year (optionally one section)
+        course_id = offering.subject.course_id
         if section:
-            attendance_qs = attendance_qs.filter(student__section=section)
+            total_in_class = sizes.get((course_id, offering.year, section), 0)
+        else:
+            total_in_class = sum(
+                sizes.get((course_id, offering.year, sec_value), 0)
+                for sec_value, _label in SECTION_CHOICES
+            )
 
-        present_count = attendance_qs.filter(status='present').count()
-        late_count = attendance_qs.filter(status='late').count()
-        absent_count = attendance_qs.filter(status='absent').count()
+        archived = archived_counts.get(offering.id, EMPTY_TALLY)
+        present_count = offering.present_count + archived['present']
+        late_count = offering.late_count + archived['late']
+        absent_count = offering.absent_count + archived['absent']
 
         avg_attendance = 0
         if total_in_class > 0:
@@ -377,25 +533,28 @@ def detailed_attendance(request):
     if year:
         offerings = offerings.filter(year=year)
 
-    # Collect attendance records
-    attendance_records = Attendance.objects.filter(subject_offering__in=offerings)
-
-    if section:
-        attendance_records = attendance_records.filter(student__section=section)
-    if start_date and end_date:
-        attendance_records = attendance_records.filter(date__range=[start_date, end_date])
-    if search_name:
-        attendance_records = attendance_records.filter(
-            student__first_name__icontains=search_name
-        ) | attendance_records.filter(
-            student__last_name__icontains=search_name
-        )
+    # Collect attendance records (the same filters work on the archive)
+    def filter_records(attendance_records):
+        attendance_records = attendance_records.filter(subject_offering__in=offerings)
+        if section:
+            attendance_records = attendance_records.filter(student__section=section)
+        if start_date and end_date:
+            attendance_records = attendance_records.filter(date__range=[start_date, end_date])
+        if search_name:
+            attendance_records = attendance_records.filter(
+                student__first_name__icontains=search_name
+            ) | attendance_records.filter(
+                student__last_name__icontains=search_name
+            )
+        return attendance_records.select_related('student', 'subject_offering__subject')
 
-    attendance_records = attendance_records.select_related('student', 'subject_offering__subject')
+    attendance_records = filter_records(Attendance.objects.all())
+    archived = [filter_records(AttendanceArchive.objects.all())] if needs_archive(start_date) else []
+    page = KeysetPaginator(attendance_records, extra_querysets=archived).page(request.GET)
 
     # Prepare data for template
     data = []
-    for record in attendance_records:
+    for record in page:
         data.append({
             'student': f"{record.student.first_name} {record.student.last_name}",
             'subject': record.subject_offering.subject.name,
@@ -406,6 +565,7 @@ def detailed_attendance(request):
     # Context
     context = {
         'data': data,
+        'page': page,
         'subject_filter': subject_id,
         'year_filter': year,
         'section_filter': section,
@@ -448,12 +608,18 @@ def parent_child_summary(request):
     if selected_subject_id:
         attendance_qs = attendance_qs.filter(subject_offering__subject_id=selected_subject_id)
 
+    # Rolled-up counts for the same child/subject selection
+    tallies = child.attendance_tallies.all()
+    if selected_subject_id:
+        tallies = tallies.filter(subject_offering__subject_id=selected_subject_id)
+
     # ---- Summary Counts ----
-    total_present = attendance_qs.filter(status="present").count()
-    total_absent = attendance_qs.filter(status="absent").count()
-    total_late = attendance_qs.filter(status="late").count()
+    totals = tally_totals(tallies)
+    total_present = totals["present"]
+    total_absent = totals["absent"]
+    total_late = totals["late"]
 
-    total_records = attendance_qs.count()
+    total_records = totals["total"]
 
     # Attendance % calculation
     if total_records > 0:
@@ -479,15 +645,16 @@ def parent_child_summary(request):
 
     # ---- Subject Breakdown ----
     breakdown = []
+    tallies_by_subject = tallies_per_subject(tallies)
 
     for subj in subjects:
-        subj_records = attendance_qs.filter(subject_offering__subject=subj)
+        tally = tallies_by_subject.get(subj.id, EMPTY_TALLY)
 
-        present = subj_records.filter(status="present").count()
-        absent = subj_records.filter(status="absent").count()
-        late = subj_records.filter(status="late").count()
+        present = tally["present"]
+        absent = tally["absent"]
+        late = tally["late"]
 
-        total = subj_records.count()
+        total = tally["total"]
 
         percent = round((present / total) * 100, 1) if total > 0 else 0
 
@@ -538,27 +705,32 @@ def parent_attendance_timeline(request):
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
     
-    # Base attendance queryset
-    attendance_qs = Attendance.objects.filter(student=child)
-    
-    if selected_subject != 'all':
-        attendance_qs = attendance_qs.filter(subject_offering__subject__id=selected_subject)
-    
-    if status_filter != 'all':
-        attendance_qs = attendance_qs.filter(status=status_filter)
-    
-    if start_date:
-        attendance_qs = attendance_qs.filter(date__gte=start_date)
-    if end_date:
-        attendance_qs = attendance_qs.filter(date__lte=end_date)
+    # Base attendance queryset (the same filters work on the archive)
+    def filter_attendance(attendance_qs):
+        attendance_qs = attendance_qs.filter(student=child)
+        if selected_subject != 'all':
+            attendance_qs = attendance_qs.filter(subject_offering__subject__id=selected_subject)
+        if status_filter != 'all':
+            attendance_qs = attendance_qs.filter(status=status_filter)
+        if start_date:
+            attendance_qs = attendance_qs.filter(date__gte=start_date)
+        if end_date:
+            attendance_qs = attendance_qs.filter(date__lte=end_date)
+        return attendance_qs.select_related('subject_offering__subject')
     
     # Subjects for the dropdown
     subjects = child.subjects.all()
+
+    archived = [filter_attendance(AttendanceArchive.objects.all())] if needs_archive(start_date) else []
+    page = KeysetPaginator(
+        filter_attendance(Attendance.objects.all()), extra_querysets=archived
+    ).page(request.GET)
     
     context = {
         'children': children,
         'selected_child': child,
-        'attendance': attendance_qs.order_by('-date'),
+        'attendance': page,
+        'page': page,
         'subjects': subjects,
         'selected_subject': selected_subject,
         'status_filter': status_filter,